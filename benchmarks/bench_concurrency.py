@@ -0,0 +1,23 @@
+import pytest
+
+from msfabricpysdkcore.util import run_concurrently
+
+# Simulated network latency per request in seconds
+LATENCY = 0.005
+
+
+@pytest.mark.parametrize("max_workers", [1, 4, 16, 32])
+def test_get_items_concurrently(benchmark, core_client, mock_server, latency, max_workers):
+    workspace_id = mock_server.small_workspace_id
+    item_ids = [item.id for item in core_client.list_items(workspace_id=workspace_id)][:100]
+    latency(LATENCY)
+
+    def get_items():
+        return run_concurrently(lambda item_id: core_client.calling_routine(
+            f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}", operation="GET",
+            response_codes=[200, 429], error_message="Error getting item", return_format="json"),
+            item_ids, max_workers=max_workers)
+
+    results = benchmark.pedantic(get_items, rounds=3, iterations=1)
+    benchmark.extra_info["requests_per_second"] = len(item_ids) / benchmark.stats.stats.mean
+    assert all(exception is None for _, _, exception in results)
@@ -0,0 +1,21 @@
+import itertools
+
+_names = itertools.count()
+
+
+def test_get_item_definition(benchmark, core_client, mock_server):
+    items = core_client.list_items(workspace_id=mock_server.small_workspace_id)
+    item_ids = itertools.cycle([item.id for item in items])
+
+    definition = benchmark(lambda: core_client.get_item_definition(workspace_id=mock_server.small_workspace_id,
+                                                                   item_id=next(item_ids)))
+    assert definition["definition"]["parts"]
+
+
+def test_create_item_with_definition(benchmark, core_client, mock_server):
+    workspace = core_client.create_workspace(display_name="bench_create_item")
+    definition = {"parts": [{"path": "notebook-content.py", "payload": "eA==", "payloadType": "InlineBase64"}]}
+
+    item = benchmark(lambda: core_client.create_item(workspace_id=workspace.id, display_name=f"created_{next(_names)}",
+                                                     type="Notebook", definition=definition))
+    assert item.type == "Notebook"
@@ -0,0 +1,31 @@
+import pytest
+
+from msfabricpysdkcore.admin_item import AdminItem
+from msfabricpysdkcore.item import Item
+
+N_OBJECTS = 10000
+
+
+@pytest.fixture(scope="module")
+def item_dicts():
+    return [{"id": f"00000000-0000-0000-0000-{i:012d}", "displayName": f"item_{i}", "description": "",
+             "type": "Report", "workspaceId": "11111111-1111-1111-1111-111111111111"} for i in range(N_OBJECTS)]
+
+
+@pytest.fixture(scope="module")
+def admin_item_dicts():
+    return [{"id": f"00000000-0000-0000-0000-{i:012d}", "name": f"item_{i}", "type": "Report", "state": "Active",
+             "description": "", "workspaceId": "11111111-1111-1111-1111-111111111111",
+             "capacityId": "22222222-2222-2222-2222-222222222222", "lastUpdatedDate": "2024-01-01T00:00:00Z",
+             "creatorPrincipal": {"id": "33333333-3333-3333-3333-333333333333", "type": "User"}}
+            for i in range(N_OBJECTS)]
+
+
+def test_item_from_dict(benchmark, item_dicts, core_client):
+    items = benchmark(lambda: [Item.from_dict(item_dict, core_client=core_client) for item_dict in item_dicts])
+    assert len(items) == N_OBJECTS
+
+
+def test_admin_item_from_dict(benchmark, admin_item_dicts, admin_client):
+    items = benchmark(lambda: [AdminItem.from_dict(item_dict, admin_client) for item_dict in admin_item_dicts])
+    assert len(items) == N_OBJECTS
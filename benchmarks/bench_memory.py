@@ -0,0 +1,55 @@
+import tracemalloc
+
+import pytest
+
+from msfabricpysdkcore.admin_item import AdminItem
+from msfabricpysdkcore.admin_workspace import AdminWorkspace
+from msfabricpysdkcore.item import Item
+from msfabricpysdkcore.job_instance import JobInstance
+from msfabricpysdkcore.workspace import Workspace
+
+N_OBJECTS = 100000
+
+ID = "00000000-0000-0000-0000-000000000000"
+
+# Attribute values are shared by all objects, so that only the objects themselves are measured
+MODELS = {
+    Item: dict(id=ID, display_name="item", type="Report", workspace_id=ID, core_client=None),
+    Workspace: dict(id=ID, display_name="workspace", description="", type="Workspace", core_client=None),
+    AdminItem: dict(id=ID, type="Report", name="item", workspace_id=ID, state="Active", description="",
+                    last_updated_date="2024-01-01T00:00:00Z", capacity_id=ID, creator_principal=None, admin_client=None),
+    AdminWorkspace: dict(id=ID, type="Workspace", name="workspace", state="Active", capacity_id=ID, admin_client=None),
+    JobInstance: dict(id=ID, item_id=ID, workspace_id=ID, core_client=None, job_type="Pipeline", invoke_type="Manual",
+                      status="Completed", root_activity_id=ID, start_time_utc=None, end_time_utc=None, failureReason=None)
+}
+
+
+def _without_slots(cls):
+    """The same class with a per-instance __dict__ instead of __slots__, as the models were before"""
+    namespace = {key: value for key, value in vars(cls).items()
+                 if key not in cls.__slots__ and key not in ("__slots__", "__dict__", "__weakref__")}
+    return type(f"{cls.__name__}WithoutSlots", (), namespace)
+
+
+def _bytes_per_object(cls, kwargs):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [cls(**kwargs) for _ in range(N_OBJECTS)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return size / N_OBJECTS
+
+
+@pytest.mark.parametrize("cls", list(MODELS), ids=lambda cls: cls.__name__)
+def test_model_memory(benchmark, cls):
+    kwargs = MODELS[cls]
+    with_slots = _bytes_per_object(cls, kwargs)
+    without_slots = _bytes_per_object(_without_slots(cls), kwargs)
+    benchmark.extra_info["bytes_per_object"] = round(with_slots, 1)
+    benchmark.extra_info["bytes_per_object_without_slots"] = round(without_slots, 1)
+    print(f"\n{cls.__name__}: {with_slots:.1f} bytes per object with __slots__, {without_slots:.1f} without")
+
+    benchmark(lambda: [cls(**kwargs) for _ in range(10000)])
+    assert with_slots < without_slots
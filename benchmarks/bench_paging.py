@@ -0,0 +1,8 @@
+def test_list_items_paged(benchmark, core_client, mock_server):
+    items = benchmark(core_client.list_items, workspace_id=mock_server.large_workspace_id)
+    assert len(items) == mock_server.large_workspace_size
+
+
+def test_admin_list_items_paged(benchmark, admin_client, mock_server):
+    items = benchmark(admin_client.list_items, workspace_id=mock_server.large_workspace_id)
+    assert len(items) == mock_server.large_workspace_size
@@ -0,0 +1,45 @@
+import pytest
+
+from msfabricpysdkcore import FabricClientAdmin
+from msfabricpysdkcore.mock_server import MockFabricServer
+
+# Large enough to page: 5000 items in pages of 100
+LARGE_WORKSPACE_ITEMS = 5000
+SMALL_WORKSPACE_ITEMS = 200
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    """Stand-in server with one large and one small workspace"""
+    with MockFabricServer(page_size=100, seed=0) as server:
+        large = server.add_workspace("large")
+        for i in range(LARGE_WORKSPACE_ITEMS):
+            server.add_item(large["id"], f"item_{i}", "Report")
+        small = server.add_workspace("small")
+        for i in range(SMALL_WORKSPACE_ITEMS):
+            server.add_item(small["id"], f"notebook_{i}", "Notebook",
+                            definition={"parts": [{"path": "notebook-content.py", "payload": "eA==" * 256,
+                                                   "payloadType": "InlineBase64"}]})
+        server.large_workspace_id = large["id"]
+        server.small_workspace_id = small["id"]
+        server.large_workspace_size = LARGE_WORKSPACE_ITEMS
+        yield server
+
+
+@pytest.fixture(scope="session")
+def core_client(mock_server):
+    return mock_server.client()
+
+
+@pytest.fixture(scope="session")
+def admin_client(mock_server):
+    return mock_server.client(FabricClientAdmin)
+
+
+@pytest.fixture
+def latency(mock_server):
+    """Set a per-request latency on the server for the duration of a benchmark"""
+    def set_latency(seconds):
+        mock_server.latency = seconds
+    yield set_latency
+    mock_server.latency = 0.0
@@ -0,0 +1,368 @@
+import gzip
+import json
+import sys
+from array import array
+
+
+class AccessMatrix:
+    """Class to represent the principal x resource x role relation of a tenant
+
+    Principals, resources and roles are interned into integer ids. The relation
+    itself is kept in three parallel integer arrays together with compressed
+    indexes by principal and by resource, so lookups touch only the entries of
+    the principal or resource asked for.
+    """
+
+    WORKSPACE_TYPE = "Workspace"
+
+    def __init__(self) -> None:
+        """Initialize an empty AccessMatrix object"""
+        self.principal_ids = []
+        self.principal_names = []
+        self.principal_types = []
+        self.resource_ids = []
+        self.resource_names = []
+        self.resource_types = array('H')
+        self.resource_workspaces = array('i')
+        self.types = []
+        self.roles = []
+        self.failed_resources = []
+
+        self._principal_index = {}
+        self._resource_index = {}
+        self._type_index = {}
+        self._role_index = {}
+
+        self._rel_principals = array('I')
+        self._rel_resources = array('I')
+        self._rel_roles = array('H')
+
+        self._indexed = False
+        self._by_principal = None
+        self._by_resource = None
+        self._workspace_items = None
+
+    def __str__(self) -> str:
+        """Return a string representation of the access matrix"""
+        dict_ = {
+            'principals': len(self.principal_ids),
+            'resources': len(self.resource_ids),
+            'roles': len(self.roles),
+            'entries': len(self._rel_principals),
+            'failed_resources': len(self.failed_resources)
+        }
+        return json.dumps(dict_, indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self._rel_principals)
+
+    # Interning
+
+    def _intern_principal(self, principal):
+        principal_id = principal["id"]
+        index = self._principal_index.get(principal_id)
+        if index is None:
+            index = len(self.principal_ids)
+            self._principal_index[principal_id] = index
+            self.principal_ids.append(principal_id)
+            self.principal_names.append(principal.get("displayName"))
+            self.principal_types.append(principal.get("type"))
+        return index
+
+    def _intern_type(self, type):
+        index = self._type_index.get(type)
+        if index is None:
+            index = len(self.types)
+            self._type_index[type] = index
+            self.types.append(type)
+        return index
+
+    def _intern_role(self, role):
+        index = self._role_index.get(role)
+        if index is None:
+            index = len(self.roles)
+            self._role_index[role] = index
+            self.roles.append(role)
+        return index
+
+    def _intern_resource(self, resource_id, type, workspace_id, name = None):
+        index = self._resource_index.get(resource_id)
+        if index is not None:
+            return index
+        workspace_index = None
+        if workspace_id != resource_id:
+            workspace_index = self._intern_resource(workspace_id, self.WORKSPACE_TYPE, workspace_id)
+        index = len(self.resource_ids)
+        self._resource_index[resource_id] = index
+        self.resource_ids.append(resource_id)
+        self.resource_names.append(name)
+        self.resource_types.append(self._intern_type(type))
+        self.resource_workspaces.append(index if workspace_index is None else workspace_index)
+        return index
+
+    def _add(self, principal_index, resource_index, role):
+        self._rel_principals.append(principal_index)
+        self._rel_resources.append(resource_index)
+        self._rel_roles.append(self._intern_role(role))
+        self._indexed = False
+
+    # Loading access details
+
+    def add_workspace_access_details(self, workspace_id, access_details, name = None):
+        """Add the response of list_workspace_access_details to the matrix
+
+        Args:
+            workspace_id (str): The ID of the workspace
+            access_details (dict): The response of list_workspace_access_details
+            name (str): The name of the workspace
+        """
+        resource_index = self._intern_resource(workspace_id, self.WORKSPACE_TYPE, workspace_id, name)
+        if name is not None:
+            self.resource_names[resource_index] = name
+        for entry in access_details.get("accessDetails", []):
+            principal_index = self._intern_principal(entry["principal"])
+            details = entry.get("workspaceAccessDetails", {})
+            role = details.get("workspaceRole")
+            if role:
+                self._add(principal_index, resource_index, role)
+
+    def add_item_access_details(self, workspace_id, item_id, access_details, type = None, name = None):
+        """Add the response of list_item_access_details to the matrix
+
+        Args:
+            workspace_id (str): The ID of the workspace
+            item_id (str): The ID of the item
+            access_details (dict): The response of list_item_access_details
+            type (str): The type of the item
+            name (str): The name of the item
+        """
+        resource_index = None
+        for entry in access_details.get("accessDetails", []):
+            details = entry.get("itemAccessDetails", {})
+            if resource_index is None:
+                resource_index = self._intern_resource(item_id, type or details.get("type"), workspace_id, name)
+            principal_index = self._intern_principal(entry["principal"])
+            permissions = list(details.get("permissions", [])) + list(details.get("additionalPermissions", []))
+            for permission in permissions:
+                self._add(principal_index, resource_index, permission)
+        if resource_index is None:
+            self._intern_resource(item_id, type, workspace_id, name)
+
+    # Indexes
+
+    def _build_csr(self, keys, size):
+        """Build a compressed index of relation rows grouped by key"""
+        counts = array('I', [0]) * (size + 1)
+        for key in keys:
+            counts[key + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+        positions = array('I', counts)
+        rows = array('I', [0]) * len(keys)
+        for row, key in enumerate(keys):
+            rows[positions[key]] = row
+            positions[key] += 1
+        return counts, rows
+
+    def build_index(self):
+        """Build the lookup indexes. Called automatically before the first query"""
+        self._by_principal = self._build_csr(self._rel_principals, len(self.principal_ids))
+        self._by_resource = self._build_csr(self._rel_resources, len(self.resource_ids))
+
+        item_workspaces = array('I')
+        item_rows = array('I')
+        workspace_type = self._type_index.get(self.WORKSPACE_TYPE)
+        for resource_index, workspace_index in enumerate(self.resource_workspaces):
+            if self.resource_types[resource_index] != workspace_type:
+                item_workspaces.append(workspace_index)
+                item_rows.append(resource_index)
+        offsets, rows = self._build_csr(item_workspaces, len(self.resource_ids))
+        self._workspace_items = (offsets, array('I', (item_rows[row] for row in rows)))
+        self._indexed = True
+
+    def _rows(self, index_name, key):
+        if not self._indexed:
+            self.build_index()
+        offsets, rows = getattr(self, index_name)
+        return rows[offsets[key]:offsets[key + 1]]
+
+    # Queries
+
+    def resources_for_principal(self, principal_id, type = None, role = None, include_inherited = False):
+        """Get all resources a principal can reach
+
+        Args:
+            principal_id (str): The ID of the principal
+            type (str): Only return resources of this type, e.g. "Workspace" or "Report"
+            role (str): Only return resources reached through this role or permission
+            include_inherited (bool): Whether to include the items of workspaces the principal has a role in
+        Returns:
+            list: The list of resource IDs
+        """
+        principal_index = self._principal_index.get(principal_id)
+        if principal_index is None:
+            return []
+        type_index = self._type_index.get(type, -1) if type else None
+        role_index = self._role_index.get(role, -1) if role else None
+
+        reached = set()
+        for row in self._rows("_by_principal", principal_index):
+            if role_index is not None and self._rel_roles[row] != role_index:
+                continue
+            resource_index = self._rel_resources[row]
+            reached.add(resource_index)
+            if include_inherited and self.resource_workspaces[resource_index] == resource_index:
+                reached.update(self._rows("_workspace_items", resource_index))
+
+        if type_index is not None:
+            reached = [r for r in reached if self.resource_types[r] == type_index]
+        return [self.resource_ids[r] for r in sorted(reached)]
+
+    def items_for_principal(self, principal_id, include_inherited = True):
+        """Get all items a principal can reach, directly or through a workspace role
+
+        Args:
+            principal_id (str): The ID of the principal
+            include_inherited (bool): Whether to include the items of workspaces the principal has a role in
+        Returns:
+            list: The list of item IDs
+        """
+        workspace_type = self._type_index.get(self.WORKSPACE_TYPE)
+        resources = self.resources_for_principal(principal_id, include_inherited=include_inherited)
+        return [r for r in resources if self.resource_types[self._resource_index[r]] != workspace_type]
+
+    def principals_for_resource(self, resource_id, role = None):
+        """Get all principals with access to a resource
+
+        Args:
+            resource_id (str): The ID of the workspace or item
+            role (str): Only return principals with this role or permission
+        Returns:
+            list: The list of principal IDs
+        """
+        resource_index = self._resource_index.get(resource_id)
+        if resource_index is None:
+            return []
+        role_index = self._role_index.get(role, -1) if role else None
+        principals = {self._rel_principals[row] for row in self._rows("_by_resource", resource_index)
+                      if role_index is None or self._rel_roles[row] == role_index}
+        return [self.principal_ids[p] for p in sorted(principals)]
+
+    def roles_for(self, principal_id, resource_id):
+        """Get the roles and permissions a principal has on a resource
+
+        Args:
+            principal_id (str): The ID of the principal
+            resource_id (str): The ID of the workspace or item
+        Returns:
+            list: The list of roles and permissions
+        """
+        principal_index = self._principal_index.get(principal_id)
+        resource_index = self._resource_index.get(resource_id)
+        if principal_index is None or resource_index is None:
+            return []
+        rows = self._rows("_by_principal", principal_index)
+        return sorted({self.roles[self._rel_roles[row]] for row in rows if self._rel_resources[row] == resource_index})
+
+    def get_principal(self, principal_id):
+        """Get the interned details of a principal
+
+        Args:
+            principal_id (str): The ID of the principal
+        Returns:
+            dict: The principal details
+        """
+        index = self._principal_index[principal_id]
+        return {"id": principal_id, "displayName": self.principal_names[index], "type": self.principal_types[index]}
+
+    def get_resource(self, resource_id):
+        """Get the interned details of a resource
+
+        Args:
+            resource_id (str): The ID of the workspace or item
+        Returns:
+            dict: The resource details
+        """
+        index = self._resource_index[resource_id]
+        return {"id": resource_id, "displayName": self.resource_names[index],
+                "type": self.types[self.resource_types[index]],
+                "workspaceId": self.resource_ids[self.resource_workspaces[index]]}
+
+    # Persistence
+
+    def save(self, path):
+        """Persist the access matrix to a compressed file
+
+        Args:
+            path (str): The path of the file
+        """
+        header = {
+            "version": 1,
+            "byteorder": sys.byteorder,
+            "principal_ids": self.principal_ids,
+            "principal_names": self.principal_names,
+            "principal_types": self.principal_types,
+            "resource_ids": self.resource_ids,
+            "resource_names": self.resource_names,
+            "types": self.types,
+            "roles": self.roles,
+            "failed_resources": self.failed_resources,
+            "arrays": {}
+        }
+        arrays = self._arrays()
+        for name, arr in arrays.items():
+            header["arrays"][name] = [arr.typecode, len(arr)]
+
+        with gzip.open(path, "wb") as f:
+            header_bytes = json.dumps(header).encode("utf-8")
+            f.write(len(header_bytes).to_bytes(8, "little"))
+            f.write(header_bytes)
+            for arr in arrays.values():
+                arr.tofile(f)
+
+    def load(path):
+        """Load an access matrix persisted with save
+
+        Args:
+            path (str): The path of the file
+        Returns:
+            AccessMatrix: The access matrix
+        """
+        matrix = AccessMatrix()
+        with gzip.open(path, "rb") as f:
+            header_length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_length).decode("utf-8"))
+
+            matrix.principal_ids = header["principal_ids"]
+            matrix.principal_names = header["principal_names"]
+            matrix.principal_types = header["principal_types"]
+            matrix.resource_ids = header["resource_ids"]
+            matrix.resource_names = header["resource_names"]
+            matrix.types = header["types"]
+            matrix.roles = header["roles"]
+            matrix.failed_resources = header.get("failed_resources", [])
+
+            for name, (typecode, length) in header["arrays"].items():
+                arr = array(typecode)
+                arr.frombytes(f.read(length * arr.itemsize))
+                if header["byteorder"] != sys.byteorder:
+                    arr.byteswap()
+                setattr(matrix, name, arr)
+
+        matrix._principal_index = {pid: i for i, pid in enumerate(matrix.principal_ids)}
+        matrix._resource_index = {rid: i for i, rid in enumerate(matrix.resource_ids)}
+        matrix._type_index = {t: i for i, t in enumerate(matrix.types)}
+        matrix._role_index = {r: i for i, r in enumerate(matrix.roles)}
+        return matrix
+
+    def _arrays(self):
+        return {
+            "resource_types": self.resource_types,
+            "resource_workspaces": self.resource_workspaces,
+            "_rel_principals": self._rel_principals,
+            "_rel_resources": self._rel_resources,
+            "_rel_roles": self._rel_roles
+        }
@@ -5,6 +5,8 @@ from msfabricpysdkcore.adminapi import FabricClientAdmin
 class AdminItem:
     """Class to represent a item in Microsoft Fabric"""
 
+    __slots__ = ("id", "type", "name", "workspace_id", "state", "description", "last_updated_date", "capacity_id", "creator_principal", "admin_client")
+
     def __init__(self, id, type, name, workspace_id, state, description, last_updated_date, capacity_id, creator_principal, admin_client: FabricClientAdmin) -> None:
         """Constructor for the Item class
         
@@ -8,6 +8,8 @@ from msfabricpysdkcore.adminapi import FabricClientAdmin
 class AdminWorkspace:
     """Class to represent a workspace in Microsoft Fabric"""
 
+    __slots__ = ("id", "type", "name", "state", "capacity_id", "admin_client")
+
     def __init__(self, id, type, name, state, capacity_id, admin_client:FabricClientAdmin) -> None:
         """Constructor for the Workspace class
 
@@ -10,17 +10,22 @@ class FabricClientAdmin(FabricClient):
     """FabricClientAdmin class to interact with Fabric Admin APIs"""
 
     def __init__(self, tenant_id = None, client_id = None, client_secret = None,
-                 username = None, password = None) -> None:
+                 username = None, password = None, base_url = None) -> None:
         """Initialize FabricClientAdmin object"""
         super().__init__(scope="https://api.fabric.microsoft.com/.default", 
                          tenant_id=tenant_id, client_id=client_id, client_secret=client_secret,
-                         username=username, password=password)
+                         username=username, password=password, base_url=base_url)
 
 
     def long_running_operation(self, response_headers):
         """Check the status of a long running operation"""
         from msfabricpysdkcore.coreapi import FabricClientCore
-        fc = FabricClientCore(tenant_id=self.tenant_id, client_id=self.client_id, client_secret=self.client_secret)
+        fc = FabricClientCore(tenant_id=self.tenant_id, client_id=self.client_id, client_secret=self.client_secret,
+                              base_url=self.base_url)
+        # Share the authentication, the hooks and the cassette so that the operation polling is instrumented and recorded as well
+        fc.auth = self.auth
+        fc._hooks = self._hooks
+        fc._cassette = self._cassette
 
         return fc.long_running_operation(response_headers)
 
@@ -174,7 +179,9 @@ class FabricClientAdmin(FabricClient):
 
         if workspace_objects:
             from msfabricpysdkcore import FabricClientCore
-            fc = FabricClientCore(tenant_id=self.tenant_id, client_id=self.client_id, client_secret=self.client_secret)
+            fc = FabricClientCore(tenant_id=self.tenant_id, client_id=self.client_id, client_secret=self.client_secret,
+                                  base_url=self.base_url)
+            fc.auth = self.auth
             workspaces = [fc.get_workspace_by_id(workspace["id"]) for workspace in workspaces]
 
         return workspaces
@@ -404,13 +411,14 @@ class FabricClientAdmin(FabricClient):
 
     # Items APIs
     
-    def get_item(self, item_id, workspace_id, type = None):
+    def get_item(self, item_id, workspace_id, type = None, raw = False):
         """Get an item from the workspace
         
         Args:
             item_id (str): The ID of the item
             workspace_id (str): The ID of the workspace
             type (str): The type of the item
+            raw (bool): Whether to return the item as a dictionary as returned by the API
         Returns:
             AdminItem: The item object
         """
@@ -422,6 +430,8 @@ class FabricClientAdmin(FabricClient):
 
         response_json: dict = self.calling_routine(url = url, operation = "GET", response_codes = [200, 429],
                                                    error_message = "Error getting item", return_format="json")
+        if raw:
+            return response_json
 
         return AdminItem.from_dict(response_json, self)
     
@@ -447,9 +457,17 @@ class FabricClientAdmin(FabricClient):
         return response_json
     
     def list_items(self, workspace_id = None, capacity_id = None, type=None,
-                   state=None):
+                   state=None, as_frame = False, as_arrow = False, raw = False):
         """List all items
 
+        Args:
+            workspace_id (str): The ID of the workspace
+            capacity_id (str): The ID of the capacity
+            type (str): The type of the items
+            state (str): The state of the items
+            as_frame (bool): Whether to return a pandas DataFrame with one column per field
+            as_arrow (bool): Whether to return a pyarrow Table with one column per field
+            raw (bool): Whether to return the items as dictionaries as returned by the API
         Returns:
             list: The list of items in the workspace
         """
@@ -478,93 +496,154 @@ class FabricClientAdmin(FabricClient):
             else:
                 url = f"{url}?state={state}"
 
+        if as_frame or as_arrow:
+            return self._list_columnar(url, error_message="Error listing items", return_format="itemEntities",
+                                       as_frame=as_frame, as_arrow=as_arrow)
+
         items = self.calling_routine(url = url, operation = "GET", response_codes = [200, 429],
                                      error_message = "Error listing items", return_format="itemEntities", paging=True)
+        if raw:
+            return items
 
         items =  [AdminItem.from_dict(item, self) for item in items]
         return items
     
+    # Bulk helpers
+
+    def _bulk_request(self, url, items, build_body, chunk_size, result_key, item_key, response_codes, error_message,
+                      max_workers = 4, calls_per_second = None):
+        """Split a bulk request into chunks, submit them concurrently and merge the per-item results
+        Args:
+            url (str): The URL of the bulk endpoint
+            items (list): The items of the bulk request
+            build_body (callable): Builds the request body for a chunk of items
+            chunk_size (int): The maximum number of items per request
+            result_key (str): The key of the per-item results in the response
+            item_key (str): The key identifying an item in the request and in the per-item results
+            response_codes (list): The response codes to expect
+            error_message (str): The error message
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        Returns:
+            dict: The merged per-item results under result_key and the items that need a retry under 'itemsToRetry'
+        """
+        from msfabricpysdkcore.util import RateLimiter, chunked, run_concurrently
+
+        rate_limiter = RateLimiter(calls_per_second)
+
+        def submit(chunk):
+            rate_limiter.acquire()
+            response = self.calling_routine(url = url, operation = "POST", body = build_body(chunk), response_codes = list(response_codes),
+                                            error_message = error_message, return_format="response+operation_result")
+            if isinstance(response, requests.Response):
+                return json.loads(response.text) if response.text else {}
+            return response
+
+        merged = []
+        to_retry = []
+        for chunk, response_json, exception in run_concurrently(submit, chunked(items, chunk_size), max_workers=max_workers):
+            if exception is not None:
+                self._logger.warning(f"{error_message} for a chunk of {len(chunk)} items: {exception}")
+                merged.extend({item_key: item.get(item_key), "status": "Failed", "error": str(exception)} for item in chunk)
+                to_retry.extend(chunk)
+                continue
+
+            results = self._bulk_item_results(response_json, result_key)
+            merged.extend(results)
+            if not any("status" in result for result in results):
+                continue
+            statuses = {result.get(item_key): result.get("status") for result in results}
+            for item in chunk:
+                status = statuses.get(item.get(item_key))
+                if status is None or status == "Failed":
+                    to_retry.append(item)
+
+        return {result_key: merged, "itemsToRetry": to_retry}
+
+    def _bulk_item_results(self, response_json, result_key):
+        """Get the per-item results of a bulk response"""
+        if not isinstance(response_json, dict):
+            return []
+        if isinstance(response_json.get(result_key), list):
+            return response_json[result_key]
+        for value in response_json.values():
+            if isinstance(value, list) and value and isinstance(value[0], dict) and "status" in value[0]:
+                return value
+        return []
+
     # Labels APIs
 
       
-    def bulk_remove_labels(self, items):
+    def bulk_remove_labels(self, items, chunk_size = 2000, max_workers = 4, calls_per_second = None):
         """Remove labels in bulk
         Args:
-            items (list): The list of item IDs  
+            items (list): The list of item IDs
+            chunk_size (int): The maximum number of items per request
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
         Returns:
-            dict: The response from the API"""
+            dict: The per-item status under 'itemsChangeLabelStatus' and the items that need a retry under 'itemsToRetry'"""
 
         url = "https://api.fabric.microsoft.com/v1/admin/items/bulkRemoveLabels"
 
-        if len(items) > 2000:
-            self.bulk_remove_labels(items[2000:])
-            items = items[:2000]
-        
-        body = {
-            "items": items
-        }
-
-        response_json: dict = self.calling_routine(url = url, operation = "POST", body = body, response_codes = [200, 429],
-                                                   error_message = "Error removing labels", return_format="json")
-
-        return response_json
+        return self._bulk_request(url = url, items = items, build_body = lambda chunk: {"items": chunk},
+                                  chunk_size = chunk_size, result_key = "itemsChangeLabelStatus", item_key = "id",
+                                  response_codes = [200, 429], error_message = "Error removing labels",
+                                  max_workers = max_workers, calls_per_second = calls_per_second)
       
-    def bulk_set_labels(self, items, label_id, assignment_method = None, delegated_principal = None):
+    def bulk_set_labels(self, items, label_id, assignment_method = None, delegated_principal = None,
+                        chunk_size = 2000, max_workers = 4, calls_per_second = None):
         """Set labels in bulk
         Args:
             items (list): The list of item IDs
             label_id (str): The ID of the label
             assignment_method (str): The assignment method
             delegated_principal (str): The delegated principal
+            chunk_size (int): The maximum number of items per request
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
         Returns:
-            dict: The response from the API
+            dict: The per-item status under 'itemsChangeLabelStatus' and the items that need a retry under 'itemsToRetry'
         """
 
         url = "https://api.fabric.microsoft.com/v1/admin/items/bulkSetLabels"
 
-        if len(items) > 2000:
-            self.bulk_set_labels(items[2000:], label_id, assignment_method, delegated_principal)
-            items = items[:2000]
-
-        body = {
-            "items": items,
-            "labelId": label_id
-        }
-        if assignment_method:
-            body["assignmentMethod"] = assignment_method
-
-        if delegated_principal:
-            body["delegatedPrincipal"] = delegated_principal
-
-        response_json: dict = self.calling_routine(url = url, operation = "POST", body = body, response_codes = [200, 429],
-                                                   error_message = "Error setting labels", return_format="json")
-
-        return response_json
+        def build_body(chunk):
+            body = {
+                "items": chunk,
+                "labelId": label_id
+            }
+            if assignment_method:
+                body["assignmentMethod"] = assignment_method
+
+            if delegated_principal:
+                body["delegatedPrincipal"] = delegated_principal
+            return body
+
+        return self._bulk_request(url = url, items = items, build_body = build_body,
+                                  chunk_size = chunk_size, result_key = "itemsChangeLabelStatus", item_key = "id",
+                                  response_codes = [200, 429], error_message = "Error setting labels",
+                                  max_workers = max_workers, calls_per_second = calls_per_second)
     
     # POST https://api.fabric.microsoft.com/v1/admin/items/bulkRemoveSharingLinks
-    def bulk_remove_sharing_links(self, items, sharing_link_type):
+    def bulk_remove_sharing_links(self, items, sharing_link_type, chunk_size = 500, max_workers = 4, calls_per_second = None):
         """Remove sharing links in bulk
         Args:
             items (list): The list of item IDs
             sharing_link_type (str): The type of the sharing link
+            chunk_size (int): The maximum number of items per request
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
         Returns:
-            Response: The response from the API
+            dict: The per-item status under 'itemsChangeSharingLinksStatus' and the items that need a retry under 'itemsToRetry'
         """
         url = "https://api.fabric.microsoft.com/v1/admin/items/bulkRemoveSharingLinks"
 
-        if len(items) > 500:
-            self.bulk_remove_sharing_links(items = items[500:], sharing_link_type = sharing_link_type)
-            items = items[:500]
-
-        body = {
-            "items": items,
-            "sharingLinkType": sharing_link_type
-        }
-
-        response = self.calling_routine(url = url, operation = "POST", body = body, response_codes = [200, 202, 429],
-                                                   error_message = "Error removing sharing links", return_format="response")
-
-        return response
+        return self._bulk_request(url = url, items = items,
+                                  build_body = lambda chunk: {"items": chunk, "sharingLinkType": sharing_link_type},
+                                  chunk_size = chunk_size, result_key = "itemsChangeSharingLinksStatus", item_key = "id",
+                                  response_codes = [200, 202, 429], error_message = "Error removing sharing links",
+                                  max_workers = max_workers, calls_per_second = calls_per_second)
     
     # POST https://api.fabric.microsoft.com/v1/admin/items/removeAllSharingLinks
     def remove_all_sharing_links(self, sharing_link_type):
@@ -588,24 +667,23 @@ class FabricClientAdmin(FabricClient):
     # Tags APIs
 
     #POST https://api.fabric.microsoft.com/v1/admin/tags/bulkCreateTags
-    def bulk_create_tags(self, create_tags_request):
+    def bulk_create_tags(self, create_tags_request, chunk_size = 100, max_workers = 4, calls_per_second = None):
         """Create tags in bulk
         Args:
             create_tags_request (list): The request body
+            chunk_size (int): The maximum number of tags per request
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
         Returns:
-            dict: The response from the API
+            dict: The created tags under 'tags' and the tag requests that need a retry under 'itemsToRetry'
         """
         url = "https://api.fabric.microsoft.com/v1/admin/tags/bulkCreateTags"
 
-        body = {
-            "createTagsRequest": create_tags_request
-        }
-
-        response_json: dict = self.calling_routine(url = url, operation = "POST", body = body,
-                                                   response_codes = [201, 429], error_message = "Error creating tags",
-                                                   return_format="json")
-
-        return response_json
+        return self._bulk_request(url = url, items = create_tags_request,
+                                  build_body = lambda chunk: {"createTagsRequest": chunk},
+                                  chunk_size = chunk_size, result_key = "tags", item_key = "displayName",
+                                  response_codes = [201, 429], error_message = "Error creating tags",
+                                  max_workers = max_workers, calls_per_second = calls_per_second)
     
     # DELETE https://api.fabric.microsoft.com/v1/admin/tags/{tagId}
     def delete_tag(self, tag_id):
@@ -846,13 +924,69 @@ class FabricClientAdmin(FabricClient):
                 
         return access_entities
 
+    def build_access_matrix(self, workspace_ids = None, include_items = True, max_workers = 8):
+        """Build a compact access matrix from the workspace and item access details
+
+        Args:
+            workspace_ids (list): The IDs of the workspaces to include, all workspaces of the tenant if None
+            include_items (bool): Whether to include the access details of the items in the workspaces
+            max_workers (int): The maximum number of parallel requests
+        Returns:
+            AccessMatrix: The access matrix
+        """
+        from msfabricpysdkcore.access_matrix import AccessMatrix
+        from msfabricpysdkcore.util import iter_concurrently
+
+        matrix = AccessMatrix()
+
+        workspace_names = {}
+        if workspace_ids is None:
+            workspaces = self.list_workspaces()
+            workspace_ids = [ws.id for ws in workspaces]
+            workspace_names = {ws.id: ws.name for ws in workspaces}
+
+        for workspace_id, access_details, exception in iter_concurrently(self.list_workspace_access_details,
+                                                                         workspace_ids, max_workers=max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not get access details of workspace {workspace_id}: {exception}")
+                matrix.failed_resources.append(workspace_id)
+                continue
+            matrix.add_workspace_access_details(workspace_id, access_details, name=workspace_names.get(workspace_id))
+
+        if not include_items:
+            return matrix
+
+        if workspace_names:
+            items = self.list_items()
+        else:
+            items = []
+            for workspace_id, ws_items, exception in iter_concurrently(lambda ws_id: self.list_items(workspace_id=ws_id),
+                                                                       workspace_ids, max_workers=max_workers):
+                if exception is not None:
+                    self._logger.warning(f"Could not list items of workspace {workspace_id}: {exception}")
+                    continue
+                items.extend(ws_items)
+
+        def get_item_access_details(item):
+            return self.list_item_access_details(workspace_id=item.workspace_id, item_id=item.id)
+
+        for item, access_details, exception in iter_concurrently(get_item_access_details, items, max_workers=max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not get access details of item {item.id}: {exception}")
+                matrix.failed_resources.append(item.id)
+                continue
+            matrix.add_item_access_details(item.workspace_id, item.id, access_details, type=item.type, name=item.name)
+
+        return matrix
+
     # Workspaces APIs
     
-    def get_workspace(self, workspace_id):
+    def get_workspace(self, workspace_id, raw = False):
         """Get a workspace by ID
         
         Args:
             workspace_id (str): The ID of the workspace
+            raw (bool): Whether to return the workspace as a dictionary as returned by the API
         Returns:
             Workspace: The Workspace object
         """
@@ -862,6 +996,8 @@ class FabricClientAdmin(FabricClient):
 
         response_json: dict = self.calling_routine(url = url, operation = "GET", response_codes = [200, 429],
                                                    error_message = "Error getting workspace", return_format="json")
+        if raw:
+            return response_json
     
         workspace = AdminWorkspace.from_dict(response_json, self)
         return workspace
@@ -894,11 +1030,12 @@ class FabricClientAdmin(FabricClient):
         return response_json
     
 
-    def list_workspaces(self, capacity_id = None, name=None, state=None, type=None, continuationToken = None):
+    def list_workspaces(self, capacity_id = None, name=None, state=None, type=None, continuationToken = None, raw = False):
         """List all workspaces
         
         Args:
             capacity_id (str): The ID of the capacity
+            raw (bool): Whether to return the workspaces as dictionaries as returned by the API
         Returns:
             list: List of Workspace objects
         """
@@ -932,6 +1069,8 @@ class FabricClientAdmin(FabricClient):
 
         workspaces: list = self.calling_routine(url = url, operation = "GET", response_codes = [200, 429],
                                                 error_message = "Error listing workspaces", return_format="workspaces", paging=True)
+        if raw:
+            return workspaces
 
         workspaces = [AdminWorkspace.from_dict(i, self) for i in workspaces]
 
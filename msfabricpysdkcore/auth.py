@@ -125,4 +125,16 @@ class MSALConfidentialClientApplicationAuthentication(FabricAuth):
             password=self.password,
             scopes=self.scopes,
         )
-        return result["access_token"]
\ No newline at end of file
+        return result["access_token"]
+
+class FabricStaticTokenAuthentication(FabricAuth):
+    """FabricStaticTokenAuthentication class to authenticate with a fixed access token, e.g. against a local stand-in server"""
+
+    def __init__(self, token, scope = None):
+        super().__init__(scope)
+        self._logger.info("Using a static access token for authentication")
+        self.token = token
+
+    def get_token(self):
+        """Return the static token"""
+        return self.token
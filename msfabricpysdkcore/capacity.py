@@ -3,6 +3,8 @@ import json
 class Capacity:
     """Class to represent a capacity in Microsoft Fabric"""
 
+    __slots__ = ("id", "display_name", "sku", "region", "state")
+
 
     def __init__(self, id, display_name, sku, region, state):
         """Constructor for the Capacity class
@@ -0,0 +1,294 @@
+import base64
+import gzip
+import io
+import json
+import logging
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from time import perf_counter, sleep
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from msfabricpysdkcore.util import logger
+
+SCRUBBED = "***"
+
+# Keys of JSON bodies and query parameters whose values are secrets
+_SECRET_KEY = re.compile(r"^(?!continuationtoken$)(key|.*(token|secret|password|passwd|credential|connectionstring|sig|apikey|accountkey))$",
+                         re.IGNORECASE)
+# Keys of JSON bodies whose objects are credentials, all their strings but the credential type are secrets
+_CREDENTIALS_KEY = re.compile(r"^(credentials|credentialdetails)$", re.IGNORECASE)
+
+# Response headers needed to replay paging, long running operations, throttling and ETags
+_KEPT_HEADERS = ("Content-Type", "Location", "x-ms-operation-id", "Retry-After", "ETag")
+
+
+def _scrub(value, credentials = False):
+    """Replace the values of secret keys in a JSON value, or all strings but the credential type of credentials"""
+    if isinstance(value, dict):
+        scrubbed = {}
+        for key, item in value.items():
+            if isinstance(item, str) and (_SECRET_KEY.search(key) or (credentials and key != "credentialType")):
+                scrubbed[key] = SCRUBBED
+            else:
+                scrubbed[key] = _scrub(item, credentials or bool(_CREDENTIALS_KEY.search(key)))
+        return scrubbed
+    if isinstance(value, list):
+        return [_scrub(v, credentials) for v in value]
+    return value
+
+
+def _scrub_url(url):
+    """Replace the values of secret query parameters of a URL"""
+    split = urlsplit(url)
+    if not split.query:
+        return url
+    query = [(key, SCRUBBED if _SECRET_KEY.search(key) else value) for key, value in parse_qsl(split.query, keep_blank_values=True)]
+    return split._replace(query=urlencode(query, safe="*")).geturl()
+
+
+def _request_key(url):
+    """Path and query of a URL, so that cassettes replay against any base URL"""
+    split = urlsplit(_scrub_url(url))
+    return f"{split.path}?{split.query}" if split.query else split.path
+
+
+def _record_content(entry, content):
+    """Store a response body in a cassette entry, scrubbing JSON bodies"""
+    try:
+        entry["content"] = json.dumps(_scrub(json.loads(content)), separators=(",", ":")) if content else ""
+    except ValueError:
+        try:
+            entry["content"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["content_base64"] = base64.b64encode(content).decode()
+
+
+class _TeeRaw:
+    """Wrapper of the raw body of a streamed response that records the chunks as the caller reads them"""
+
+    def __init__(self, raw, entry, lock) -> None:
+        self._raw = raw
+        self._entry = entry
+        self._lock = lock
+        self._chunks = []
+        self._done = False
+
+    def _tee(self, chunk):
+        if chunk:
+            self._chunks.append(chunk)
+        return chunk
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        with self._lock:
+            _record_content(self._entry, b"".join(self._chunks))
+
+    def stream(self, amt = None, decode_content = None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            yield self._tee(chunk)
+        self._finish()
+
+    def read(self, *args, **kwargs):
+        chunk = self._tee(self._raw.read(*args, **kwargs))
+        if not chunk:
+            self._finish()
+        return chunk
+
+    def close(self):
+        # A body closed before its end is recorded as far as it was read
+        self._finish()
+        self._raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class Cassette:
+    """Class to record HTTP responses of a client to a file and replay them without network
+
+    A cassette is a gzipped JSON lines file with one request/response pair per line. Authorization headers
+    are never written and secrets in bodies and query strings (tokens, passwords, keys, SAS signatures) are scrubbed.
+    Replayed requests are matched by method, path, query and body, in recorded order.
+    """
+
+    _logger: logging.Logger
+
+    def __init__(self, path, mode = "replay", latency = None) -> None:
+        """Initialize the Cassette object
+
+        Args:
+            path (str): The path of the cassette file
+            mode (str): "record" or "replay"
+            latency (float or str): The simulated latency in seconds of replayed responses, "recorded" for the recorded latencies
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode {mode}, expected 'record' or 'replay'")
+        self._logger = logger.getChild(__name__)
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._client = None
+        self._auth = None
+
+        self.entries = []
+        self._queues = {}
+        self._played = set()
+        if mode == "replay":
+            self.entries = Cassette.load(path)
+            for index, entry in enumerate(self.entries):
+                self._queues.setdefault((entry["method"], entry["url"], entry["body"]), deque()).append(index)
+                self._queues.setdefault((entry["method"], entry["url"]), deque()).append(index)
+
+    def load(path):
+        """Load the entries of a cassette file
+
+        Args:
+            path (str): The path of the cassette file
+        Returns:
+            list: The recorded request/response pairs
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != 1:
+                raise ValueError(f"Unsupported cassette version {header.get('version')}")
+            return [json.loads(line) for line in f if line.strip()]
+
+    def save(self):
+        """Write the recorded entries to the cassette file"""
+        with self._lock:
+            entries = list(self.entries)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            header = {"version": 1, "recorded": datetime.now(timezone.utc).isoformat(), "entries": len(entries)}
+            f.write(json.dumps(header) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    # Binding
+
+    def bind(self, client):
+        """Route the HTTP requests of a client through the cassette
+
+        Args:
+            client (FabricClient): The client
+        Returns:
+            Cassette: The cassette
+        """
+        if client._cassette is not None:
+            raise Exception("The client already uses a cassette")
+        client._cassette = self
+        self._client = client
+        if self.mode == "replay":
+            from msfabricpysdkcore.auth import FabricStaticTokenAuthentication
+
+            # No token is needed to replay, avoid calling Entra ID
+            self._auth = client.auth
+            client.auth = FabricStaticTokenAuthentication(SCRUBBED, scope=client.scope)
+        return self
+
+    def close(self):
+        """Stop routing the requests of the client through the cassette and write the recording"""
+        if self._client is None:
+            return
+        self._client._cassette = None
+        if self._auth is not None:
+            self._client.auth = self._auth
+            self._auth = None
+        self._client = None
+        if self.mode == "record":
+            self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Transport
+
+    def send(self, transport, operation, url, headers, body = None, file_path = None, progress_callback = None, stream = False):
+        """Record or replay a request
+
+        Args:
+            transport (callable): The function sending the request over HTTP
+            operation (str): The operation to perform
+            url (str): The URL of the API
+            headers (dict): The headers of the request
+            body (dict): The body of the request
+            file_path (str): The path of a file to upload
+            progress_callback (callable): Called with the bytes sent and the total bytes while a file is uploaded
+            stream (bool): Whether to leave the response body unread, streamed bodies are recorded as they are read
+        Returns:
+            requests.Response: The response
+        """
+        body_key = json.dumps(_scrub(body), sort_keys=True, separators=(",", ":")) if body is not None else None
+        if self.mode == "replay":
+            return self._replay(operation, url, body, body_key)
+
+        start_time = perf_counter()
+        response = transport(operation=operation, url=url, headers=headers, body=body, file_path=file_path,
+                             progress_callback=progress_callback, stream=stream)
+        elapsed = perf_counter() - start_time
+
+        entry = {"method": operation, "url": _request_key(url), "body": body_key, "status": response.status_code,
+                 "headers": {key: _scrub_url(response.headers[key]) if key == "Location" else response.headers[key]
+                             for key in _KEPT_HEADERS if key in response.headers},
+                 "elapsed": round(elapsed, 4), "content": ""}
+        if stream and response.raw is not None:
+            # Record the body while the caller streams it, the entry keeps its place in the recorded order
+            response.raw = _TeeRaw(response.raw, entry, self._lock)
+        else:
+            _record_content(entry, response.content)
+        with self._lock:
+            self.entries.append(entry)
+        return response
+
+    def _replay(self, operation, url, body, body_key):
+        request_key = _request_key(url)
+        with self._lock:
+            index = self._next((operation, request_key, body_key))
+            if index is None:
+                index = self._next((operation, request_key))
+            if index is None:
+                raise Exception(f"No recorded response left for {operation} {request_key} in cassette {self.path}")
+            self._played.add(index)
+        entry = self.entries[index]
+
+        if self.latency == "recorded":
+            sleep(entry["elapsed"])
+        elif self.latency:
+            sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = url
+        response.request = requests.Request(operation, url, json=body).prepare()
+        if "content_base64" in entry:
+            content = base64.b64decode(entry["content_base64"])
+        else:
+            content = entry["content"].encode("utf-8")
+        # Served from a raw body, so that streamed reads and close work like on a live response
+        response.raw = io.BytesIO(content)
+        response.encoding = "utf-8"
+        return response
+
+    def _next(self, key):
+        queue = self._queues.get(key)
+        while queue:
+            index = queue.popleft()
+            if index not in self._played:
+                return index
+        return None
+
+    @property
+    def unplayed(self):
+        """The recorded entries that were not replayed, e.g. calls the code under test no longer makes"""
+        return [entry for index, entry in enumerate(self.entries) if index not in self._played]
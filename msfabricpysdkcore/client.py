@@ -2,22 +2,62 @@ import logging
 from abc import abstractmethod
 import os
 from warnings import warn
-from time import sleep
+from time import sleep, perf_counter
 import requests
 import json
 
 from msfabricpysdkcore.auth import FabricAuthClient, FabricServicePrincipal, FabricSparkUtilsAuthentication, MSALConfidentialClientApplicationAuthentication
 from msfabricpysdkcore.util import logger
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(content):
+    """Decode a JSON response body, with orjson if it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class _FileUploadStream:
+    """File-like request body that streams a file from disk and reports the upload progress"""
+
+    def __init__(self, f, progress_callback = None) -> None:
+        self._file = f
+        self._progress_callback = progress_callback
+        self._total = os.fstat(f.fileno()).st_size
+        self._sent = 0
+
+    def __len__(self):
+        return self._total
+
+    def read(self, size = -1):
+        chunk = self._file.read(size)
+        if chunk and self._progress_callback is not None:
+            self._sent += len(chunk)
+            self._progress_callback(self._sent, self._total)
+        return chunk
+
 
 class FabricClient():
     """FabricClient class to interact with Fabric API"""
 
     _logger: logging.Logger
 
-    def __init__(self, scope, tenant_id = None, client_id = None, client_secret = None, username = None, password = None, silent=None) -> None:
+    DEFAULT_BASE_URL = "https://api.fabric.microsoft.com"
+
+    def __init__(self, scope, tenant_id = None, client_id = None, client_secret = None, username = None, password = None, silent=None,
+                 base_url = None) -> None:
         """Initialize FabricClient object"""
 
         self._logger = logger.getChild(__name__)
+        self._hooks = []
+        self._cassette = None
+
+        base_url = base_url if base_url else os.getenv("FABRIC_API_BASE_URL")
+        self.base_url = base_url.rstrip("/") if base_url else self.DEFAULT_BASE_URL
 
         self.tenant_id = tenant_id if tenant_id else os.getenv("FABRIC_TENANT_ID")
         self.client_id = client_id if client_id else os.getenv("FABRIC_CLIENT_ID")
@@ -55,21 +95,27 @@ class FabricClient():
 
     def calling_routine(self, url, operation, body = None, headers=None, file_path = None, response_codes = [200], error_message = "Error",
                         continue_on_error_code = False, return_format = "value_json", paging = False,
-                        wait_for_completion = True, continuation_token = None):
+                        wait_for_completion = True, continuation_token = None, progress_callback = None,
+                        stream = False):
         """Routine to make API calls
         Args:
             url (str): The URL of the API
             operation (str): The operation to perform
             body (dict): The body of the request
+            file_path (str): The path of a file to upload
             response_codes (list): The response codes to expect
             error_message (str): The error message
             continue_on_error_code (bool): Whether to continue on error code
             return_format (str): The format of the return
             paging (bool): Whether to paginate
             wait_for_completion (bool): Whether to wait for the operation to complete
+            progress_callback (callable): Called with the bytes sent and the total bytes while a file is uploaded
+            stream (bool): Whether to leave the response body unread, to be consumed with response.iter_content
         Returns:
             dict: The response
         """
+        if self.base_url != self.DEFAULT_BASE_URL and url.startswith(self.DEFAULT_BASE_URL):
+            url = self.base_url + url[len(self.DEFAULT_BASE_URL):]
         original_url = url
 
         if continuation_token:
@@ -83,42 +129,33 @@ class FabricClient():
         response_codes.append(429)
         if headers is None:
             headers = self.auth.get_headers()
-        for _ in range(10):
-            if operation == "GET":
-                response = requests.get(url=url, headers=headers)
-            elif operation == "PATCH":
-                if body is None:
-                    response = requests.patch(url=url, headers=headers)
-                else:
-                    response = requests.patch(url=url, headers=headers, json=body)
-            elif operation == "POST":
-                if body is not None:
-                    response = requests.post(url=url, headers=headers, json=body)
-                elif file_path is not None:
-                    if headers.get('Content-Type', None) == 'application/octet-stream':
-                        headers['Content-Disposition'] = f'attachment; filename="{file_path}"'
-                        with open(file_path, 'rb') as f:
-                            file_content = f.read()
-                        response = requests.post(url, data=file_content, headers=headers)
-                    else:
-                        headers.pop('Content-Type')
-                        with open(file_path, 'rb') as f:
-                            files = {"file": f}
-                            response = requests.post(url=url, files=files, headers=headers)
-                else:
-                    response = requests.post(url=url, headers=headers)
-            elif operation == "PUT":
-                if body is None:
-                    response = requests.put(url=url, headers=headers)
-                else:
-                    response = requests.put(url=url, headers=headers, json=body)
-            elif operation == "DELETE":
-                response = requests.delete(url=url, headers=headers)
-            else:
-                raise ValueError("Invalid operation")
+        for attempt in range(10):
+            if attempt > 0:
+                self._emit("retry", method=operation, url=url, retry_count=attempt)
+            self._emit("request_start", method=operation, url=url, retry_count=attempt)
+            start_time = perf_counter()
+            try:
+                response = self._send(operation=operation, url=url, headers=headers, body=body, file_path=file_path,
+                                      progress_callback=progress_callback, stream=stream)
+            except Exception as e:
+                # End the attempt for the hooks before the error propagates, e.g. connection errors and timeouts
+                self._emit("request_end", method=operation, url=url, latency=perf_counter() - start_time,
+                           retry_count=attempt, error=e)
+                raise
+            if self._hooks:
+                request_body = response.request.body if response.request is not None else None
+                # Do not read a streamed body, rely on its announced length
+                bytes_in = int(response.headers.get("Content-Length", 0)) if stream else len(response.content or b"")
+                self._emit("request_end", method=operation, url=url, status_code=response.status_code,
+                           latency=perf_counter() - start_time, bytes_in=bytes_in,
+                           bytes_out=len(request_body) if isinstance(request_body, (bytes, str, _FileUploadStream)) else 0,
+                           retry_count=attempt)
             if response.status_code == 429:
-                self._logger.info("Too many requests, waiting 10 seconds")
-                sleep(10)
+                wait = self._retry_after(response)
+                self._logger.info(f"Too many requests, waiting {wait} seconds")
+                self._emit("throttle", method=operation, url=url, status_code=429, wait=wait, retry_count=attempt)
+                response.close()
+                sleep(wait)
                 continue
             elif response.status_code == 202:
                 if wait_for_completion:
@@ -135,37 +172,231 @@ class FabricClient():
             break
 
         if paging:
-            resp_dict = json.loads(response.text)
-
-            if return_format in ["data", "itemEntities", "Overrides", "accessEntities", "workspaces","libraries"]:
-                items = resp_dict[return_format]
-            else:
-                items = resp_dict["value"]
+            resp_dict = _loads(response.content)
+            items = self._page_entries(resp_dict, return_format)
 
-                
             if "continuationUri" in resp_dict and resp_dict["continuationUri"]:
-                continuation_uri = resp_dict["continuationUri"]
-
-                items_next = self.calling_routine(url=continuation_uri, operation=operation, body=body, headers=headers,
-                                                  response_codes=response_codes,
-                                                  error_message=error_message,
-                                                  return_format=return_format, paging=True, wait_for_completion=wait_for_completion)
-                items.extend(items_next)
+                for page in self._iter_pages(resp_dict["continuationUri"], operation=operation, body=body, headers=headers,
+                                             response_codes=response_codes, error_message=error_message,
+                                             return_format=return_format, wait_for_completion=wait_for_completion):
+                    items.extend(page)
             if "etag" in return_format:
                 return items, response.headers.get('ETag')
             return items
 
         if "value_json" in return_format:
-            resp_dict = json.loads(response.text)
+            resp_dict = _loads(response.content)
             if "etag" in return_format:
                 return resp_dict["value"], response.headers.get('ETag')	
             return resp_dict["value"]
         
         if "json" in return_format:
-            return json.loads(response.text)
+            return _loads(response.content)
 
         return response
     
+    def _page_entries(self, resp_dict, return_format):
+        """Get the entries of a page of a paged response"""
+        if return_format in ["data", "itemEntities", "Overrides", "accessEntities", "workspaces","libraries"]:
+            return resp_dict[return_format]
+        return resp_dict["value"]
+
+    def _iter_pages(self, url, operation = "GET", body = None, headers = None, response_codes = [200], error_message = "Error",
+                    return_format = "value_json", wait_for_completion = True):
+        """Iterate over the pages of a paged API, following the continuationUri of every page
+        Args:
+            url (str): The URL of the first page
+            operation (str): The operation to perform
+            body (dict): The body of the request
+            headers (dict): The headers of the request
+            response_codes (list): The response codes to expect
+            error_message (str): The error message
+            return_format (str): The key of the entries in the pages, "value" if not one of the known keys
+            wait_for_completion (bool): Whether to wait for the operation to complete
+        Returns:
+            generator: The list of entries of every page
+        """
+        while url:
+            response = self.calling_routine(url=url, operation=operation, body=body, headers=headers,
+                                            response_codes=list(response_codes), error_message=error_message,
+                                            return_format="response", wait_for_completion=wait_for_completion)
+            resp_dict = _loads(response.content)
+            yield self._page_entries(resp_dict, return_format)
+            url = resp_dict.get("continuationUri")
+
+    def _list_columnar(self, url, error_message, return_format = "value_json", as_frame = False, as_arrow = False):
+        """List a paged API into columns, page by page, without building model objects
+        Args:
+            url (str): The URL of the first page
+            error_message (str): The error message
+            return_format (str): The key of the entries in the pages
+            as_frame (bool): Whether to return a pandas DataFrame
+            as_arrow (bool): Whether to return a pyarrow Table
+        Returns:
+            pandas.DataFrame or pyarrow.Table: The entries with one column per field
+        """
+        from msfabricpysdkcore.util.columnar import ColumnarBuilder, require_columnar
+
+        require_columnar(as_frame=as_frame, as_arrow=as_arrow)
+        builder = ColumnarBuilder()
+        for page in self._iter_pages(url, response_codes=[200, 429], error_message=error_message, return_format=return_format):
+            builder.append(page)
+        if as_arrow:
+            return builder.to_arrow()
+        return builder.to_frame()
+
+    def _send(self, operation, url, headers, body = None, file_path = None, progress_callback = None, stream = False):
+        """Send a single HTTP request, through the active cassette if there is one
+        Args:
+            operation (str): The operation to perform
+            url (str): The URL of the API
+            headers (dict): The headers of the request
+            body (dict): The body of the request
+            file_path (str): The path of a file to upload
+            progress_callback (callable): Called with the bytes sent and the total bytes while a file is uploaded
+            stream (bool): Whether to leave the response body unread
+        Returns:
+            requests.Response: The response
+        """
+        if self._cassette is not None:
+            return self._cassette.send(self._send_http, operation=operation, url=url, headers=headers, body=body, file_path=file_path,
+                                       progress_callback=progress_callback, stream=stream)
+        return self._send_http(operation=operation, url=url, headers=headers, body=body, file_path=file_path,
+                               progress_callback=progress_callback, stream=stream)
+
+    def _send_http(self, operation, url, headers, body = None, file_path = None, progress_callback = None, stream = False):
+        """Send a single HTTP request
+        Args:
+            operation (str): The operation to perform
+            url (str): The URL of the API
+            headers (dict): The headers of the request
+            body (dict): The body of the request
+            file_path (str): The path of a file to upload
+            progress_callback (callable): Called with the bytes sent and the total bytes while a file is uploaded
+            stream (bool): Whether to leave the response body unread
+        Returns:
+            requests.Response: The response
+        """
+        if operation == "GET":
+            response = requests.get(url=url, headers=headers, stream=stream)
+        elif operation == "PATCH":
+            if body is None:
+                response = requests.patch(url=url, headers=headers)
+            else:
+                response = requests.patch(url=url, headers=headers, json=body)
+        elif operation == "POST":
+            if body is not None:
+                response = requests.post(url=url, headers=headers, json=body)
+            elif file_path is not None:
+                if headers.get('Content-Type', None) == 'application/octet-stream':
+                    headers['Content-Disposition'] = f'attachment; filename="{file_path}"'
+                    # Stream the file from disk instead of reading it into memory
+                    with open(file_path, 'rb') as f:
+                        response = requests.post(url, data=_FileUploadStream(f, progress_callback), headers=headers)
+                else:
+                    headers.pop('Content-Type')
+                    with open(file_path, 'rb') as f:
+                        files = {"file": f}
+                        response = requests.post(url=url, files=files, headers=headers)
+            else:
+                response = requests.post(url=url, headers=headers, stream=stream)
+        elif operation == "PUT":
+            if body is None:
+                response = requests.put(url=url, headers=headers)
+            else:
+                response = requests.put(url=url, headers=headers, json=body)
+        elif operation == "DELETE":
+            response = requests.delete(url=url, headers=headers)
+        else:
+            raise ValueError("Invalid operation")
+        return response
+
+    def _retry_after(self, response, default = 10):
+        """Get the number of seconds to wait from the Retry-After header of a throttled response"""
+        retry_after = response.headers.get("Retry-After")
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            return default
+
+    def use_cassette(self, path, mode = "replay", latency = None):
+        """Record the HTTP responses of the client to a cassette file or replay them from it
+
+        Use it as a context manager:
+
+            with fc.use_cassette("provisioning.cassette", mode="record"):
+                ...
+
+        Args:
+            path (str): The path of the cassette file
+            mode (str): "record" to call the API and write the responses, "replay" to serve the recorded responses without network
+            latency (float or str): The simulated latency in seconds of replayed responses, "recorded" for the recorded latencies
+        Returns:
+            Cassette: The cassette, active until the end of the with block
+        """
+        from msfabricpysdkcore.cassette import Cassette
+
+        return Cassette(path, mode=mode, latency=latency).bind(self)
+
+    # Instrumentation
+
+    def add_hook(self, hook, events = None):
+        """Register a hook that is called with a RequestEvent for every instrumentation event
+        Args:
+            hook (callable): The hook, called with a RequestEvent, e.g. a MetricsCollector
+            events (list): The event types to receive, all of request_start, request_end, retry, throttle and lro_poll if None
+        Returns:
+            callable: The registered hook
+        """
+        from msfabricpysdkcore.instrumentation import EVENT_TYPES
+
+        events = tuple(events) if events else EVENT_TYPES
+        unknown = set(events) - set(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown event types {sorted(unknown)}, expected some of {EVENT_TYPES}")
+        self._hooks.append((hook, events))
+        return hook
+
+    def call_budget(self, max_calls = None, max_calls_per_endpoint = None, fanout_threshold = 5, raise_on_exceed = True):
+        """Count the HTTP calls made within a with block per endpoint and flag N+1 patterns
+
+        Args:
+            max_calls (int): The maximum number of calls, unlimited if None
+            max_calls_per_endpoint (int): The maximum number of calls per endpoint template, unlimited if None
+            fanout_threshold (int): The number of calls to one endpoint template with different IDs from which they are reported as a fan-out
+            raise_on_exceed (bool): Whether to raise CallBudgetExceeded before a call exceeding the budget
+        Returns:
+            CallBudget: The call budget context manager
+        """
+        from msfabricpysdkcore.instrumentation import CallBudget
+
+        return CallBudget(self, max_calls=max_calls, max_calls_per_endpoint=max_calls_per_endpoint,
+                          fanout_threshold=fanout_threshold, raise_on_exceed=raise_on_exceed)
+
+    def remove_hook(self, hook):
+        """Remove a registered hook
+        Args:
+            hook (callable): The hook to remove
+        """
+        self._hooks[:] = [(h, events) for h, events in self._hooks if h is not hook]
+
+    def _emit(self, event_type, **kwargs):
+        """Call the registered hooks for an event"""
+        if not self._hooks:
+            return
+        from msfabricpysdkcore.instrumentation import CallBudgetExceeded, RequestEvent
+
+        event = RequestEvent(type=event_type, **kwargs)
+        for hook, events in list(self._hooks):
+            if event_type not in events:
+                continue
+            try:
+                hook(event)
+            except CallBudgetExceeded:
+                raise
+            except Exception as e:
+                self._logger.warning(f"Instrumentation hook {hook} failed: {e}")
+
     @abstractmethod
     def long_running_operation(self, headers):
         """Long running operation"""
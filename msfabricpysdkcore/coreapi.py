@@ -1,5 +1,5 @@
 import json
-from time import sleep
+from time import monotonic, sleep
 from warnings import warn
 
 from msfabricpysdkcore.client import FabricClient
@@ -10,14 +10,15 @@ class FabricClientCore(FabricClient):
     """FabricClientCore class to interact with Fabric Core APIs"""
 
     def __init__(self, tenant_id = None, client_id = None, client_secret = None,
-                 username = None, password = None, silent=None) -> None:
+                 username = None, password = None, silent=None, base_url = None) -> None:
         """Initialize FabricClientCore object"""
         super().__init__(scope="https://api.fabric.microsoft.com/.default", 
                          tenant_id=tenant_id,
                          client_id=client_id,
                          client_secret=client_secret,
                          username=username,
-                         password=password)
+                         password=password,
+                         base_url=base_url)
         if silent is not None:
             warn("The 'silent' parameter is deprecated and will be removed in a future version.", DeprecationWarning, stacklevel=2)
 
@@ -52,8 +53,10 @@ class FabricClientCore(FabricClient):
                 return cap
         raise ValueError("No capacity found") 
     
-    def list_capacities(self):
+    def list_capacities(self, raw = False):
         """List all capacities in the tenant
+        Args:
+            raw (bool): Whether to return the capacities as dictionaries as returned by the API
         Returns:
             list: The list of capacities
         """
@@ -61,6 +64,8 @@ class FabricClientCore(FabricClient):
         url = "https://api.fabric.microsoft.com/v1/capacities"
 
         items = self.calling_routine(url, operation="GET", response_codes=[200, 429], error_message="Error listing capacities", return_format="value_json", paging=True)
+        if raw:
+            return items
 
         items = [Capacity.from_dict(i) for i in items]
         return items
@@ -389,6 +394,24 @@ class FabricClientCore(FabricClient):
 
         return json_operation_result
     
+    def deploy_pipelines(self, deployments, max_concurrent = 8, poll_interval = 5, timeout = 3600, calls_per_second = None):
+        """Run the deployments of many deployment pipelines concurrently and wait for all of them
+        Args:
+            deployments (list): The deployments, dicts with the 'pipeline' (DeploymentPipeline or ID), 'source_stage', 'target_stage'
+                                and optionally 'items', 'note', 'options', 'only_changed' and 'compare_definitions', see ReleaseOrchestrator
+            max_concurrent (int): The maximum number of deployments running at the same time
+            poll_interval (float): The time in seconds between two polls of the running operations
+            timeout (float): The time in seconds after which a running deployment is no longer tracked
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        Returns:
+            dict: The 'summary' with the number of deployments per status and the result of every deployment in 'deployments'
+        """
+        from msfabricpysdkcore.release_orchestrator import ReleaseOrchestrator
+
+        orchestrator = ReleaseOrchestrator(self, max_concurrent=max_concurrent, poll_interval=poll_interval, timeout=timeout,
+                                           calls_per_second=calls_per_second)
+        return orchestrator.run(deployments)
+
     def get_deployment_pipeline(self, deployment_pipeline_id = None, deployment_pipeline_name = None, with_details = False):
         """Get a deployment pipeline
         Args:
@@ -415,15 +438,7 @@ class FabricClientCore(FabricClient):
         deply = DeploymentPipeline.from_dict(result_json, self)
         
         if with_details:
-            stages_ = []
-            from msfabricpysdkcore.deployment_pipeline import DeploymentPipelineStage
-            for stage in deply.stages:
-                stage_items = self.list_deployment_pipeline_stage_items(deployment_pipeline_id, stage["id"])
-                stage["items"] = stage_items
-                stage["deploymentPipelineId"] = deployment_pipeline_id
-                depl_pipe_stage = DeploymentPipelineStage.from_dict(stage, self)
-                stages_.append(depl_pipe_stage)
-            deply.stages = stages_
+            deply.stages = self.list_deployment_pipeline_stages(deployment_pipeline_id, with_details=True)
     
         return deply
 
@@ -484,6 +499,18 @@ class FabricClientCore(FabricClient):
         
         return items
     
+    def iter_deployment_pipeline_operations(self, deployment_pipeline_id):
+        """Iterate over the deployment pipeline operations, fetching the next page only when it is reached
+        Args:
+            deployment_pipeline_id (str): The ID of the deployment pipeline
+        Returns:
+            generator: The deployment pipeline operations, most recent first
+        """
+        url = f"https://api.fabric.microsoft.com/v1/deploymentPipelines/{deployment_pipeline_id}/operations"
+
+        for page in self._iter_pages(url, response_codes=[200, 429], error_message="Error listing deployment pipeline operations"):
+            yield from page
+
     # GET https://api.fabric.microsoft.com/v1/deploymentPipelines/{deploymentPipelineId}/roleAssignments
     def list_deployment_pipeline_role_assignments(self, deployment_pipeline_id):
         """List role assignments for a deployment pipeline
@@ -546,8 +573,7 @@ class FabricClientCore(FabricClient):
             item["deploymentPipelineId"] = deployment_pipeline_id
             item["items"] = []
             if with_details:
-                items = self.list_deployment_pipeline_stage_items(deployment_pipeline_id, item["id"])
-                item["items"] = items
+                item["items"] = self.list_deployment_pipeline_stage_items(deployment_pipeline_id, item["id"])
                 
         stages = [DeploymentPipelineStage.from_dict(item, self) for item in items]
         
@@ -890,6 +916,79 @@ class FabricClientCore(FabricClient):
         folder = Folder.from_dict(response_json, self)
         return folder
 
+    def get_folder_index(self, workspace_id):
+        """Get a path index of all folders in a workspace with a single list_folders call
+        Args:
+            workspace_id (str): The ID of the workspace
+        Returns:
+            FolderIndex: The folder index
+        """
+        from msfabricpysdkcore.folder import FolderIndex
+
+        return FolderIndex(workspace_id, self.list_folders(workspace_id))
+
+    def ensure_folder_tree(self, workspace_id, paths, items = None, folder_index = None, max_workers = 8, chunk_size = 100):
+        """Create the missing folders of a folder tree and optionally move items into it
+        Args:
+            workspace_id (str): The ID of the workspace
+            paths (list): The folder paths, e.g. ["/finance/reports/monthly"]
+            items (dict): Items to move, keyed by folder path, each a list of dicts with 'id' (and optionally 'type')
+            folder_index (FolderIndex): An existing folder index of the workspace, fetched if None
+            max_workers (int): The maximum number of parallel requests
+            chunk_size (int): The maximum number of items per bulk move request
+        Returns:
+            dict: The 'index' (FolderIndex), the 'created' paths, the 'failed' paths with their errors
+                  and the number of items 'moved' per path
+        """
+        from msfabricpysdkcore.folder import FolderIndex
+        from msfabricpysdkcore.util import chunked, run_concurrently
+
+        index = folder_index if folder_index is not None else self.get_folder_index(workspace_id)
+        items = items if items else {}
+        all_paths = list(paths) + list(items.keys())
+
+        created = []
+        failed = {}
+
+        def create(path):
+            parent_path, _, name = path.rpartition("/")
+            return self.create_folder(workspace_id, display_name=name, parent_folder_id=index.get_id(parent_path))
+
+        for level in index.missing(all_paths):
+            for path in level:
+                parent_path = path.rpartition("/")[0]
+                if parent_path and parent_path not in index:
+                    failed[path] = f"Parent folder {parent_path} could not be created"
+            level = [path for path in level if path not in failed]
+            for path, folder, exception in run_concurrently(create, level, max_workers=max_workers):
+                if exception is not None:
+                    failed[path] = str(exception)
+                    continue
+                index.add(folder)
+                created.append(path)
+
+        moves = []
+        for path, path_items in items.items():
+            normalized = FolderIndex.normalize_path(path)
+            if normalized != "/" and normalized not in index:
+                failed.setdefault(normalized, "Folder could not be created")
+                continue
+            for chunk in chunked(path_items, chunk_size):
+                moves.append((normalized, chunk))
+
+        def move(move_request):
+            path, chunk = move_request
+            return self.bulk_move_items(workspace_id, items=chunk, target_folder_id=index.get_id(path))
+
+        moved = {}
+        for (path, chunk), _, exception in run_concurrently(move, moves, max_workers=max_workers):
+            if exception is not None:
+                failed[path] = str(exception)
+                continue
+            moved[path] = moved.get(path, 0) + len(chunk)
+
+        return {"index": index, "created": created, "failed": failed, "moved": moved}
+
     # Gateways
 
     def add_gateway_role_assignment(self, gateway_id, principal, role):
@@ -1097,7 +1196,7 @@ class FabricClientCore(FabricClient):
 
     # Git
     
-    def commit_to_git(self, workspace_id, mode, comment=None, items=None, workspace_head=None):
+    def commit_to_git(self, workspace_id, mode, comment=None, items=None, workspace_head=None, wait_for_completion = True):
         # POST https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/git/commitToGit
         """Commit to git
         Args:
@@ -1106,8 +1205,10 @@ class FabricClientCore(FabricClient):
             comment (str): The comment of the commit
             items (list): The list of items
             workspace_head (str): The workspace head
+            wait_for_completion (bool): Whether to wait for the commit to complete
         Returns:
-            int: The status code of the response
+            int: The status code of the response, or if wait_for_completion is False
+                 the ID of the long running operation (None if the commit completed right away)
         """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/git/commitToGit"
 
@@ -1124,7 +1225,10 @@ class FabricClientCore(FabricClient):
 
         response = self.calling_routine(url=url, operation="POST", body=body,
                                         response_codes=[200, 202, 429],
-                                        error_message="Error committing to git", return_format="response")
+                                        error_message="Error committing to git", return_format="response",
+                                        wait_for_completion=wait_for_completion)
+        if not wait_for_completion:
+            return self._operation_id(response.headers) if response.status_code == 202 else None
 
         return response.status_code
 
@@ -1231,9 +1335,20 @@ class FabricClientCore(FabricClient):
         return response.status_code
     
     def update_from_git(self, workspace_id, remote_commit_hash, conflict_resolution = None,
-                        options = None, workspace_head = None):
+                        options = None, workspace_head = None, wait_for_completion = True):
         # POST https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/git/updateFromGit
-        """Update from git"""
+        """Update from git
+        Args:
+            workspace_id (str): The ID of the workspace
+            remote_commit_hash (str): The remote commit hash to update to
+            conflict_resolution (dict): The conflict resolution policy
+            options (dict): The update options, e.g. {"allowOverrideItems": True}
+            workspace_head (str): The workspace head
+            wait_for_completion (bool): Whether to wait for the update to complete
+        Returns:
+            int: The status code of the response, or if wait_for_completion is False
+                 the ID of the long running operation (None if the update completed right away)
+        """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/git/updateFromGit"
 
         body = {
@@ -1249,10 +1364,67 @@ class FabricClientCore(FabricClient):
 
         response = self.calling_routine(url=url, operation="POST", body=body,
                                         response_codes=[200, 202, 429],
-                                        error_message="Error updating from git", return_format="response")
+                                        error_message="Error updating from git", return_format="response",
+                                        wait_for_completion=wait_for_completion)
+        if not wait_for_completion:
+            return self._operation_id(response.headers) if response.status_code == 202 else None
 
         return response.status_code
 
+    def sync_git(self, workspace_ids, direction = "commit", comment = None, item_filter = None, conflict_resolution = None,
+                 options = None, dry_run = False, max_workers = 8, calls_per_second = None, timeout = 3600):
+        """Commit and update many Git connected workspaces concurrently, based on their Git status
+        Args:
+            workspace_ids (list): The IDs of the workspaces
+            direction (str): "commit" to selectively commit workspace changes, "update" to update from Git, "both" for both
+            comment (str): The comment of the commits
+            item_filter (callable): Receives the item metadata of a change, only changes it returns True for are synced
+            conflict_resolution (dict): The conflict resolution policy of the updates, workspaces with conflicts are not updated if None
+            options (dict): The update options, e.g. {"allowOverrideItems": True}
+            dry_run (bool): Whether to only return the plan without applying it
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+            timeout (float): The time in seconds after which a running commit or update is reported as timed out
+        Returns:
+            GitSyncPlan or dict: The plan if dry_run is set, otherwise the report with the status of every workspace
+        """
+        from msfabricpysdkcore.git_sync import GitSyncEngine
+
+        engine = GitSyncEngine(self, max_workers=max_workers, calls_per_second=calls_per_second, timeout=timeout)
+        return engine.sync(workspace_ids, direction=direction, comment=comment, item_filter=item_filter,
+                           conflict_resolution=conflict_resolution, options=options, dry_run=dry_run)
+
+    def survey_git_status(self, workspace_ids = None, cache = None, max_workers = 8, calls_per_second = None,
+                          as_frame = False):
+        """Get the Git sync state of many workspaces concurrently as a compact table
+        Args:
+            workspace_ids (list): The IDs of the workspaces, all workspaces if None
+            cache (GitStatusCache or str): A cache or the path of a JSON cache file, the Git status of workspaces whose
+                                           workspace head did not move is then served from the cache
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+            as_frame (bool): Whether to return a pandas DataFrame
+        Returns:
+            list or pandas.DataFrame: One row per workspace with the workspace_id, connection_state, branch, remote_commit_hash,
+                                      workspace_head, workspace_changes, remote_changes, conflicts, cached and error
+        """
+        from msfabricpysdkcore.git_sync import GitStatusCache, GitSyncEngine
+
+        if workspace_ids is None:
+            workspace_ids = [workspace["id"] for workspace in self.list_workspaces(raw=True)]
+        if isinstance(cache, str):
+            cache = GitStatusCache(path=cache)
+
+        engine = GitSyncEngine(self, max_workers=max_workers, calls_per_second=calls_per_second)
+        rows = engine.survey(workspace_ids, cache=cache)
+        if as_frame:
+            from msfabricpysdkcore.util.columnar import ColumnarBuilder
+
+            builder = ColumnarBuilder()
+            builder.append(rows)
+            return builder.to_frame()
+        return rows
+
     def update_my_git_credentials(self, workspace_id, source, connection_id = None):
         #PATCH https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/git/myGitCredentials
         """Update my git credentials
@@ -1541,7 +1713,7 @@ class FabricClientCore(FabricClient):
 
     # Get
  
-    def get_item(self, workspace_id, item_id = None, item_name = None, item_type = None):
+    def get_item(self, workspace_id, item_id = None, item_name = None, item_type = None, raw = False):
         # GET https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/items/{itemId}
         """Get an item from a workspace
         Args:
@@ -1549,6 +1721,7 @@ class FabricClientCore(FabricClient):
             item_id (str): The ID of the item
             item_name (str): The name of the item
             item_type (str): The type of the item
+            raw (bool): Whether to return the item as a dictionary as returned by the API, without fetching type specific properties
         Returns:
             Item: The item object
         Raises:
@@ -1556,6 +1729,9 @@ class FabricClientCore(FabricClient):
         """
                 
         if item_id is None and item_name is not None and item_type is not None:
+            if raw:
+                items = self.list_items(workspace_id=workspace_id, raw=True)
+                return next((item for item in items if item["displayName"] == item_name and item["type"] == item_type), None)
             return self.get_item_by_name(workspace_id, item_name, item_type)
         elif item_id is None:
             raise Exception("item_id or the combination item_name + item_type is required")
@@ -1563,6 +1739,8 @@ class FabricClientCore(FabricClient):
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}"
 
         item_dict = self.calling_routine(url, operation="GET", response_codes=[200, 429], error_message="Error getting item", return_format="json")
+        if raw:
+            return item_dict
 
         return self.get_item_specific(workspace_id=workspace_id, item_dict = item_dict)
 
@@ -1604,23 +1782,39 @@ class FabricClientCore(FabricClient):
 
         return response_json
  
-    def list_items(self, workspace_id, with_properties = False, type = None):
+    def list_items(self, workspace_id, with_properties = False, type = None, as_frame = False, as_arrow = False, raw = False):
         """List items in a workspace
         Args:
             workspace_id (str): The ID of the workspace
-            with_properties (bool): Whether to get the item object with properties
+            with_properties (bool): Whether to get the item object with properties, not with as_frame or as_arrow
             type (str): The type of the item
+            as_frame (bool): Whether to return a pandas DataFrame with one column per field
+            as_arrow (bool): Whether to return a pyarrow Table with one column per field
+            raw (bool): Whether to return the items as dictionaries as returned by the API
         Returns:
             list: The list of items
+        Raises:
+            ValueError: If with_properties is combined with as_frame, as_arrow or raw
         """
         from msfabricpysdkcore.item import Item
 
+        if (as_frame or as_arrow) and with_properties:
+            raise ValueError("with_properties cannot be combined with as_frame or as_arrow")
+        if raw and with_properties:
+            raise ValueError("with_properties cannot be combined with raw")
+
+        # The type selects the endpoint of the item type, in columnar mode too
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items"
         if type:
             url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/{type}"
+
+        if as_frame or as_arrow:
+            return self._list_columnar(url, error_message="Error listing items", as_frame=as_frame, as_arrow=as_arrow)
         
         items = self.calling_routine(url, operation="GET", response_codes=[200, 429],
                                 error_message="Error listing items", return_format="value_json", paging=True)
+        if raw:
+            return items
         
         if with_properties:
             items = self.get_item_object_w_properties(workspace_id=workspace_id, item_list=items)
@@ -1650,6 +1844,90 @@ class FabricClientCore(FabricClient):
         return self.calling_routine(url, operation="POST", response_codes=[200, 202, 429],
                                     error_message="Error getting item definition",
                                     return_format="json+operation_result")
+
+    def download_item_definition(self, workspace_id, item_id, target, type = None, format = None, chunk_size = None,
+                                 timeout = 3600):
+        """Download the item definition part by part, without loading the definition into memory
+        Args:
+            workspace_id (str): The ID of the workspace
+            item_id (str): The ID of the item
+            target (str or callable): The directory to write the decoded parts to, one file per part path,
+                                      or a function receiving the part path and returning a writable binary file
+            type (str): The type of the item
+            format (str): The format of the item
+            chunk_size (int): The number of bytes read from the response at a time
+            timeout (float): The maximum time to wait for the definition in seconds
+        Returns:
+            dict: The 'format' of the definition and the 'parts' with their path, payload type and decoded size
+        """
+        from msfabricpysdkcore.util.streaming import DEFAULT_CHUNK_SIZE, write_definition_parts
+
+        url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}/getDefinition"
+        if type:
+            url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/{type}/{item_id}/getDefinition"
+
+        if format:
+            url += f"?format={format}"
+
+        response = self.calling_routine(url, operation="POST", response_codes=[200, 202, 429],
+                                        error_message="Error getting item definition", return_format="response",
+                                        wait_for_completion=False, stream=True)
+        if response.status_code == 202:
+            response.close()
+            response = self._stream_operation_result(response.headers, error_message="Error getting item definition",
+                                                     timeout=timeout)
+        try:
+            return write_definition_parts(response.iter_content(chunk_size or DEFAULT_CHUNK_SIZE), target)
+        finally:
+            response.close()
+
+    def _operation_id(self, response_headers):
+        """Get the ID of the long running operation started by a 202 response, None if there is none"""
+        operation_id = response_headers.get('x-ms-operation-id', None)
+        location = response_headers.get('Location', None)
+        if location:
+            operation_id = location.split("/")[-1]
+        return operation_id
+
+    def _wait_for_operation(self, operation_id, timeout = 3600, poll_interval = 3, max_poll_interval = 30):
+        """Poll a long running operation with backoff until it succeeds or fails
+        Args:
+            operation_id (str): The ID of the operation
+            timeout (float): The maximum time to wait in seconds
+            poll_interval (float): The time before the first poll in seconds, doubled after each poll
+            max_poll_interval (float): The maximum time between two polls in seconds
+        Returns:
+            dict: The final state of the operation
+        Raises:
+            TimeoutError: If the operation did not succeed or fail within the timeout
+        """
+        start = monotonic()
+        delay = poll_interval
+        while True:
+            sleep(min(delay, max(0.0, timeout - (monotonic() - start))))
+            operation = self.get_operation_state(operation_id=operation_id)
+            status = operation.get('status', None)
+            self._emit("lro_poll", method="GET", url=f"https://api.fabric.microsoft.com/v1/operations/{operation_id}",
+                       operation_id=operation_id, wait=monotonic() - start)
+            if status in ("Succeeded", "Failed"):
+                return operation
+            if monotonic() - start >= timeout:
+                raise TimeoutError(f"Operation {operation_id} did not complete after {timeout} seconds, status {status}")
+            delay = min(delay * 2, max_poll_interval)
+
+    def _stream_operation_result(self, response_headers, error_message, timeout = 3600):
+        """Wait for a long running operation and return its result response with the body unread"""
+        operation_id = self._operation_id(response_headers)
+        if not operation_id:
+            raise Exception(f"{error_message}: no operation id found")
+
+        operation = self._wait_for_operation(operation_id, timeout=timeout)
+        if operation.get('status', None) != "Succeeded":
+            raise Exception(f"{error_message}: operation {operation_id} {operation.get('status', None)} {operation.get('error', None)}")
+
+        url = f"https://api.fabric.microsoft.com/v1/operations/{operation_id}/result"
+        return self.calling_routine(url, operation="GET", response_codes=[200, 429], error_message=error_message,
+                                    return_format="response", stream=True)
     
     
     def update_item(self, workspace_id, item_id, display_name = None, description = None, type = None, return_item=False, **kwargs):
@@ -1824,19 +2102,36 @@ class FabricClientCore(FabricClient):
         return self.calling_routine(url=url, operation="GET", response_codes=[200, 429],
                                     error_message="Error getting job schedule", return_format="json")
     
-    def list_item_job_instances(self, workspace_id, item_id):
+    def list_item_job_instances(self, workspace_id, item_id, as_frame = False, as_arrow = False):
         """List the job instances of the item
         Args:
             workspace_id (str): The ID of the workspace
             item_id (str): The ID of the item
-            job_type (str): The type of the job
+            as_frame (bool): Whether to return a pandas DataFrame with one column per field
+            as_arrow (bool): Whether to return a pyarrow Table with one column per field
         Returns:
             list: The list of job instances
         """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}/jobs/instances"
 
+        if as_frame or as_arrow:
+            return self._list_columnar(url, error_message="Error listing job instances", as_frame=as_frame, as_arrow=as_arrow)
+
         return self.calling_routine(url=url, operation="GET", response_codes=[200, 429],
                                     error_message="Error listing job instances", return_format="value_json", paging=True)
+
+    def iter_item_job_instances(self, workspace_id, item_id):
+        """Iterate over the job instances of the item, fetching the next page only when it is reached
+        Args:
+            workspace_id (str): The ID of the workspace
+            item_id (str): The ID of the item
+        Returns:
+            generator: The job instances, most recent first
+        """
+        url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}/jobs/instances"
+
+        for page in self._iter_pages(url, response_codes=[200, 429], error_message="Error listing job instances"):
+            yield from page
     
     def list_item_schedules(self, workspace_id, item_id, job_type):
         """List the job schedules of the item
@@ -2231,44 +2526,121 @@ class FabricClientCore(FabricClient):
                                          core_client = self)
      
 
-    def create_shortcuts_bulk(self, workspace_id, item_id, create_shortcut_requests):
+    def create_shortcuts_bulk(self, workspace_id, item_id, create_shortcut_requests, chunk_size = 50, max_workers = 4,
+                              max_retries = 2):
         """
         Bulk create OneLake shortcuts.
 
+        The requests are split into chunks of at most chunk_size shortcuts which are submitted in parallel.
+        Shortcuts that fail are retried up to max_retries times, successful ones are not sent again.
+
         Args:
             workspace_id (str)
             item_id (str)
             create_shortcut_requests (list[dict]): Each dict must have:
                 path, name, target (target has 'oneLake' OR 'adlsGen2' child object)
+            chunk_size (int): The maximum number of shortcuts per request
+            max_workers (int): The maximum number of parallel requests
+            max_retries (int): How often failed shortcuts are retried
 
         Returns:
-            dict: The results of the operation
+            list: One result per shortcut request with 'request', 'status', 'result' or 'error' and 'attempts'
         """
-        if not isinstance(create_shortcut_requests, list) or len(create_shortcut_requests) == 0:
-            raise Exception("create_shortcut_requests must be a non-empty list.")
+        results = self.create_shortcuts_bulk_multi({(workspace_id, item_id): create_shortcut_requests},
+                                                   chunk_size=chunk_size, max_workers=max_workers, max_retries=max_retries)
+        return results[(workspace_id, item_id)]
 
-        required_keys = {"path", "name", "target"}
-        for idx, req in enumerate(create_shortcut_requests):
-            if not isinstance(req, dict):
-                raise Exception(f"Shortcut request at index {idx} is not a dict.")
-            missing = required_keys - set(req.keys())
-            if missing:
-                raise Exception(f"Shortcut request at index {idx} missing keys: {missing}")
-
-        url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}/shortcuts/bulkCreate"
-        body = {
-            "createShortcutRequests": create_shortcut_requests
-        }
+    def create_shortcuts_bulk_multi(self, create_shortcut_requests_by_item, chunk_size = 50, max_workers = 4, max_retries = 2):
+        """
+        Bulk create OneLake shortcuts in several items at once.
+
+        Args:
+            create_shortcut_requests_by_item (dict): Shortcut requests keyed by (workspace_id, item_id),
+                see create_shortcuts_bulk for the format of the requests
+            chunk_size (int): The maximum number of shortcuts per request
+            max_workers (int): The maximum number of parallel requests across all items
+            max_retries (int): How often failed shortcuts are retried
+
+        Returns:
+            dict: The list of per-shortcut results keyed by (workspace_id, item_id)
+        """
+        from msfabricpysdkcore.util import chunked, run_concurrently
 
-        return self.calling_routine(
-            url=url,
-            operation="POST",
-            body=body,
-            response_codes=[200, 202, 429],
-            error_message="Error creating shortcuts in bulk",
-            return_format="value_json+operation_result",
-            wait_for_completion=True
-        )   
+        required_keys = {"path", "name", "target"}
+        for key, create_shortcut_requests in create_shortcut_requests_by_item.items():
+            if not isinstance(create_shortcut_requests, list) or len(create_shortcut_requests) == 0:
+                raise Exception(f"create_shortcut_requests for {key} must be a non-empty list.")
+            for idx, req in enumerate(create_shortcut_requests):
+                if not isinstance(req, dict):
+                    raise Exception(f"Shortcut request at index {idx} for {key} is not a dict.")
+                missing = required_keys - set(req.keys())
+                if missing:
+                    raise Exception(f"Shortcut request at index {idx} for {key} missing keys: {missing}")
+
+        results = {key: [{"request": req, "status": "NotStarted", "attempts": 0} for req in requests]
+                   for key, requests in create_shortcut_requests_by_item.items()}
+        pending = {key: list(range(len(requests))) for key, requests in create_shortcut_requests_by_item.items()}
+
+        def submit_chunk(chunk):
+            (workspace_id, item_id), indexes = chunk
+            requests = [results[(workspace_id, item_id)][i]["request"] for i in indexes]
+            url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items/{item_id}/shortcuts/bulkCreate"
+            return self.calling_routine(url=url, operation="POST", body={"createShortcutRequests": requests},
+                                        response_codes=[200, 202, 429], error_message="Error creating shortcuts in bulk",
+                                        return_format="value_json+operation_result", wait_for_completion=True)
+
+        for attempt in range(max_retries + 1):
+            chunks = [(key, indexes) for key, all_indexes in pending.items() for indexes in chunked(all_indexes, chunk_size)]
+            if not chunks:
+                break
+            if attempt > 0:
+                self._logger.info(f"Retrying {sum(len(c[1]) for c in chunks)} failed shortcuts, attempt {attempt}")
+                sleep(min(2 ** attempt, 30))
+
+            pending = {}
+            for (key, indexes), response, exception in run_concurrently(submit_chunk, chunks, max_workers=max_workers):
+                entries = self._match_bulk_shortcut_results(results[key], indexes, response if exception is None else None)
+                for index in indexes:
+                    entry = results[key][index]
+                    entry["attempts"] += 1
+                    outcome = entries.get(index)
+                    if exception is not None or outcome is None:
+                        entry["status"] = "Failed"
+                        entry["error"] = str(exception) if exception is not None else "No result returned for shortcut"
+                    else:
+                        entry["status"] = outcome.get("status", "Succeeded")
+                        if "result" in outcome:
+                            entry["result"] = outcome["result"]
+                        if "error" in outcome:
+                            entry["error"] = outcome["error"]
+                        elif entry["status"] != "Failed":
+                            entry.pop("error", None)
+                    if entry["status"] == "Failed":
+                        pending.setdefault(key, []).append(index)
+
+        return results
+
+    def _match_bulk_shortcut_results(self, entries, indexes, response):
+        """Map the per-shortcut results of a bulk create response back to the indexes of the submitted requests"""
+        if not isinstance(response, list):
+            return {}
+        by_name = {}
+        for index in indexes:
+            request = entries[index]["request"]
+            by_name[(request["path"], request["name"])] = index
+
+        matched = {}
+        # Results are only matched by position if none of them echoes its request
+        by_position = not any(isinstance(outcome, dict) and outcome.get("request") for outcome in response)
+        for position, outcome in enumerate(response):
+            if by_position:
+                index = indexes[position] if position < len(indexes) else None
+            else:
+                request = outcome.get("request", None) or {} if isinstance(outcome, dict) else {}
+                index = by_name.get((request.get("path"), request.get("name")))
+            if index is not None and index not in matched:
+                matched[index] = outcome
+        return matched
 
     def get_shortcut(self, workspace_id, item_id, path, name):
         """Get the shortcut in the item
@@ -2572,20 +2944,21 @@ class FabricClientCore(FabricClient):
 
         return response_json
 
-    def get_workspace(self, id = None, name = None, return_item=True):
+    def get_workspace(self, id = None, name = None, return_item=True, raw = False):
         """Get workspace by id or name
         Args:
             id (str): The ID of the workspace
             name (str): The name of the workspace
+            raw (bool): Whether to return the workspace as a dictionary as returned by the API
         Returns:
             Workspace: The workspace object
         Raises:
             ValueError: If neither id nor name is provided
         """
         if id:
-            return self.get_workspace_by_id(id, return_item=return_item)
+            return self.get_workspace_by_id(id, return_item=return_item and not raw)
         if name:
-            return self.get_workspace_by_name(name)
+            return self.get_workspace_by_name(name, raw=raw)
         raise ValueError("Either id or name must be provided")
     
     def get_workspace_by_id(self, id, return_item=True):
@@ -2605,17 +2978,21 @@ class FabricClientCore(FabricClient):
             return Workspace.from_dict(ws_dict, core_client=self)
         return ws_dict
 
-    def get_workspace_by_name(self, name):
+    def get_workspace_by_name(self, name, raw = False):
         """Get workspace by name
         Args:
             name (str): The name of the workspace
+            raw (bool): Whether to return the workspace as a dictionary as returned by the API
         Returns:
             Workspace: The workspace object
         """
-        ws_list = self.list_workspaces()
+        from msfabricpysdkcore.workspace import Workspace
+
+        # Only the matching workspace is turned into an object
+        ws_list = self.list_workspaces(raw=True)
         for ws in ws_list:
-            if ws.display_name == name:
-                return ws
+            if ws["displayName"] == name:
+                return ws if raw else Workspace.from_dict(ws, core_client=self)
             
         raise Exception(f"Workspace with name {name} not found")
             
@@ -2647,8 +3024,12 @@ class FabricClientCore(FabricClient):
 
         return role_assignments
        
-    def list_workspaces(self):
+    def list_workspaces(self, as_frame = False, as_arrow = False, raw = False):
         """List all workspaces in the tenant
+        Args:
+            as_frame (bool): Whether to return a pandas DataFrame with one column per field
+            as_arrow (bool): Whether to return a pyarrow Table with one column per field
+            raw (bool): Whether to return the workspaces as dictionaries as returned by the API
         Returns:
             list: The list of workspaces
         """
@@ -2656,7 +3037,12 @@ class FabricClientCore(FabricClient):
 
         url = "https://api.fabric.microsoft.com/v1/workspaces"
 
+        if as_frame or as_arrow:
+            return self._list_columnar(url, error_message="Error listing workspaces", as_frame=as_frame, as_arrow=as_arrow)
+
         ws_list = self.calling_routine(url, operation="GET", response_codes=[200], error_message="Error listing workspaces", return_format="value_json", paging=True)
+        if raw:
+            return ws_list
         ws_list = [Workspace.from_dict(ws, core_client=self) for ws in ws_list]
 
         return ws_list
@@ -2882,7 +3268,23 @@ class FabricClientCore(FabricClient):
 
         response = self.calling_routine(url, operation="PATCH", body=body, response_codes=[200, 429], error_message="Error updating role assignments", return_format="response")
 
-        return response.status_code   
+        return response.status_code
+
+    def reconcile_role_assignments(self, desired_state, dry_run = False, prune = True, max_workers = 8, calls_per_second = None):
+        """Reconcile role assignments of workspaces, connections, gateways and deployment pipelines with a desired state
+        Args:
+            desired_state (dict): The desired role assignments keyed by scope and resource id, see RoleAssignmentReconciler
+            dry_run (bool): Whether to only return the plan without applying it
+            prune (bool): Whether to delete role assignments that are not in the desired state
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        Returns:
+            RoleAssignmentPlan or list: The plan if dry_run is set, otherwise the applied operations with their status
+        """
+        from msfabricpysdkcore.role_assignment_reconciler import RoleAssignmentReconciler
+
+        reconciler = RoleAssignmentReconciler(self, max_workers=max_workers, calls_per_second=calls_per_second, prune=prune)
+        return reconciler.reconcile(desired_state, dry_run=dry_run)
 
 
     
@@ -4285,21 +4687,35 @@ class FabricClientCore(FabricClient):
         return self.list_items(workspace_id, type="environments", with_properties=with_properties)
     
     # POST https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/staging/publish?preview={preview}
-    def publish_environment(self, workspace_id, environment_id, preview="false"):
+    def publish_environment(self, workspace_id, environment_id, preview="false", wait_for_completion = True):
         """Publish the staging settings and libraries of the environment
         Args:
             workspace_id (str): The ID of the workspace
             environment_id (str): The ID of the environment
             preview (bool): Whether to publish as a preview
+            wait_for_completion (bool): Whether to wait for a long running publish operation, see get_environment_publish_details
         Returns:
-            dict: The operation result or response value
+            dict: The operation result or response value, the response if the publish runs on and wait_for_completion is False
         """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/environments/{environment_id}/staging/publish?preview={preview}"
 
-        resp_dict = self.calling_routine(url, operation="POST", response_codes=[200, 429], error_message="Error publishing staging",
-                                         return_format="json+operation_result")
+        resp_dict = self.calling_routine(url, operation="POST", response_codes=[200, 202, 429], error_message="Error publishing staging",
+                                         return_format="json+operation_result", wait_for_completion=wait_for_completion)
 
         return resp_dict
+
+    def get_environment_publish_details(self, workspace_id, environment_id):
+        """Get the state of the last publish of the environment, without getting its definition
+        Args:
+            workspace_id (str): The ID of the workspace
+            environment_id (str): The ID of the environment
+        Returns:
+            dict: The publish details with the 'state', 'targetVersion', 'startTime', 'endTime' and 'componentPublishInfo'
+        """
+        url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/environments/{environment_id}"
+        item_dict = self.calling_routine(url, operation="GET", response_codes=[200, 429],
+                                         error_message="Error getting environment", return_format="json")
+        return (item_dict.get("properties", None) or {}).get("publishDetails", None) or {}
     
     def update_environment(self, workspace_id, environment_id, display_name = None, description = None, return_item=False):
         """Update an environment in a workspace
@@ -4331,20 +4747,34 @@ class FabricClientCore(FabricClient):
     # Published
 
     # GET https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/libraries/exportExternalLibraries
-    def export_published_external_libraries(self, workspace_id, environment_id):
+    def export_published_external_libraries(self, workspace_id, environment_id, sink = None, chunk_size = None,
+                                            timeout = 3600):
         """Export the external libraries of the published environment
         Args:
             workspace_id (str): The ID of the workspace
             environment_id (str): The ID of the environment
+            sink (str or file-like): The file path or writable binary file to stream the export to
+            chunk_size (int): The number of bytes read from the response at a time when streaming to a sink
+            timeout (float): The maximum time to wait for the export in seconds when streaming to a sink
         Returns:
-            dict: The exported external libraries
+            requests.Response: The response object, or the number of bytes written if a sink is given
         """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/environments/{environment_id}/libraries/exportExternalLibraries"
 
         headers = self.auth.get_headers()
         headers["Content-Type"] = "application/octet-stream"
         response = self.calling_routine(url, headers=headers, operation="GET", response_codes=[200, 429],
-                                         error_message="Error exporting external libraries", return_format="response")
+                                         error_message="Error exporting external libraries", return_format="response",
+                                         stream=sink is not None, wait_for_completion=sink is None)
+        if sink is not None:
+            from msfabricpysdkcore.util.streaming import DEFAULT_CHUNK_SIZE, write_stream
+
+            if response.status_code == 202:
+                response.close()
+                response = self._stream_operation_result(response.headers, error_message="Error exporting external libraries",
+                                                         timeout=timeout)
+            with response:
+                return write_stream(response.iter_content(chunk_size or DEFAULT_CHUNK_SIZE), sink)
         return response
     # GET https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/sparkcompute?preview={preview}
     def get_published_spark_compute(self, workspace_id, environment_id, preview = "false"):
@@ -4425,20 +4855,34 @@ class FabricClientCore(FabricClient):
 
         return response
     # GET https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/staging/libraries/exportExternalLibraries
-    def export_staging_external_libraries(self, workspace_id, environment_id):
+    def export_staging_external_libraries(self, workspace_id, environment_id, sink = None, chunk_size = None,
+                                          timeout = 3600):
         """Export the external libraries of the staging environment
         Args:
             workspace_id (str): The ID of the workspace
             environment_id (str): The ID of the environment
+            sink (str or file-like): The file path or writable binary file to stream the export to
+            chunk_size (int): The number of bytes read from the response at a time when streaming to a sink
+            timeout (float): The maximum time to wait for the export in seconds when streaming to a sink
         Returns:
-            dict: The exported external libraries
+            requests.Response: The response object, or the number of bytes written if a sink is given
         """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/environments/{environment_id}/staging/libraries/exportExternalLibraries"
 
         headers = self.auth.get_headers()
         headers["Content-Type"] = "application/octet-stream"
         response = self.calling_routine(url, headers=headers, operation="GET", response_codes=[200, 429],
-                                         error_message="Error exporting staging external libraries", return_format="response")
+                                         error_message="Error exporting staging external libraries", return_format="response",
+                                         stream=sink is not None, wait_for_completion=sink is None)
+        if sink is not None:
+            from msfabricpysdkcore.util.streaming import DEFAULT_CHUNK_SIZE, write_stream
+
+            if response.status_code == 202:
+                response.close()
+                response = self._stream_operation_result(response.headers, error_message="Error exporting staging external libraries",
+                                                         timeout=timeout)
+            with response:
+                return write_stream(response.iter_content(chunk_size or DEFAULT_CHUNK_SIZE), sink)
         return response
 
     # GET https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/staging/sparkcompute?preview={preview}
@@ -4462,12 +4906,13 @@ class FabricClientCore(FabricClient):
         return self.get_staging_spark_compute(workspace_id, environment_id, preview=preview)
     
     # POST https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/staging/libraries/importExternalLibraries
-    def import_external_libraries_to_staging(self, workspace_id, environment_id, file_path):
+    def import_external_libraries_to_staging(self, workspace_id, environment_id, file_path, progress_callback = None):
         """Import external libraries to the staging environment
         Args:
             workspace_id (str): The ID of the workspace
             environment_id (str): The ID of the environment
             file_path (str): The file path to import
+            progress_callback (callable): Called with the bytes sent and the total bytes while the file is uploaded
         Returns:
             requests.Response: The response object
         """
@@ -4475,7 +4920,8 @@ class FabricClientCore(FabricClient):
         headers["Content-Type"] = "application/octet-stream"
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/environments/{environment_id}/staging/libraries/importExternalLibraries"
         response = self.calling_routine(url, headers=headers, operation="POST", file_path=file_path, response_codes=[200, 429],
-                                        error_message="Error importing external libraries to staging", return_format="response")
+                                        error_message="Error importing external libraries to staging", return_format="response",
+                                        progress_callback=progress_callback)
         return response
     
     # GET https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/staging/libraries?preview={preview}&continuationToken={continuationToken}
@@ -4567,13 +5013,14 @@ class FabricClientCore(FabricClient):
                                                     spark_properties=spark_properties, preview=preview)
 
     # POST https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/environments/{environmentId}/staging/libraries/{libraryName}
-    def upload_custom_library(self, workspace_id, environment_id, library_name, file_path):
-        """Upload a custom library to the staging environment
+    def upload_custom_library(self, workspace_id, environment_id, library_name, file_path, progress_callback = None):
+        """Upload a custom library to the staging environment, the file is streamed from disk
         Args:
             workspace_id (str): The ID of the workspace
             environment_id (str): The ID of the environment
             library_name (str): The name of the library to upload
             file_path (str): The file path to upload
+            progress_callback (callable): Called with the bytes sent and the total bytes while the file is uploaded
         Returns:
             requests.Response: The response object
         """
@@ -4581,9 +5028,91 @@ class FabricClientCore(FabricClient):
         headers["Content-Type"] = "application/octet-stream"
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/environments/{environment_id}/staging/libraries/{library_name}"
         response = self.calling_routine(url, headers=headers, operation="POST", file_path=file_path, response_codes=[200, 429],
-                                        error_message="Error uploading custom library", return_format="response")
+                                        error_message="Error uploading custom library", return_format="response",
+                                        progress_callback=progress_callback)
         return response
 
+    def upload_custom_libraries(self, workspace_id, environment_id, file_paths, max_workers = 4, progress_callback = None,
+                                publish = False):
+        """Upload several custom libraries to the staging environment in parallel
+        Args:
+            workspace_id (str): The ID of the workspace
+            environment_id (str): The ID of the environment
+            file_paths (list or dict): The file paths to upload, or a dict of library name to file path.
+                                       Library names default to the file names
+            max_workers (int): The maximum number of parallel uploads
+            progress_callback (callable): Called with the library name, the bytes sent and the total bytes of the library
+            publish (bool): Whether to publish the environment once all libraries are uploaded
+        Returns:
+            dict: The 'uploaded' library names, the 'failed' libraries with their errors and
+                  the 'publish' result if the environment was published
+        """
+        import os
+        from msfabricpysdkcore.util import run_concurrently
+
+        if isinstance(file_paths, dict):
+            libraries = list(file_paths.items())
+        else:
+            libraries = [(os.path.basename(file_path), file_path) for file_path in file_paths]
+
+        names = [library_name for library_name, _ in libraries]
+        duplicates = sorted({library_name for library_name in names if names.count(library_name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate library names: {', '.join(duplicates)}")
+
+        def upload(library):
+            library_name, file_path = library
+            callback = None
+            if progress_callback is not None:
+                callback = lambda sent, total: progress_callback(library_name, sent, total)
+            return self.upload_custom_library(workspace_id, environment_id, library_name, file_path,
+                                              progress_callback=callback)
+
+        uploaded = []
+        failed = {}
+        for (library_name, _), _, exception in run_concurrently(upload, libraries, max_workers=max_workers):
+            if exception is not None:
+                failed[library_name] = str(exception)
+                continue
+            uploaded.append(library_name)
+
+        result = {"uploaded": uploaded, "failed": failed}
+        if publish:
+            if failed:
+                self._logger.warning(f"Not publishing environment {environment_id}, {len(failed)} libraries failed to upload")
+            else:
+                result["publish"] = self.publish_environment(workspace_id, environment_id)
+        return result
+
+    def sync_environment_libraries(self, workspace_id, environment_id, file_paths, prune = True, publish = True,
+                                   spark_compute = None, manifest_path = None, max_workers = 4, progress_callback = None,
+                                   wait_for_publish = True, timeout = 1800, dry_run = False):
+        """Upload only new or changed custom libraries, delete removed ones and publish the environment once
+        Args:
+            workspace_id (str): The ID of the workspace
+            environment_id (str): The ID of the environment
+            file_paths (list or dict): The local library files, or a dict of library name to file path.
+                                       Library names default to the file names
+            prune (bool): Whether to delete staged custom libraries without a local file
+            publish (bool): Whether to publish the environment once
+            spark_compute (dict): Keyword arguments of update_staging_spark_compute to apply before publishing
+            manifest_path (str): The path of the JSON manifest of uploaded library hashes, all libraries are uploaded if None
+            max_workers (int): The maximum number of parallel uploads and deletions
+            progress_callback (callable): Called with the library name, the bytes sent and the total bytes of an upload
+            wait_for_publish (bool): Whether to wait for the publish to complete, polling with backoff
+            timeout (float): The maximum time to wait for the publish in seconds
+            dry_run (bool): Whether to only return the plan without applying it
+        Returns:
+            EnvironmentSyncPlan or dict: The plan if dry_run is set, otherwise the result of the sync
+        """
+        from msfabricpysdkcore.environment_sync import EnvironmentSync
+
+        environment_sync = EnvironmentSync(self, workspace_id, environment_id, manifest_path=manifest_path,
+                                           max_workers=max_workers)
+        return environment_sync.sync(file_paths, prune=prune, publish=publish, spark_compute=spark_compute,
+                                     progress_callback=progress_callback, wait_for_publish=wait_for_publish,
+                                     timeout=timeout, dry_run=dry_run)
+
     def upload_staging_library(self, workspace_id, environment_id, file_path):
         """Update staging libraries for an environment
         Args:
@@ -5948,6 +6477,19 @@ class FabricClientCore(FabricClient):
                                          error_message="Error getting livy session", return_format="json")
         return item_dict
 
+    def _livy_sessions_url(self, workspace_id, item_id = None, item_type = None):
+        """The URL of the livy sessions of a workspace, or of an item if item_id is given"""
+        if item_id is None:
+            return f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/spark/livySessions"
+
+        if "lakehouse" in item_type.lower():
+            item_type = "lakehouses"
+        elif "notebook" in item_type.lower():
+            item_type = "notebooks"
+        elif "sparkjobdef" in item_type.lower() or "sjd" in item_type.lower():
+            item_type = "sparkJobDefinitions"
+        return f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/{item_type}/{item_id}/livySessions"
+
     def list_livy_sessions(self, workspace_id, item_id = None, item_type = None):
         """List all livy sessions for a lakehouse
         Args:
@@ -5957,25 +6499,45 @@ class FabricClientCore(FabricClient):
         Returns:
             list: The list of livy sessions
         """
-        if item_id is None:
-            item_type = "spark"
-        elif "lakehouse" in item_type.lower():
-            item_type = "lakehouses"
-        elif "notebook" in item_type.lower():
-            item_type = "notebooks"
-        elif "sparkjobdef" in item_type.lower() or "sjd" in item_type.lower():
-            item_type = "sparkJobDefinitions"
-        
-        if item_id is None:
-            url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/spark/livySessions"
-        else:
-            url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/{item_type}/{item_id}/livySessions"
+        url = self._livy_sessions_url(workspace_id, item_id=item_id, item_type=item_type)
 
         items = self.calling_routine(url, operation="GET", response_codes=[200, 429],
                                       error_message="Error listing livy sessions", return_format="value_json", paging=True)
 
         return items
 
+    def iter_livy_sessions(self, workspace_id, item_id = None, item_type = None):
+        """Iterate over the livy sessions of a workspace or an item, fetching the next page only when it is reached
+        Args:
+            workspace_id (str): The ID of the workspace
+            item_id (str): The ID of the item, all sessions of the workspace if None
+            item_type (str): The type of the item
+        Returns:
+            generator: The livy sessions, most recently submitted first
+        """
+        url = self._livy_sessions_url(workspace_id, item_id=item_id, item_type=item_type)
+
+        for page in self._iter_pages(url, response_codes=[200, 429], error_message="Error listing livy sessions"):
+            yield from page
+
+    def livy_session_monitor(self, targets, min_interval = 60, max_interval = 900, backoff = 2, max_workers = 8,
+                             calls_per_second = None):
+        """Create a monitor that polls the livy sessions of many workspaces and items and reports only what changed
+        Args:
+            targets (list): Workspace IDs, (workspace_id, item_id, item_type) tuples or Lakehouse, Notebook and SparkJobDefinition objects
+            min_interval (float): The polling interval in seconds of targets with activity
+            max_interval (float): The maximum polling interval in seconds of idle targets
+            backoff (float): The factor by which the polling interval of an idle target grows after each poll
+            max_workers (int): The maximum number of targets polled in parallel
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        Returns:
+            LivySessionMonitor: The monitor, see its poll and run methods
+        """
+        from msfabricpysdkcore.livy_monitor import LivySessionMonitor
+
+        return LivySessionMonitor(self, targets, min_interval=min_interval, max_interval=max_interval, backoff=backoff,
+                                  max_workers=max_workers, calls_per_second=calls_per_second)
+
     # Materialized view
 
     # POST https://api.fabric.microsoft.com/v1/workspaces/{workspaceId}/lakehouses/{lakehouseId}/jobs/RefreshMaterializedLakeViews/schedules
@@ -7463,18 +8025,20 @@ class FabricClientCore(FabricClient):
         """
         return self.update_item_definition(workspace_id, spark_job_definition_id, definition, type="sparkJobDefinitions")
     
-    def run_on_demand_spark_job_definition(self, workspace_id, spark_job_definition_id, job_type = "sparkjob"):
+    def run_on_demand_spark_job_definition(self, workspace_id, spark_job_definition_id, job_type = "sparkjob", execution_data = None):
         """Run an on demand spark job definition
         Args:
             workspace_id (str): The ID of the workspace
             spark_job_definition_id (str): The ID of the spark job definition
             job_type (str): The job type
+            execution_data (dict): The execution data of the job, e.g. the command line arguments
         Returns:
-            dict: The job instance
+            JobInstance: The job instance
         """
         url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/sparkJobDefinitions/{spark_job_definition_id}/jobs/instances?jobType={job_type}"
+        body = {'executionData': execution_data} if execution_data is not None else None
 
-        response = self.calling_routine(url, operation="POST", response_codes=[202, 429], wait_for_completion = False,
+        response = self.calling_routine(url, operation="POST", body=body, response_codes=[202, 429], wait_for_completion = False,
                                         error_message="Error running on demand spark job definition", return_format="response")
 
         location = response.headers['Location']
@@ -7483,6 +8047,34 @@ class FabricClientCore(FabricClient):
         return self.get_item_job_instance(workspace_id = workspace_id,
                                           item_id = spark_job_definition_id,
                                           job_instance_id = job_instance_id)
+
+    def run_spark_job_definitions(self, jobs, max_active = 16, max_active_per_workspace = None, max_active_per_capacity = None,
+                                  poll_interval = 15, timeout = None, max_retries = 2, retry_delay = 30, retry_failed_job = None,
+                                  count_existing_jobs = True, calls_per_second = None):
+        """Run many spark job definitions with admission control on their active job instances and wait for all of them
+        Args:
+            jobs (list): (SparkJobDefinition, execution_data) tuples or dicts with the 'workspace_id', 'spark_job_definition_id'
+                         and optionally 'execution_data' and 'job_type', see SparkJobBatchRunner
+            max_active (int): The maximum number of active job instances of the batch
+            max_active_per_workspace (int): The maximum number of active job instances per workspace, unlimited if None
+            max_active_per_capacity (int): The maximum number of active job instances per capacity, unlimited if None
+            poll_interval (float): The time in seconds between two polls of the active job instances
+            timeout (float): The time in seconds after which an active job instance is cancelled, unlimited if None
+            max_retries (int): The maximum number of new attempts of a job after a transient failure
+            retry_delay (float): The time in seconds before the first new attempt, doubled for every further attempt
+            retry_failed_job (callable): Receives the JobInstance of a failed or cancelled job, the job is attempted again if it returns True
+            count_existing_jobs (bool): Whether active job instances started outside of the batch count against the limits
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        Returns:
+            dict: The 'summary' with the number of jobs per status and the result of every job in 'runs'
+        """
+        from msfabricpysdkcore.spark_job_runner import SparkJobBatchRunner
+
+        runner = SparkJobBatchRunner(self, max_active=max_active, max_active_per_workspace=max_active_per_workspace,
+                                     max_active_per_capacity=max_active_per_capacity, poll_interval=poll_interval, timeout=timeout,
+                                     max_retries=max_retries, retry_delay=retry_delay, retry_failed_job=retry_failed_job,
+                                     count_existing_jobs=count_existing_jobs, calls_per_second=calls_per_second)
+        return runner.run(jobs)
     
     def list_spark_job_definition_livy_sessions(self, workspace_id, spark_job_definition_id):
         """List all livy sessions for a spark job definition
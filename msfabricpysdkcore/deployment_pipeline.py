@@ -1,43 +1,143 @@
+import hashlib
 import json
+import threading
 from warnings import warn
 
 from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import logger
+
+
+class DeploymentPlan:
+    """Class to represent the items that differ between two stages of a deployment pipeline
+
+    Every source stage item gets a status: "new" if it has no paired item in the target stage, "changed" if it was
+    deployed to the source stage after its paired item was deployed to the target stage or if their definitions differ,
+    "unchanged" if their definitions are equal and "unknown" if nothing tells whether they differ.
+    New, changed and unknown items are deployed.
+    """
+
+    DEPLOYED_STATUSES = ("new", "changed", "unknown")
+
+    def __init__(self, source_stage_id, target_stage_id, items, target_only = None) -> None:
+        """Initialize the DeploymentPlan object
+
+        Args:
+            source_stage_id (str): The ID of the source stage
+            target_stage_id (str): The ID of the target stage
+            items (list): The source stage items with their 'status' and their paired 'targetItemId'
+            target_only (list): The target stage items without a paired source stage item, never deployed
+        """
+        self.source_stage_id = source_stage_id
+        self.target_stage_id = target_stage_id
+        self.items = items
+        self.target_only = target_only if target_only else []
+
+    def __str__(self) -> str:
+        """Return a string representation of the plan"""
+        dict_ = {
+            'summary': self.summary(),
+            'source_stage_id': self.source_stage_id,
+            'target_stage_id': self.target_stage_id,
+            'items': self.items,
+            'target_only': self.target_only
+        }
+        return json.dumps(dict_, indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.to_deploy())
+
+    def summary(self):
+        """Count the items by status
+
+        Returns:
+            dict: The number of new, changed, unchanged and unknown items and of items only in the target stage
+        """
+        summary = {'new': 0, 'changed': 0, 'unchanged': 0, 'unknown': 0, 'target_only': len(self.target_only)}
+        for item in self.items:
+            summary[item['status']] += 1
+        return summary
+
+    def to_deploy(self):
+        """List the items to deploy in the format of deploy_stage_content
+
+        Returns:
+            list: The items with their 'sourceItemId' and 'itemType'
+        """
+        return [{'sourceItemId': item['itemId'], 'itemType': item['itemType']} for item in self.items
+                if item['status'] in self.DEPLOYED_STATUSES]
+
+
+class _DefinitionHasher:
+    """Writable sink hashing a definition part instead of storing it"""
+
+    def __init__(self, hashes, path) -> None:
+        self._hashes = hashes
+        self._path = path
+        self._hash = hashlib.sha256()
+
+    def write(self, data):
+        self._hash.update(data)
+
+    def close(self):
+        self._hashes[self._path] = self._hash.hexdigest()
+
 
 class DeploymentPipeline:
-    """Class to represent a deployment pipeline in Microsoft Fabric"""
+    """Class to represent a deployment pipeline in Microsoft Fabric
+
+    Stages and stage items are loaded when first used and cached on the object.
+    """
 
     def __init__(self, id, display_name, description, stages, core_client: FabricClientCore) -> None:
+        self._logger = logger.getChild(__name__)
         self.id = id
         self.display_name = display_name
         self.description = description
-        self.stages = stages
+        self._stages = stages
+        self._stage_items = {}
+        self._lock = threading.Lock()
         self.core_client = core_client
 
+    @property
+    def stages(self):
+        """The stages of the deployment pipeline, listed when first used"""
+        if self._stages is None:
+            self._stages = self.core_client.list_deployment_pipeline_stages(deployment_pipeline_id=self.id)
+        return self._stages
+
+    @stages.setter
+    def stages(self, stages):
+        self._stages = stages
+        with self._lock:
+            self._stage_items = {}
+
     
     def from_dict(dict,  core_client):
         """Create a Workspace object from a dictionary"""
         if dict["displayName"] == None:
             dict["displayName"] = dict["display_name"]
 
+        # Stages missing from the dictionary are listed when first used
         depl_pipe = DeploymentPipeline(
             id=dict["id"],
             display_name=dict["displayName"],
             description=dict["description"],
-            stages=[],
+            stages=dict.get("stages", None),
             core_client=core_client
         )
 
-        if "stages" in dict:
-            depl_pipe.stages = dict["stages"]
-        else:
-            dict["stages"] = depl_pipe.List_stages()
-
         return depl_pipe
 
     
     def __str__(self) -> str:
         """Return a string representation of the workspace object"""
-        dict_ = {"id": self.id, "display_name": self.display_name, "description": self.description, "stages": self.stages}
+        stages = None
+        if self._stages is not None:
+            stages = [stage if isinstance(stage, dict) else json.loads(str(stage)) for stage in self._stages]
+        dict_ = {"id": self.id, "display_name": self.display_name, "description": self.description, "stages": stages}
 
         return json.dumps(dict_, indent=2)
     
@@ -61,15 +161,51 @@ class DeploymentPipeline:
         return self.core_client.delete_deployment_pipeline_role_assignment(deployment_pipeline_id=self.id, principal_id=principal_id)
     
     def deploy_stage_content(self, source_stage_id, target_stage_id, created_workspace_details = None,
-               items = None, note = None, options = None, wait_for_completion = True):
-        """Deploy the content of a stage to another stage in the deployment pipeline"""
+               items = None, note = None, options = None, wait_for_completion = True, only_changed = False,
+               compare_definitions = True):
+        """Deploy the content of a stage to another stage in the deployment pipeline
+
+        With only_changed and no items, only the items of plan_deployment that differ are deployed,
+        nothing is deployed if no item differs. compare_definitions is passed to plan_deployment: without it,
+        paired items cannot be found unchanged and all of them are deployed.
+        """
+        if only_changed and items is None:
+            plan = self.plan_deployment(source_stage_id, target_stage_id, compare_definitions=compare_definitions)
+            return self.deploy_plan(plan, created_workspace_details=created_workspace_details, note=note, options=options,
+                                    wait_for_completion=wait_for_completion)
         return self.core_client.deploy_stage_content(deployment_pipeline_id=self.id, source_stage_id=source_stage_id,
                                                      target_stage_id=target_stage_id, created_workspace_details=created_workspace_details,
                                                      items=items, note=note, options=options, wait_for_completion=wait_for_completion)
-  
+
+    def deploy_plan(self, plan, created_workspace_details = None, note = None, options = None, wait_for_completion = True):
+        """Deploy the items of a plan that differ between its stages
+
+        Args:
+            plan (DeploymentPlan): The plan as returned by plan_deployment
+            created_workspace_details (dict): The details of the workspace to create if the target stage has none
+            note (str): A note for the deployment
+            options (dict): The deployment options
+            wait_for_completion (bool): Whether to wait for the deployment to complete
+        Returns:
+            dict: The deployment details, None if no item differs
+        """
+        items = plan.to_deploy()
+        if not items:
+            # An empty item list would deploy the whole stage
+            self._logger.info(f"No items differ between stages {plan.source_stage_id} and {plan.target_stage_id}, nothing to deploy")
+            return None
+        result = self.core_client.deploy_stage_content(deployment_pipeline_id=self.id, source_stage_id=plan.source_stage_id,
+                                                       target_stage_id=plan.target_stage_id,
+                                                       created_workspace_details=created_workspace_details,
+                                                       items=items, note=note, options=options,
+                                                       wait_for_completion=wait_for_completion)
+        with self._lock:
+            self._stage_items.pop(plan.target_stage_id, None)
+        return result
+
     def deploy(self, source_stage_id, target_stage_id, created_workspace_details = None,
                items = None, note = None, options = None, wait_for_completion = True):
-        return self.deploy_stage_content(deployment_pipelinesource_stage_id=source_stage_id,
+        return self.deploy_stage_content(source_stage_id=source_stage_id,
                                          target_stage_id=target_stage_id, created_workspace_details=created_workspace_details,
                                          items=items, note=note, options=options, wait_for_completion=wait_for_completion)
     
@@ -101,6 +237,131 @@ class DeploymentPipeline:
         """List the stages in the deployment pipeline"""
         return self.core_client.list_deployment_pipeline_stages(deployment_pipeline_id=self.id)
 
+    def get_stage_id(self, stage):
+        """Get the ID of a stage from its ID or display name
+
+        Args:
+            stage (str): The ID or the display name of the stage
+        Returns:
+            str: The ID of the stage
+        """
+        for stage_ in self.stages:
+            stage_id = stage_["id"] if isinstance(stage_, dict) else stage_.id
+            display_name = stage_["displayName"] if isinstance(stage_, dict) else stage_.display_name
+            if stage in (stage_id, display_name):
+                return stage_id
+        raise ValueError(f"Stage {stage} not found in deployment pipeline {self.id}")
+
+    def _stage_workspace_id(self, stage_id):
+        for stage in self.stages:
+            if isinstance(stage, dict) and stage["id"] == stage_id:
+                return stage.get("workspaceId", None)
+            if not isinstance(stage, dict) and stage.id == stage_id:
+                return stage.workspace_id
+        return None
+
+    def get_stage_items(self, stage, refresh = False):
+        """Get the items of a stage, listed when first used and cached on the object
+
+        Args:
+            stage (str): The ID or the display name of the stage
+            refresh (bool): Whether to list the items again
+        Returns:
+            list: The stage items
+        """
+        stage_id = self.get_stage_id(stage)
+        with self._lock:
+            items = None if refresh else self._stage_items.get(stage_id)
+        if items is None:
+            items = self.core_client.list_deployment_pipeline_stage_items(deployment_pipeline_id=self.id, stage_id=stage_id)
+            with self._lock:
+                self._stage_items[stage_id] = items
+        return items
+
+    def _definition_hashes(self, workspace_id, item_id):
+        """Hash the definition parts of an item, None if the item has no definition"""
+        hashes = {}
+        try:
+            self.core_client.download_item_definition(workspace_id, item_id, lambda path: _DefinitionHasher(hashes, path))
+        except Exception as e:
+            self._logger.debug(f"Could not get the definition of item {item_id}: {e}")
+            return None
+        # The .platform part holds per-stage metadata
+        hashes.pop(".platform", None)
+        return hashes
+
+    def plan_deployment(self, source_stage, target_stage, compare_definitions = False, refresh = True, max_workers = 8):
+        """Compare the items of two stages to deploy only the items that differ
+
+        The items of both stages are listed concurrently and paired. Items deployed to the source stage after their
+        paired target item are changed. Other paired items are unknown, with compare_definitions their definitions
+        are compared instead.
+
+        Args:
+            source_stage (str): The ID or the display name of the source stage
+            target_stage (str): The ID or the display name of the target stage
+            compare_definitions (bool): Whether to compare the definitions of paired items without other signal
+            refresh (bool): Whether to list the stage items again instead of using the cached ones
+            max_workers (int): The maximum number of parallel requests
+        Returns:
+            DeploymentPlan: The plan
+        """
+        from msfabricpysdkcore.util import run_concurrently
+
+        source_stage_id = self.get_stage_id(source_stage)
+        target_stage_id = self.get_stage_id(target_stage)
+
+        results = run_concurrently(lambda stage_id: self.get_stage_items(stage_id, refresh=refresh),
+                                   [source_stage_id, target_stage_id], max_workers=2)
+        for stage_id, _, exception in results:
+            if exception is not None:
+                raise Exception(f"Error listing the items of stage {stage_id}: {exception}")
+        source_items, target_items = results[0][1], results[1][1]
+
+        targets = {item["itemId"]: item for item in target_items}
+        paired = set()
+        items = []
+        for source_item in source_items:
+            item = dict(source_item)
+            target_item = targets.get(source_item.get("targetItemId", None))
+            if target_item is None:
+                # Pair through the target side if the source side does not know its target
+                target_item = next((t for t in target_items if t.get("sourceItemId", None) == source_item["itemId"]), None)
+            if target_item is None:
+                item["status"] = "new"
+                items.append(item)
+                continue
+            paired.add(target_item["itemId"])
+            item["targetItemId"] = target_item["itemId"]
+            source_time = source_item.get("lastDeploymentTime", None)
+            target_time = target_item.get("lastDeploymentTime", None)
+            if source_time and target_time and source_time > target_time:
+                item["status"] = "changed"
+            else:
+                item["status"] = "unknown"
+            items.append(item)
+
+        if compare_definitions:
+            source_workspace_id = self._stage_workspace_id(source_stage_id)
+            target_workspace_id = self._stage_workspace_id(target_stage_id)
+            unknown = [item for item in items if item["status"] == "unknown"]
+            if source_workspace_id is None or target_workspace_id is None:
+                self._logger.warning("Definitions cannot be compared, a stage has no workspace assigned")
+                unknown = []
+
+            def compare(item):
+                source_hashes = self._definition_hashes(source_workspace_id, item["itemId"])
+                if source_hashes is None:
+                    return "unknown"
+                target_hashes = self._definition_hashes(target_workspace_id, item["targetItemId"])
+                return "unchanged" if source_hashes == target_hashes else "changed"
+
+            for item, status, exception in run_concurrently(compare, unknown, max_workers=max_workers):
+                item["status"] = status if exception is None else "unknown"
+
+        target_only = [item for item in target_items if item["itemId"] not in paired]
+        return DeploymentPlan(source_stage_id, target_stage_id, items, target_only=target_only)
+
     def unassign_workspace_from_stage(self, stage_id):
         """Unassign a workspace from a stage in the deployment pipeline"""
         return self.core_client.unassign_workspace_from_stage(deployment_pipeline_id=self.id, stage_id=stage_id)
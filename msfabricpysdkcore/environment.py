@@ -3,6 +3,8 @@ from msfabricpysdkcore.item import Item
 class Environment(Item):
     """Class to represent a item in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, auth, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, auth, properties, definition, description)
 
@@ -15,14 +17,19 @@ class Environment(Item):
     def cancel_publish(self):
         return self.core_client.cancel_publish(self.workspace_id, self.id)
     
-    def publish_environment(self, preview="false"):
-        return self.core_client.publish_environment(self.workspace_id, self.id, preview=preview)
+    def publish_environment(self, preview="false", wait_for_completion = True):
+        return self.core_client.publish_environment(self.workspace_id, self.id, preview=preview,
+                                                    wait_for_completion=wait_for_completion)
+
+    def get_publish_details(self):
+        return self.core_client.get_environment_publish_details(self.workspace_id, self.id)
 
     # published
 
-    def export_published_external_libraries(self):
+    def export_published_external_libraries(self, sink = None, chunk_size = None, timeout = 3600):
         """Export the external libraries of the environment"""
-        return self.core_client.export_published_external_libraries(self.workspace_id, self.id)
+        return self.core_client.export_published_external_libraries(self.workspace_id, self.id, sink=sink, chunk_size=chunk_size,
+                                                                    timeout=timeout)
     
     def get_published_spark_compute(self, preview="false"):
         """Get the spark compute settings of the environment"""
@@ -49,8 +56,9 @@ class Environment(Item):
     def delete_staging_library(self, library_to_delete):
         return self.core_client.delete_staging_library(self.workspace_id, self.id, library_to_delete)
     
-    def export_staging_external_libraries(self):
-        return self.core_client.export_staging_external_libraries(workspace_id=self.workspace_id, environment_id=self.id)
+    def export_staging_external_libraries(self, sink = None, chunk_size = None, timeout = 3600):
+        return self.core_client.export_staging_external_libraries(workspace_id=self.workspace_id, environment_id=self.id,
+                                                                  sink=sink, chunk_size=chunk_size, timeout=timeout)
 
     def get_staging_spark_compute(self, preview="false"):
         return self.core_client.get_staging_spark_compute(workspace_id=self.workspace_id, environment_id=self.id, preview=preview)
@@ -59,8 +67,9 @@ class Environment(Item):
         """Get the staging settings of the environment"""
         return self.core_client.get_staging_settings(self.workspace_id, self.id, preview=preview)
 
-    def import_external_libraries_to_staging(self, file_path):
-        return self.core_client.import_external_libraries_to_staging(workspace_id=self.workspace_id, environment_id=self.id, file_path=file_path)
+    def import_external_libraries_to_staging(self, file_path, progress_callback = None):
+        return self.core_client.import_external_libraries_to_staging(workspace_id=self.workspace_id, environment_id=self.id, file_path=file_path,
+                                                                     progress_callback=progress_callback)
 
     def list_staging_libraries(self, preview="false"):
         return self.core_client.list_staging_libraries(workspace_id=self.workspace_id, environment_id=self.id, preview=preview)
@@ -93,8 +102,22 @@ class Environment(Item):
                                                         instance_pool, runtime_version, spark_properties)
 
 
-    def upload_custom_library(self, library_name, file_path):
-        return self.core_client.upload_custom_library(self.workspace_id, self.id, library_name, file_path)
+    def upload_custom_library(self, library_name, file_path, progress_callback = None):
+        return self.core_client.upload_custom_library(self.workspace_id, self.id, library_name, file_path,
+                                                      progress_callback=progress_callback)
+
+    def upload_custom_libraries(self, file_paths, max_workers = 4, progress_callback = None, publish = False):
+        """Upload several custom libraries to the staging environment in parallel"""
+        return self.core_client.upload_custom_libraries(self.workspace_id, self.id, file_paths, max_workers=max_workers,
+                                                        progress_callback=progress_callback, publish=publish)
+
+    def sync_libraries(self, file_paths, prune = True, publish = True, spark_compute = None, manifest_path = None,
+                       max_workers = 4, progress_callback = None, wait_for_publish = True, timeout = 1800, dry_run = False):
+        """Upload only new or changed custom libraries, delete removed ones and publish once"""
+        return self.core_client.sync_environment_libraries(self.workspace_id, self.id, file_paths, prune=prune, publish=publish,
+                                                           spark_compute=spark_compute, manifest_path=manifest_path,
+                                                           max_workers=max_workers, progress_callback=progress_callback,
+                                                           wait_for_publish=wait_for_publish, timeout=timeout, dry_run=dry_run)
     
     def upload_staging_library(self, file_path):
         return self.core_client.upload_staging_library(self.workspace_id, self.id, file_path)
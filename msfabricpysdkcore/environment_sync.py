@@ -0,0 +1,315 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from time import monotonic, sleep
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import logger, run_concurrently
+
+
+def file_sha256(file_path, chunk_size = 1024 * 1024):
+    """Hash a file in chunks
+
+    Args:
+        file_path (str): The path of the file
+        chunk_size (int): The number of bytes read at a time
+    Returns:
+        str: The hex digest of the SHA-256 hash
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def custom_library_names(libraries):
+    """Get the names of the custom libraries of a staging or published library listing
+
+    Args:
+        libraries (dict or list): The response of list_staging_libraries or list_published_libraries
+    Returns:
+        set: The file names of the custom libraries
+    """
+    if isinstance(libraries, dict):
+        if "libraries" in libraries:
+            libraries = libraries["libraries"]
+        else:
+            custom = libraries.get("customLibraries", None) or {}
+            return {name for names in custom.values() for name in names or []}
+    return {library["name"] for library in libraries or [] if library.get("libraryType", "Custom") == "Custom"}
+
+
+class EnvironmentSyncPlan:
+    """Class to represent the library uploads and deletions needed to sync an environment with local files"""
+
+    def __init__(self, upload, delete, unchanged, hashes, publish_pending = False) -> None:
+        """Initialize the EnvironmentSyncPlan object
+
+        Args:
+            upload (dict): The libraries to upload, library name to file path
+            delete (list): The names of the custom libraries to delete
+            unchanged (list): The names of the libraries whose content hash is unchanged
+            hashes (dict): The content hashes of the local libraries, library name to hash
+            publish_pending (bool): Whether the staged libraries differ from the published ones before any change
+                                    or the last publish did not succeed
+        """
+        self.upload = upload
+        self.delete = delete
+        self.unchanged = unchanged
+        self.hashes = hashes
+        self.publish_pending = publish_pending
+
+    def __str__(self) -> str:
+        """Return a string representation of the plan"""
+        dict_ = {
+            'summary': self.summary(),
+            'upload': self.upload,
+            'delete': self.delete,
+            'unchanged': self.unchanged
+        }
+        return json.dumps(dict_, indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.upload) + len(self.delete)
+
+    def summary(self):
+        """Count the planned changes
+
+        Returns:
+            dict: The number of libraries to upload, to delete and unchanged
+        """
+        return {'upload': len(self.upload), 'delete': len(self.delete), 'unchanged': len(self.unchanged),
+                'publish_pending': self.publish_pending}
+
+
+class EnvironmentSync:
+    """Class to sync the custom libraries of an environment with local files and publish it once
+
+    The API does not expose the content of uploaded libraries, so their content hashes are kept in a local JSON
+    manifest. A local library is uploaded if it is not staged or if its hash differs from the manifest,
+    staged custom libraries without a local file are deleted. Libraries not in the manifest yet are uploaded.
+    """
+
+    _logger: logging.Logger
+
+    TERMINAL_PUBLISH_STATES = ("success", "failed", "cancelled")
+
+    def __init__(self, core_client: FabricClientCore, workspace_id, environment_id, manifest_path = None,
+                 max_workers = 4) -> None:
+        """Initialize the EnvironmentSync object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            workspace_id (str): The ID of the workspace
+            environment_id (str): The ID of the environment
+            manifest_path (str): The path of the JSON manifest of uploaded library hashes, in memory only if None
+            max_workers (int): The maximum number of parallel uploads, deletions and hash computations
+        """
+        self._logger = logger.getChild(__name__)
+        self.core_client = core_client
+        self.workspace_id = workspace_id
+        self.environment_id = environment_id
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.manifest = {}
+        if manifest_path is not None and os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                self.manifest = json.load(f)
+
+    @property
+    def library_hashes(self):
+        """The content hashes of the uploaded libraries of the environment, library name to hash"""
+        return self.manifest.setdefault(self.environment_id, {})
+
+    def save_manifest(self):
+        """Write the manifest to its file"""
+        if self.manifest_path is None:
+            return
+        with self._lock:
+            data = json.dumps(self.manifest, indent=2)
+        with open(self.manifest_path, "w") as f:
+            f.write(data)
+
+    # Planning
+
+    def plan(self, file_paths, prune = True, preview = "false"):
+        """Compare local library files with the staged libraries of the environment
+
+        Args:
+            file_paths (list or dict): The local library files, or a dict of library name to file path.
+                                       Library names default to the file names
+            prune (bool): Whether to delete staged custom libraries without a local file
+            preview (str): The preview flag of the library listings
+        Returns:
+            EnvironmentSyncPlan: The plan
+        """
+        if isinstance(file_paths, dict):
+            libraries = dict(file_paths)
+        else:
+            libraries = {os.path.basename(file_path): file_path for file_path in file_paths}
+
+        def list_libraries(stage):
+            if stage == "staging":
+                return self.core_client.list_staging_libraries(self.workspace_id, self.environment_id, preview=preview)
+            return self.core_client.list_published_libraries(self.workspace_id, self.environment_id, preview=preview)
+
+        hashes = {}
+        listings = {}
+        publish_details = {}
+        tasks = [("hash", name) for name in libraries] + [("list", "staging"), ("list", "published"), ("publish", None)]
+
+        def run(task):
+            kind, arg = task
+            if kind == "hash":
+                return file_sha256(libraries[arg])
+            if kind == "publish":
+                return self.core_client.get_environment_publish_details(self.workspace_id, self.environment_id)
+            return custom_library_names(list_libraries(arg))
+
+        for (kind, arg), result, exception in run_concurrently(run, tasks, max_workers=self.max_workers):
+            if exception is not None:
+                raise Exception(f"Error planning the sync of environment {self.environment_id}: {exception}")
+            if kind == "hash":
+                hashes[arg] = result
+            elif kind == "publish":
+                publish_details = result
+            else:
+                listings[arg] = result
+
+        staged = listings["staging"]
+        known = self.library_hashes
+        upload = {name: path for name, path in libraries.items() if name not in staged or known.get(name) != hashes[name]}
+        unchanged = sorted(name for name in libraries if name not in upload)
+        delete = sorted(staged - set(libraries)) if prune else []
+        # A failed publish leaves the manifest ahead of the published libraries, publish again
+        last_state = (publish_details.get("state", None) or "").lower()
+        publish_pending = staged != listings["published"] or (last_state != "" and last_state != "success")
+        return EnvironmentSyncPlan(upload, delete, unchanged, hashes, publish_pending=publish_pending)
+
+    # Applying
+
+    def _delete(self, library_name):
+        self.core_client.delete_custom_library(self.workspace_id, self.environment_id, library_name)
+        with self._lock:
+            self.library_hashes.pop(library_name, None)
+
+    def _target_version(self, published):
+        """Get the target version of a publish response, None if it has none"""
+        if published is None:
+            return None
+        if not isinstance(published, dict):
+            try:
+                published = published.json()
+            except ValueError:
+                return None
+        details = published.get("publishDetails", None) or published
+        return details.get("targetVersion", None)
+
+    def wait_for_publish(self, timeout = 1800, initial_delay = 2, max_delay = 30, backoff = 1.5, target_version = None):
+        """Wait for the publish of the environment, polling with exponential backoff
+
+        Args:
+            timeout (float): The maximum time to wait in seconds
+            initial_delay (float): The time before the first poll in seconds
+            max_delay (float): The maximum time between two polls in seconds
+            backoff (float): The factor by which the time between two polls grows
+            target_version (str): The target version of the publish, any publish if None. Earlier publishes
+                                  are not waited for
+        Returns:
+            dict: The final publish details
+        """
+        start = monotonic()
+        delay = initial_delay
+        while True:
+            sleep(min(delay, max(0.0, timeout - (monotonic() - start))))
+            details = self.core_client.get_environment_publish_details(self.workspace_id, self.environment_id)
+            state = (details.get("state", None) or "").lower()
+            self.core_client._emit("lro_poll", method="GET",
+                                   url=f"https://api.fabric.microsoft.com/v1/workspaces/{self.workspace_id}/environments/{self.environment_id}",
+                                   operation_id=details.get("targetVersion", None), wait=monotonic() - start)
+            self._logger.debug(f"Environment {self.environment_id} publish state {state}")
+            current = target_version is None or details.get("targetVersion", None) == target_version
+            if current and state in self.TERMINAL_PUBLISH_STATES:
+                return details
+            if monotonic() - start >= timeout:
+                raise TimeoutError(f"Publish of environment {self.environment_id} did not complete after {timeout} seconds, state {state}")
+            delay = min(delay * backoff, max_delay)
+
+    def apply(self, plan, publish = True, spark_compute = None, progress_callback = None, wait_for_publish = True,
+              timeout = 1800):
+        """Upload and delete the libraries of a plan concurrently, then publish the environment once
+
+        Args:
+            plan (EnvironmentSyncPlan): The plan to apply
+            publish (bool): Whether to publish the environment if anything changed or was staged before
+            spark_compute (dict): Keyword arguments of update_staging_spark_compute to apply before publishing
+            progress_callback (callable): Called with the library name, the bytes sent and the total bytes of an upload
+            wait_for_publish (bool): Whether to wait for the publish to complete
+            timeout (float): The maximum time to wait for the publish in seconds
+        Returns:
+            dict: The 'uploaded' and 'deleted' libraries, the 'failed' ones with their errors, whether it was 'published'
+                  and the final 'publish_details' if waited for
+        """
+        result = {'uploaded': [], 'deleted': [], 'unchanged': list(plan.unchanged), 'failed': {}, 'published': False,
+                  'publish_details': None}
+
+        if plan.upload:
+            uploads = self.core_client.upload_custom_libraries(self.workspace_id, self.environment_id, plan.upload,
+                                                               max_workers=self.max_workers, progress_callback=progress_callback)
+            result['uploaded'] = uploads['uploaded']
+            result['failed'].update(uploads['failed'])
+            with self._lock:
+                for library_name in uploads['uploaded']:
+                    self.library_hashes[library_name] = plan.hashes[library_name]
+
+        for library_name, _, exception in run_concurrently(self._delete, plan.delete, max_workers=self.max_workers):
+            if exception is not None:
+                result['failed'][library_name] = str(exception)
+                continue
+            result['deleted'].append(library_name)
+        self.save_manifest()
+
+        if spark_compute:
+            self.core_client.update_staging_spark_compute(self.workspace_id, self.environment_id, **spark_compute)
+
+        changed = result['uploaded'] or result['deleted'] or spark_compute or plan.publish_pending
+        if not publish or not changed:
+            return result
+        if result['failed']:
+            self._logger.warning(f"Not publishing environment {self.environment_id}, {len(result['failed'])} libraries failed")
+            return result
+
+        published = self.core_client.publish_environment(self.workspace_id, self.environment_id, wait_for_completion=False)
+        result['published'] = True
+        if wait_for_publish:
+            result['publish_details'] = self.wait_for_publish(timeout=timeout, target_version=self._target_version(published))
+        return result
+
+    def sync(self, file_paths, prune = True, publish = True, spark_compute = None, progress_callback = None,
+             wait_for_publish = True, timeout = 1800, dry_run = False):
+        """Plan the sync of the environment with local library files and apply it unless dry_run is set
+
+        Args:
+            file_paths (list or dict): The local library files, or a dict of library name to file path
+            prune (bool): Whether to delete staged custom libraries without a local file
+            publish (bool): Whether to publish the environment once
+            spark_compute (dict): Keyword arguments of update_staging_spark_compute to apply before publishing
+            progress_callback (callable): Called with the library name, the bytes sent and the total bytes of an upload
+            wait_for_publish (bool): Whether to wait for the publish to complete
+            timeout (float): The maximum time to wait for the publish in seconds
+            dry_run (bool): Whether to only compute the plan
+        Returns:
+            EnvironmentSyncPlan or dict: The plan if dry_run is set, otherwise the result of apply
+        """
+        plan = self.plan(file_paths, prune=prune)
+        if dry_run:
+            return plan
+        return self.apply(plan, publish=publish, spark_compute=spark_compute, progress_callback=progress_callback,
+                          wait_for_publish=wait_for_publish, timeout=timeout)
@@ -5,6 +5,8 @@ from msfabricpysdkcore.coreapi import FabricClientCore
 class Folder:
     """Class to represent a folder in Microsoft Fabric"""
 
+    __slots__ = ("id", "display_name", "parent_folder_id", "workspace_id", "core_client")
+
     def __init__(self, id, display_name, workspace_id, core_client: FabricClientCore, parent_folder_id) -> None:
         
         self.id = id
@@ -66,4 +68,123 @@ class Folder:
         self.display_name = updated_folder.display_name
         self.parent_folder_id = updated_folder.parent_folder_id
         self.workspace_id = updated_folder.workspace_id
-        return updated_folder
\ No newline at end of file
+        return updated_folder
+
+class FolderIndex:
+    """Class to represent the folder tree of a workspace as a path index
+
+    Paths are written like "/finance/reports/monthly", the root of the workspace is "/".
+    """
+
+    def __init__(self, workspace_id, folders = None) -> None:
+        """Initialize the FolderIndex object
+
+        Args:
+            workspace_id (str): The ID of the workspace
+            folders (list): The list of Folder objects of the workspace, e.g. from list_folders
+        """
+        self.workspace_id = workspace_id
+        self._path_to_id = {}
+        self._id_to_path = {}
+
+        folders_by_id = {folder.id: folder for folder in folders or []}
+        for folder in folders_by_id.values():
+            self._resolve(folder, folders_by_id)
+
+    def __str__(self) -> str:
+        """Return a string representation of the folder index"""
+        return json.dumps(dict(sorted(self._path_to_id.items())), indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self._path_to_id)
+
+    def __contains__(self, path) -> bool:
+        return FolderIndex.normalize_path(path) in self._path_to_id
+
+    def normalize_path(path):
+        """Normalize a folder path to the form "/a/b/c"
+
+        Args:
+            path (str): The folder path
+        Returns:
+            str: The normalized path
+        """
+        parts = [part for part in path.replace("\\", "/").split("/") if part]
+        return "/" + "/".join(parts)
+
+    def _resolve(self, folder, folders_by_id):
+        path = self._id_to_path.get(folder.id)
+        if path is not None:
+            return path
+        parent = folders_by_id.get(folder.parent_folder_id) if folder.parent_folder_id else None
+        parent_path = self._resolve(parent, folders_by_id) if parent else ""
+        path = f"{parent_path}/{folder.display_name}"
+        self._path_to_id[path] = folder.id
+        self._id_to_path[folder.id] = path
+        return path
+
+    def add(self, folder):
+        """Add a folder whose parent is already in the index
+
+        Args:
+            folder (Folder): The folder
+        Returns:
+            str: The path of the folder
+        """
+        parent_path = self._id_to_path.get(folder.parent_folder_id, "") if folder.parent_folder_id else ""
+        path = f"{parent_path}/{folder.display_name}"
+        self._path_to_id[path] = folder.id
+        self._id_to_path[folder.id] = path
+        return path
+
+    def get_id(self, path):
+        """Get the ID of a folder by path
+
+        Args:
+            path (str): The folder path
+        Returns:
+            str: The ID of the folder, None for the workspace root or if the folder does not exist
+        """
+        return self._path_to_id.get(FolderIndex.normalize_path(path))
+
+    def get_path(self, folder_id):
+        """Get the path of a folder by ID
+
+        Args:
+            folder_id (str): The ID of the folder
+        Returns:
+            str: The path of the folder or None if the folder is not in the index
+        """
+        return self._id_to_path.get(folder_id)
+
+    def paths(self):
+        """List all folder paths
+
+        Returns:
+            list: The sorted list of folder paths
+        """
+        return sorted(self._path_to_id)
+
+    def missing(self, paths):
+        """Get the folders that need to be created for a list of paths, including missing parents
+
+        Args:
+            paths (list): The folder paths
+        Returns:
+            list: The missing paths grouped by depth, parents first
+        """
+        missing = set()
+        for path in paths:
+            parts = FolderIndex.normalize_path(path).split("/")[1:]
+            for depth in range(1, len(parts) + 1):
+                sub_path = "/" + "/".join(parts[:depth])
+                if sub_path != "/" and sub_path not in self._path_to_id:
+                    missing.add(sub_path)
+
+        levels = {}
+        for path in missing:
+            levels.setdefault(path.count("/"), []).append(path)
+        return [sorted(levels[depth]) for depth in sorted(levels)]
@@ -0,0 +1,416 @@
+import json
+import logging
+import os
+import threading
+from time import monotonic, sleep, time
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import logger, RateLimiter, run_concurrently
+
+SURVEY_COLUMNS = ("workspace_id", "connection_state", "branch", "remote_commit_hash", "workspace_head",
+                  "workspace_changes", "remote_changes", "conflicts", "cached", "error")
+
+
+class GitSyncPlan:
+    """Class to represent the Git commits and updates needed to sync a set of workspaces"""
+
+    def __init__(self, workspaces, direction, failed_fetches = None) -> None:
+        """Initialize the GitSyncPlan object
+
+        Args:
+            workspaces (dict): The planned changes keyed by workspace id, each with the 'workspace_head', the 'remote_commit_hash',
+                               the item identifiers to 'commit', the items to 'update' and the items in 'conflict'
+            direction (str): "commit", "update" or "both"
+            failed_fetches (dict): Workspaces whose Git status could not be fetched, keyed by workspace id
+        """
+        self.workspaces = workspaces
+        self.direction = direction
+        self.failed_fetches = failed_fetches if failed_fetches else {}
+
+    def __str__(self) -> str:
+        """Return a string representation of the plan"""
+        dict_ = {
+            'summary': self.summary(),
+            'direction': self.direction,
+            'workspaces': self.workspaces,
+            'failed_fetches': self.failed_fetches
+        }
+        return json.dumps(dict_, indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.pending())
+
+    def pending(self):
+        """List the workspaces with something to commit or update
+
+        Returns:
+            list: The workspace ids
+        """
+        return [workspace_id for workspace_id, changes in self.workspaces.items()
+                if (self.direction != "update" and changes['commit'])
+                or (self.direction != "commit" and changes['update'])]
+
+    def summary(self):
+        """Count the planned changes
+
+        Returns:
+            dict: The number of workspaces to sync, items to commit, items to update, conflicts and failed fetches
+        """
+        return {
+            'workspaces': len(self.pending()),
+            'commit': sum(len(changes['commit']) for changes in self.workspaces.values()) if self.direction != "update" else 0,
+            'update': sum(len(changes['update']) for changes in self.workspaces.values()) if self.direction != "commit" else 0,
+            'conflicts': sum(len(changes['conflicts']) for changes in self.workspaces.values()),
+            'failed_fetches': len(self.failed_fetches)
+        }
+
+
+class GitStatusCache:
+    """Cache of Git status survey rows keyed by workspace head and remote commit hash, optionally persisted as JSON
+
+    The workspace head of a workspace is known from its Git connection, which is much cheaper to get than its Git status.
+    A cached row is used while the workspace head has not moved and the row is younger than max_age seconds,
+    max_age bounds how long new remote commits and uncommitted workspace changes can go unnoticed.
+    """
+
+    def __init__(self, path = None, max_age = 300) -> None:
+        """Initialize the GitStatusCache object
+
+        Args:
+            path (str): The path of the JSON file to load the cache from and save it to, in memory only if None
+            max_age (float): The maximum age in seconds of a cached row, no limit if None
+        """
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == 1:
+                self.entries = data.get("entries", {})
+
+    def get(self, workspace_id, workspace_head):
+        """Get the cached row of a workspace if its workspace head did not move and the row is fresh
+
+        Args:
+            workspace_id (str): The ID of the workspace
+            workspace_head (str): The current workspace head
+        Returns:
+            dict: The cached row or None
+        """
+        with self._lock:
+            entry = self.entries.get(workspace_id)
+        if entry is None or workspace_head is None or entry["workspace_head"] != workspace_head:
+            return None
+        if self.max_age is not None and time() - entry["fetched"] > self.max_age:
+            return None
+        return dict(entry["row"])
+
+    def put(self, workspace_id, row):
+        """Cache the row of a workspace under its workspace head and remote commit hash
+
+        Args:
+            workspace_id (str): The ID of the workspace
+            row (dict): The survey row
+        """
+        with self._lock:
+            self.entries[workspace_id] = {"workspace_head": row["workspace_head"],
+                                          "remote_commit_hash": row["remote_commit_hash"],
+                                          "fetched": time(), "row": row}
+
+    def save(self, path = None):
+        """Write the cache to a JSON file
+
+        Args:
+            path (str): The path of the file, the path of the cache if None
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("No path given to save the cache to")
+        with self._lock:
+            data = {"version": 1, "entries": dict(self.entries)}
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+class GitSyncEngine:
+    """Class to commit and update many Git connected workspaces concurrently, based on their Git status
+
+    The Git status of every workspace is fetched in parallel and split into the items changed in the workspace
+    (to commit) and the items changed in the remote branch (to update). Commits are selective, only the changed
+    items without conflicts are committed. Updates from Git always update the whole workspace to the remote commit.
+    """
+
+    _logger: logging.Logger
+
+    DIRECTIONS = ("commit", "update", "both")
+
+    def __init__(self, core_client: FabricClientCore, max_workers = 8, calls_per_second = None, poll_interval = 3,
+                 max_poll_interval = 30, timeout = 3600) -> None:
+        """Initialize the GitSyncEngine object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+            poll_interval (float): The time in seconds before the first poll of a commit or update operation
+            max_poll_interval (float): The maximum time in seconds between two polls, the interval doubles up to it
+            timeout (float): The time in seconds after which a running operation is reported as timed out
+        """
+        self._logger = logger.getChild(__name__)
+        self.core_client = core_client
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(calls_per_second)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+
+    # Fetching
+
+    def _get_status(self, workspace_id):
+        self.rate_limiter.acquire()
+        return self.core_client.git_get_status(workspace_id=workspace_id)
+
+    def fetch_status(self, workspace_ids):
+        """Fetch the Git status of workspaces concurrently
+
+        Args:
+            workspace_ids (list): The IDs of the workspaces
+        Returns:
+            tuple: The Git status keyed by workspace id and the errors keyed the same way
+        """
+        statuses = {}
+        errors = {}
+        for workspace_id, status, exception in run_concurrently(self._get_status, workspace_ids, self.max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not get the Git status of workspace {workspace_id}: {exception}")
+                errors[workspace_id] = str(exception)
+                continue
+            statuses[workspace_id] = status
+        return statuses, errors
+
+    # Survey
+
+    def _survey_workspace(self, workspace_id, cache):
+        row = dict.fromkeys(SURVEY_COLUMNS)
+        row['workspace_id'] = workspace_id
+        row['cached'] = False
+        self.rate_limiter.acquire()
+        connection = self.core_client.git_get_connection(workspace_id=workspace_id)
+        row['connection_state'] = connection.get('gitConnectionState')
+        row['branch'] = (connection.get('gitProviderDetails', None) or {}).get('branchName')
+        if row['connection_state'] != "ConnectedAndInitialized":
+            return row
+
+        head = (connection.get('gitSyncDetails', None) or {}).get('head')
+        if cache is not None:
+            cached = cache.get(workspace_id, head)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+
+        status = self._get_status(workspace_id)
+        changes = status.get('changes', None) or []
+        row['remote_commit_hash'] = status.get('remoteCommitHash')
+        row['workspace_head'] = status.get('workspaceHead')
+        row['workspace_changes'] = sum(1 for change in changes if change.get('workspaceChange', None))
+        row['remote_changes'] = sum(1 for change in changes if change.get('remoteChange', None))
+        row['conflicts'] = sum(1 for change in changes if change.get('conflictType', "None") not in (None, "None"))
+        if cache is not None:
+            cache.put(workspace_id, dict(row))
+        return row
+
+    def survey(self, workspace_ids, cache = None):
+        """Get the Git connection and status of workspaces concurrently as a compact table
+
+        Args:
+            workspace_ids (list): The IDs of the workspaces
+            cache (GitStatusCache): The cache of rows, the Git status of workspaces whose workspace head did not move is not fetched again
+        Returns:
+            list: One row per workspace with the connection state, branch, remote commit hash, workspace head,
+                  the number of workspace changes, remote changes and conflicts, whether it was 'cached' and the 'error' if any
+        """
+        rows = []
+        for workspace_id, row, exception in run_concurrently(lambda workspace_id: self._survey_workspace(workspace_id, cache),
+                                                             workspace_ids, self.max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not survey the Git state of workspace {workspace_id}: {exception}")
+                row = dict.fromkeys(SURVEY_COLUMNS)
+                row['workspace_id'] = workspace_id
+                row['error'] = str(exception)
+            rows.append(row)
+        if cache is not None and cache.path is not None:
+            cache.save()
+        return rows
+
+    # Planning
+
+    def changes(status, item_filter = None):
+        """Split the changes of a Git status into items to commit, items to update and conflicts
+
+        Args:
+            status (dict): The Git status as returned by git_get_status
+            item_filter (callable): Receives the item metadata of a change, only changes it returns True for are kept
+        Returns:
+            dict: The item identifiers to 'commit', the item metadata to 'update' and the item metadata in 'conflicts'
+        """
+        to_commit = []
+        to_update = []
+        conflicts = []
+        for change in status.get('changes', None) or []:
+            metadata = change['itemMetadata']
+            if item_filter is not None and not item_filter(metadata):
+                continue
+            if change.get('conflictType', "None") not in (None, "None"):
+                conflicts.append(metadata)
+                continue
+            if change.get('workspaceChange', None):
+                to_commit.append(metadata['itemIdentifier'])
+            if change.get('remoteChange', None):
+                to_update.append(metadata)
+        return {'commit': to_commit, 'update': to_update, 'conflicts': conflicts}
+
+    def plan(self, workspace_ids, direction = "commit", item_filter = None, statuses = None):
+        """Compute the changes to commit and update per workspace
+
+        Args:
+            workspace_ids (list): The IDs of the workspaces
+            direction (str): "commit" to commit workspace changes, "update" to update workspaces from Git, "both" for both
+            item_filter (callable): Receives the item metadata of a change, only changes it returns True for are synced
+            statuses (dict): The Git status keyed by workspace id as returned by fetch_status, fetched if None
+        Returns:
+            GitSyncPlan: The plan
+        """
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Invalid direction {direction}, expected one of {self.DIRECTIONS}")
+        errors = {}
+        if statuses is None:
+            statuses, errors = self.fetch_status(workspace_ids)
+
+        workspaces = {}
+        for workspace_id in workspace_ids:
+            status = statuses.get(workspace_id)
+            if status is None:
+                continue
+            changes = GitSyncEngine.changes(status, item_filter=item_filter)
+            changes['workspace_head'] = status.get('workspaceHead')
+            changes['remote_commit_hash'] = status.get('remoteCommitHash')
+            workspaces[workspace_id] = changes
+        return GitSyncPlan(workspaces, direction, failed_fetches=errors)
+
+    # Applying
+
+    def _wait(self, operation_id):
+        """Poll a long running operation with backoff until it succeeds, fails or times out, returning its state and error"""
+        if operation_id is None:
+            return "Succeeded", None
+        start = monotonic()
+        delay = self.poll_interval
+        status = None
+        while True:
+            sleep(delay)
+            self.rate_limiter.acquire()
+            try:
+                operation = self.core_client.get_operation_state(operation_id=operation_id)
+                status = operation.get('status', None)
+            except Exception as e:
+                # A failed poll is retried at the next interval
+                self._logger.info(f"Could not get operation {operation_id}: {e}")
+                operation = None
+            self.core_client._emit("lro_poll", method="GET", url=f"https://api.fabric.microsoft.com/v1/operations/{operation_id}",
+                                   operation_id=operation_id, wait=monotonic() - start)
+            if status == "Succeeded":
+                return status, None
+            if status == "Failed":
+                return status, operation.get('error', None)
+            if monotonic() - start > self.timeout:
+                return "TimedOut", f"Still {status} after {self.timeout} seconds"
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def _sync_workspace(self, workspace_id, changes, direction, comment, conflict_resolution, options):
+        cc = self.core_client
+        result = {'workspace_id': workspace_id, 'operations': []}
+        workspace_head = changes['workspace_head']
+
+        if direction != "commit" and changes['update']:
+            if changes['conflicts'] and conflict_resolution is None:
+                raise Exception(f"{len(changes['conflicts'])} items in conflict, pass a conflict_resolution to update from Git")
+            self.rate_limiter.acquire()
+            operation_id = cc.update_from_git(workspace_id=workspace_id, remote_commit_hash=changes['remote_commit_hash'],
+                                              conflict_resolution=conflict_resolution, options=options,
+                                              workspace_head=workspace_head, wait_for_completion=False)
+            state, error = self._wait(operation_id)
+            result['operations'].append({'action': "update", 'items': len(changes['update']), 'operation_id': operation_id,
+                                         'status': state, 'error': error})
+            if state != "Succeeded":
+                if direction != "update" and changes['commit']:
+                    result['operations'].append({'action': "commit", 'items': len(changes['commit']), 'operation_id': None,
+                                                 'status': "Skipped", 'error': f"The update from Git did not succeed: {state}"})
+                return result
+            # The update moved the workspace head, let the service check it for the commit
+            workspace_head = None
+
+        if direction != "update" and changes['commit']:
+            self.rate_limiter.acquire()
+            operation_id = cc.commit_to_git(workspace_id=workspace_id, mode="Selective", comment=comment,
+                                            items=changes['commit'], workspace_head=workspace_head,
+                                            wait_for_completion=False)
+            state, error = self._wait(operation_id)
+            result['operations'].append({'action': "commit", 'items': len(changes['commit']), 'operation_id': operation_id,
+                                         'status': state, 'error': error})
+        return result
+
+    def apply(self, plan, comment = None, conflict_resolution = None, options = None):
+        """Commit and update the workspaces of a plan concurrently, waiting for the long running operations
+
+        Args:
+            plan (GitSyncPlan): The plan to apply
+            comment (str): The comment of the commits
+            conflict_resolution (dict): The conflict resolution policy of the updates, workspaces with conflicts are not updated if None
+            options (dict): The update options, e.g. {"allowOverrideItems": True}
+        Returns:
+            dict: The 'summary' and one result per workspace in 'workspaces' with its 'status', its 'operations' and, on failure, its 'error'
+        """
+        def sync(workspace_id):
+            return self._sync_workspace(workspace_id, plan.workspaces[workspace_id], plan.direction, comment,
+                                        conflict_resolution, options)
+
+        results = []
+        for workspace_id, result, exception in run_concurrently(sync, plan.pending(), self.max_workers):
+            if exception is not None:
+                self._logger.warning(f"Git sync of workspace {workspace_id} failed: {exception}")
+                results.append({'workspace_id': workspace_id, 'operations': [], 'status': "Failed", 'error': str(exception)})
+                continue
+            failed = [operation for operation in result['operations'] if operation['status'] != "Succeeded"]
+            result['status'] = failed[0]['status'] if failed else "Succeeded"
+            result['error'] = failed[0]['error'] if failed else None
+            results.append(result)
+
+        summary = {'workspaces': len(results), 'failed_fetches': len(plan.failed_fetches)}
+        for result in results:
+            summary[result['status'].lower()] = summary.get(result['status'].lower(), 0) + 1
+        return {'summary': summary, 'workspaces': results, 'failed_fetches': plan.failed_fetches}
+
+    def sync(self, workspace_ids, direction = "commit", comment = None, item_filter = None, conflict_resolution = None,
+             options = None, dry_run = False):
+        """Fetch the Git status of the workspaces, plan the changes and apply them unless dry_run is set
+
+        Args:
+            workspace_ids (list): The IDs of the workspaces
+            direction (str): "commit", "update" or "both"
+            comment (str): The comment of the commits
+            item_filter (callable): Receives the item metadata of a change, only changes it returns True for are synced
+            conflict_resolution (dict): The conflict resolution policy of the updates
+            options (dict): The update options
+            dry_run (bool): Whether to only compute the plan
+        Returns:
+            GitSyncPlan or dict: The plan if dry_run is set, otherwise the report of apply
+        """
+        plan = self.plan(workspace_ids, direction=direction, item_filter=item_filter)
+        if dry_run:
+            return plan
+        return self.apply(plan, comment=comment, conflict_resolution=conflict_resolution, options=options)
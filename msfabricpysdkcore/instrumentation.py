@@ -0,0 +1,337 @@
+import json
+import logging
+import re
+import threading
+from bisect import bisect_left
+from time import time
+from urllib.parse import urlsplit
+
+from msfabricpysdkcore.util import logger
+
+_ID_PATTERN = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$")
+
+EVENT_TYPES = ("request_start", "request_end", "retry", "throttle", "lro_poll")
+
+
+def templatize_url(url):
+    """Replace the IDs in the path of a URL with named placeholders
+
+    Example:
+        https://api.fabric.microsoft.com/v1/workspaces/<guid>/items/<guid>?type=x
+        becomes /v1/workspaces/{workspaceId}/items/{itemId}
+
+    Args:
+        url (str): The URL
+    Returns:
+        str: The endpoint template
+    """
+    path = urlsplit(url).path
+    segments = path.split("/")
+    for i, segment in enumerate(segments):
+        if i > 0 and _ID_PATTERN.match(segment):
+            previous = segments[i - 1]
+            if previous.startswith("{") or not previous:
+                name = "id"
+            else:
+                name = previous[:-1] if previous.endswith("s") else previous
+                name = f"{name}Id"
+            segments[i] = "{" + name + "}"
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """Class to represent an instrumentation event of the SDK
+
+    Event types are request_start, request_end, retry, throttle and lro_poll.
+    A request_end event without status code carries the error raised while sending the request.
+    """
+
+    __slots__ = ("type", "method", "url", "endpoint", "status_code", "latency", "bytes_in", "bytes_out",
+                 "retry_count", "wait", "operation_id", "error", "timestamp")
+
+    def __init__(self, type, method = None, url = None, endpoint = None, status_code = None, latency = None,
+                 bytes_in = None, bytes_out = None, retry_count = 0, wait = None, operation_id = None, error = None) -> None:
+        """Initialize the RequestEvent object
+
+        Args:
+            type (str): The type of the event
+            method (str): The HTTP method
+            url (str): The URL of the request
+            endpoint (str): The endpoint template of the request with IDs templated out
+            status_code (int): The status code of the response
+            latency (float): The latency of the request in seconds
+            bytes_in (int): The size of the response body in bytes
+            bytes_out (int): The size of the request body in bytes
+            retry_count (int): The number of retries before this attempt
+            wait (float): The time waited in seconds, for throttle and lro_poll events
+            operation_id (str): The ID of the long running operation, for lro_poll events
+            error (Exception): The error raised while sending the request, for request_end events without response
+        """
+        self.type = type
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint if endpoint is not None or url is None else templatize_url(url)
+        self.status_code = status_code
+        self.latency = latency
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.retry_count = retry_count
+        self.wait = wait
+        self.operation_id = operation_id
+        self.error = error
+        self.timestamp = time()
+
+    def to_dict(self):
+        """Return the event as a dictionary"""
+        dict_ = {slot: getattr(self, slot) for slot in self.__slots__}
+        if self.error is not None:
+            dict_["error"] = repr(self.error)
+        return dict_
+
+    def __str__(self) -> str:
+        """Return a string representation of the event"""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class LatencyHistogram:
+    """Class to represent a latency histogram with logarithmic buckets"""
+
+    # Bucket upper bounds in seconds, from 1 ms to ~100 s
+    BOUNDS = tuple(round(0.001 * (10 ** (i / 8)), 6) for i in range(41))
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Add a latency in seconds to the histogram"""
+        self.counts[bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """Estimate a percentile from the histogram
+
+        Args:
+            p (float): The percentile between 0 and 100
+        Returns:
+            float: The upper bound of the bucket containing the percentile
+        """
+        if self.count == 0:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                bound = self.BOUNDS[i] if i < len(self.BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsCollector:
+    """In-process metrics collector with latency histograms per endpoint
+
+    Register it on a client with client.add_hook(collector).
+    """
+
+    def __init__(self) -> None:
+        """Initialize the MetricsCollector object"""
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def __call__(self, event: RequestEvent):
+        """Record an event"""
+        key = (event.method, event.endpoint)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = {"histogram": LatencyHistogram(), "status_codes": {}, "bytes_in": 0, "bytes_out": 0,
+                         "errors": 0, "retries": 0, "throttles": 0, "throttle_wait": 0.0, "lro_polls": 0}
+                self._endpoints[key] = stats
+            if event.type == "request_end":
+                stats["histogram"].add(event.latency or 0.0)
+                if event.error is not None:
+                    stats["errors"] += 1
+                else:
+                    stats["status_codes"][event.status_code] = stats["status_codes"].get(event.status_code, 0) + 1
+                stats["bytes_in"] += event.bytes_in or 0
+                stats["bytes_out"] += event.bytes_out or 0
+            elif event.type == "retry":
+                stats["retries"] += 1
+            elif event.type == "throttle":
+                stats["throttles"] += 1
+                stats["throttle_wait"] += event.wait or 0.0
+            elif event.type == "lro_poll":
+                stats["lro_polls"] += 1
+
+    def reset(self):
+        """Remove all recorded metrics"""
+        with self._lock:
+            self._endpoints = {}
+
+    def summary(self):
+        """Summarize the recorded metrics per endpoint, slowest endpoints by total time first
+
+        Returns:
+            list: One dictionary per endpoint with call counts, latency percentiles, bytes, retries and throttling
+        """
+        with self._lock:
+            rows = []
+            for (method, endpoint), stats in self._endpoints.items():
+                histogram = stats["histogram"]
+                rows.append({
+                    "method": method,
+                    "endpoint": endpoint,
+                    "calls": histogram.count,
+                    "total_seconds": histogram.total,
+                    "mean_seconds": histogram.total / histogram.count if histogram.count else None,
+                    "min_seconds": histogram.min,
+                    "p50_seconds": histogram.percentile(50),
+                    "p95_seconds": histogram.percentile(95),
+                    "p99_seconds": histogram.percentile(99),
+                    "max_seconds": histogram.max,
+                    "status_codes": dict(stats["status_codes"]),
+                    "errors": stats["errors"],
+                    "bytes_in": stats["bytes_in"],
+                    "bytes_out": stats["bytes_out"],
+                    "retries": stats["retries"],
+                    "throttles": stats["throttles"],
+                    "throttle_wait_seconds": stats["throttle_wait"],
+                    "lro_polls": stats["lro_polls"]
+                })
+        rows.sort(key=lambda row: row["total_seconds"], reverse=True)
+        return rows
+
+    def __str__(self) -> str:
+        """Return a string representation of the metrics summary"""
+        return json.dumps(self.summary(), indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class CallBudgetExceeded(Exception):
+    """Raised when a client makes more HTTP calls than its call budget allows"""
+
+
+class CallBudget:
+    """Context manager counting the HTTP calls of a client per endpoint to catch N+1 patterns
+
+    Use it through client.call_budget():
+
+        with fc.call_budget(max_calls=10) as budget:
+            fc.list_items(workspace_id, with_properties=True)
+        print(budget.report())
+
+    Retries of throttled calls are counted separately and do not count against the budget.
+    Polls of long running operations are not reported as repeated calls.
+    """
+
+    _logger: logging.Logger
+
+    def __init__(self, client, max_calls = None, max_calls_per_endpoint = None, fanout_threshold = 5,
+                 raise_on_exceed = True) -> None:
+        """Initialize the CallBudget object
+
+        Args:
+            client (FabricClient): The client to watch
+            max_calls (int): The maximum number of calls, unlimited if None
+            max_calls_per_endpoint (int): The maximum number of calls per endpoint template, unlimited if None
+            fanout_threshold (int): The number of calls to one endpoint template with different IDs from which they are reported as a fan-out
+            raise_on_exceed (bool): Whether to raise CallBudgetExceeded before a call exceeding the budget, otherwise only log a warning
+        """
+        self._logger = logger.getChild(__name__)
+        self.client = client
+        self.max_calls = max_calls
+        self.max_calls_per_endpoint = max_calls_per_endpoint
+        self.fanout_threshold = fanout_threshold
+        self.raise_on_exceed = raise_on_exceed
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.exceeded = False
+        self._endpoints = {}
+        self._urls = {}
+
+    def __enter__(self):
+        self.client.add_hook(self, events=["request_start"])
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.client.remove_hook(self)
+        report = self.report()
+        if report["repeated_calls"] or report["fanouts"]:
+            self._logger.warning(f"Possible N+1 call patterns: {json.dumps({key: report[key] for key in ('repeated_calls', 'fanouts')})}")
+
+    def __call__(self, event: RequestEvent):
+        """Count a call"""
+        if event.retry_count:
+            with self._lock:
+                self.retries += 1
+            return
+        key = (event.method, event.endpoint)
+        with self._lock:
+            endpoint_calls = self._endpoints.get(key, 0) + 1
+            over = []
+            if self.max_calls is not None and self.calls + 1 > self.max_calls:
+                over.append(f"{self.calls + 1} calls exceed the budget of {self.max_calls}")
+            if self.max_calls_per_endpoint is not None and endpoint_calls > self.max_calls_per_endpoint:
+                over.append(f"{endpoint_calls} calls to {event.method} {event.endpoint} exceed the budget of "
+                            f"{self.max_calls_per_endpoint} per endpoint")
+            if over:
+                self.exceeded = True
+                if self.raise_on_exceed:
+                    raise CallBudgetExceeded(", ".join(over))
+                self._logger.warning(", ".join(over))
+            self.calls += 1
+            self._endpoints[key] = endpoint_calls
+            url_key = (event.method, event.url)
+            self._urls[url_key] = self._urls.get(url_key, 0) + 1
+
+    def report(self):
+        """Report the calls per endpoint, repeated identical calls and fan-outs
+
+        Returns:
+            dict: The number of calls and retries, the calls per endpoint, the repeated calls and the fan-outs
+        """
+        with self._lock:
+            # Pages of one list call differ in the query only, count distinct paths
+            paths = {}
+            for method, url in self._urls:
+                paths.setdefault((method, templatize_url(url)), set()).add(urlsplit(url).path)
+            distinct_urls = {key: len(value) for key, value in paths.items()}
+
+            repeated = [{"method": method, "url": url, "calls": calls} for (method, url), calls in self._urls.items()
+                        if calls > 1 and not templatize_url(url).startswith("/v1/operations/")]
+            fanouts = [{"method": method, "endpoint": endpoint, "calls": calls, "distinct_urls": distinct_urls.get((method, endpoint), 0)}
+                       for (method, endpoint), calls in self._endpoints.items()
+                       if distinct_urls.get((method, endpoint), 0) >= self.fanout_threshold and "{" in endpoint
+                       and not endpoint.startswith("/v1/operations/")]
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "max_calls": self.max_calls,
+                "exceeded": self.exceeded,
+                "endpoints": sorted(({"method": method, "endpoint": endpoint, "calls": calls}
+                                     for (method, endpoint), calls in self._endpoints.items()),
+                                    key=lambda row: row["calls"], reverse=True),
+                "repeated_calls": sorted(repeated, key=lambda row: row["calls"], reverse=True),
+                "fanouts": sorted(fanouts, key=lambda row: row["calls"], reverse=True)
+            }
+
+    def __str__(self) -> str:
+        """Return a string representation of the report"""
+        return json.dumps(self.report(), indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
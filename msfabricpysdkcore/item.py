@@ -5,6 +5,8 @@ from msfabricpysdkcore.coreapi import FabricClientCore
 class Item:
     """Class to represent a item in Microsoft Fabric"""
 
+    __slots__ = ("id", "display_name", "description", "type", "definition", "properties", "workspace_id", "core_client")
+
     def __init__(self, id, display_name, type, workspace_id, core_client: FabricClientCore, properties = None, definition=None, description="") -> None:
         
         self.id = id
@@ -56,6 +58,11 @@ class Item:
         self.definition = resp_dict['definition']
         return resp_dict
 
+    def download_definition(self, target, type = None, format = None, chunk_size = None, timeout = 3600):
+        """Download the definition of the item part by part, without loading it into memory"""
+        return self.core_client.download_item_definition(self.workspace_id, self.id, target, type=type, format=format,
+                                                         chunk_size=chunk_size, timeout=timeout)
+
     def list_connections(self):
         """List connections of an item in a workspace"""
         return self.core_client.list_item_connections(workspace_id=self.workspace_id, item_id=self.id)
@@ -99,10 +106,11 @@ class Item:
         return self.core_client.create_shortcut(workspace_id=self.workspace_id, item_id=self.id,
                                                 path=path, name=name, target=target)
     
-    def create_shortcuts_bulk(self, create_shortcut_requests):
-        """Create multiple shortcuts in the item"""
+    def create_shortcuts_bulk(self, create_shortcut_requests, chunk_size = 50, max_workers = 4, max_retries = 2):
+        """Create multiple shortcuts in the item, in parallel chunks with retries of failed shortcuts"""
         return self.core_client.create_shortcuts_bulk(workspace_id=self.workspace_id, item_id=self.id,
-                                                      create_shortcut_requests=create_shortcut_requests)
+                                                      create_shortcut_requests=create_shortcut_requests,
+                                                      chunk_size=chunk_size, max_workers=max_workers, max_retries=max_retries)
     
     def delete_shortcut(self, path, name):
         """Delete the shortcut in the item"""
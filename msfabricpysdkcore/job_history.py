@@ -0,0 +1,292 @@
+import json
+import logging
+from datetime import datetime
+from itertools import groupby
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import run_concurrently
+from msfabricpysdkcore.util.history import HistoryStore, sql_timestamp
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_instances (
+    item_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    workspace_id TEXT NOT NULL,
+    item_type TEXT,
+    item_name TEXT,
+    job_type TEXT,
+    invoke_type TEXT,
+    status TEXT,
+    start_time_utc TEXT,
+    end_time_utc TEXT,
+    duration REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (item_id, id)
+);
+CREATE INDEX IF NOT EXISTS job_instances_item_start ON job_instances (item_id, start_time_utc);
+CREATE INDEX IF NOT EXISTS job_instances_job_type_start ON job_instances (job_type, start_time_utc);
+CREATE INDEX IF NOT EXISTS job_instances_status_start ON job_instances (status, start_time_utc);
+CREATE INDEX IF NOT EXISTS job_instances_workspace_start ON job_instances (workspace_id, start_time_utc);
+"""
+
+_GROUPS = {"item": ("workspace_id", "item_id", "item_name", "item_type"),
+           "item_type": ("item_type",),
+           "job_type": ("job_type",),
+           "workspace": ("workspace_id",)}
+
+
+def _parse_time(value):
+    """Parse a timestamp of the API, with up to 7 fractional digits and an optional Z"""
+    if not value:
+        return None
+    value = value.rstrip("Z")
+    if "." in value:
+        base, fraction = value.split(".", 1)
+        value = f"{base}.{fraction[:6].ljust(6, '0')}"
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _duration(job_instance):
+    start = _parse_time(job_instance.get("startTimeUtc", None))
+    end = _parse_time(job_instance.get("endTimeUtc", None))
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+def _percentile(values, percentile):
+    """Percentile of sorted values with linear interpolation between the closest ranks"""
+    position = (len(values) - 1) * percentile / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class JobInstanceHistory(HistoryStore):
+    """Class to keep a local SQLite copy of the job instances of all schedulable items of workspaces, synced incrementally
+
+    Job instances are stored keyed by item and job instance id, with their duration in seconds. A sync lists the items
+    of the workspaces, then pages through the job instances of every item, most recent first, and stops at the first
+    job instance that is already stored as completed. Stored job instances that were still running are fetched again.
+    """
+
+    _logger: logging.Logger
+
+    SCHEMA = _SCHEMA
+    TABLE = "job_instances"
+    KEY_COLUMN = "item_id"
+    SCHEDULABLE_ITEM_TYPES = ("Notebook", "DataPipeline", "SparkJobDefinition", "Lakehouse", "Dataflow", "CopyJob")
+    TERMINAL_STATUSES = ("Completed", "Failed", "Cancelled", "Deduped")
+
+    def __init__(self, core_client: FabricClientCore, path = ":memory:", max_workers = 8, calls_per_second = None) -> None:
+        """Initialize the JobInstanceHistory object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            path (str): The path of the SQLite database, in memory if ":memory:"
+            max_workers (int): The maximum number of items synced in parallel
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        """
+        super().__init__(core_client, path=path, max_workers=max_workers, calls_per_second=calls_per_second)
+
+    # Storing
+
+    def _store(self, item, job_instances):
+        self._insert([(item["id"], job_instance["id"], item["workspaceId"], item.get("type", None), item.get("displayName", None),
+                       job_instance.get("jobType", None), job_instance.get("invokeType", None), job_instance.get("status", None),
+                       job_instance.get("startTimeUtc", None), job_instance.get("endTimeUtc", None), _duration(job_instance),
+                       json.dumps(job_instance))
+                      for job_instance in job_instances])
+
+    # Syncing
+
+    def _items(self, workspace_ids, item_types):
+        def list_items(workspace_id):
+            self.rate_limiter.acquire()
+            return [item for item in self.core_client.list_items(workspace_id, raw=True) if item.get("type", None) in item_types]
+
+        items = []
+        failed = {}
+        for workspace_id, workspace_items, exception in run_concurrently(list_items, workspace_ids, self.max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not list the items of workspace {workspace_id}: {exception}")
+                failed[workspace_id] = str(exception)
+                continue
+            items.extend(dict(item, workspaceId=item.get("workspaceId", workspace_id)) for item in workspace_items)
+        return items, failed
+
+    def _get_job_instance(self, workspace_id, item_id, job_instance_id):
+        job_instance = self.core_client.get_item_job_instance(workspace_id=workspace_id, item_id=item_id,
+                                                              job_instance_id=job_instance_id)
+        return {"id": job_instance.id, "itemId": item_id, "jobType": job_instance.job_type,
+                "invokeType": job_instance.invoke_type, "status": job_instance.status,
+                "rootActivityId": job_instance.root_activity_id, "startTimeUtc": job_instance.start_time_utc,
+                "endTimeUtc": job_instance.end_time_utc, "failureReason": job_instance.failureReason}
+
+    def _sync_item(self, item):
+        workspace_id, item_id = item["workspaceId"], item["id"]
+        self.rate_limiter.acquire()
+        job_instances = self.core_client.iter_item_job_instances(workspace_id=workspace_id, item_id=item_id)
+        fetched, result = self._fetch(item_id, job_instances,
+                                      lambda job_instance_id: self._get_job_instance(workspace_id, item_id, job_instance_id))
+        self._store(item, fetched)
+        return dict(result, workspace_id=workspace_id, item_id=item_id)
+
+    def sync(self, workspace_ids = None, item_types = None):
+        """Fetch the job instances of the schedulable items of workspaces that are not stored yet, items in parallel
+
+        Args:
+            workspace_ids (list): The IDs of the workspaces, all workspaces if None
+            item_types (list): The item types to sync, SCHEDULABLE_ITEM_TYPES if None
+        Returns:
+            dict: The 'summary' with the number of items, new and updated job instances and failures and one result per item
+                  in 'items' with its number of 'new' and 'updated' job instances, whether paging stopped at a stored
+                  job instance and the 'error' if any. Workspaces whose items could not be listed are in 'failed_workspaces'
+        """
+        if workspace_ids is None:
+            self.rate_limiter.acquire()
+            workspace_ids = [workspace["id"] for workspace in self.core_client.list_workspaces(raw=True)]
+        item_types = set(item_types or self.SCHEDULABLE_ITEM_TYPES)
+        items, failed_workspaces = self._items(workspace_ids, item_types)
+
+        results, summary = self._sync_all(self._sync_item, items,
+                                          lambda item: {"workspace_id": item["workspaceId"], "item_id": item["id"]})
+        summary = dict(summary, items=len(results), failed=summary["failed"] + len(failed_workspaces))
+        return {"summary": summary, "items": results, "failed_workspaces": failed_workspaces}
+
+    # Querying
+
+    def _where(self, workspace_id = None, item_id = None, job_type = None, status = None, start = None, end = None):
+        conditions = []
+        parameters = []
+        for column, value in (("workspace_id", workspace_id), ("item_id", item_id), ("job_type", job_type), ("status", status)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            conditions.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            parameters.extend(values)
+        if start is not None:
+            conditions.append("start_time_utc >= ?")
+            parameters.append(sql_timestamp(start))
+        if end is not None:
+            conditions.append("start_time_utc < ?")
+            parameters.append(sql_timestamp(end))
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", parameters
+
+    def _group_columns(self, group_by):
+        if group_by not in _GROUPS:
+            raise ValueError(f"group_by must be one of {', '.join(_GROUPS)}")
+        return _GROUPS[group_by]
+
+    def query(self, workspace_id = None, item_id = None, job_type = None, status = None, start = None, end = None,
+              limit = None, as_frame = False):
+        """Query the stored job instances, most recent first
+
+        Args:
+            workspace_id (str or list): Only job instances of this workspace or these workspaces
+            item_id (str or list): Only job instances of this item or these items
+            job_type (str or list): Only job instances of this job type or these job types
+            status (str or list): Only job instances with this status or one of these statuses
+            start (datetime or str): Only job instances started at or after this time
+            end (datetime or str): Only job instances started before this time
+            limit (int): The maximum number of job instances
+            as_frame (bool): Whether to return a pandas DataFrame with one column per field and the duration in seconds
+        Returns:
+            list or pandas.DataFrame: The JobInstance objects
+        """
+        from msfabricpysdkcore.job_instance import JobInstance
+
+        where, parameters = self._where(workspace_id=workspace_id, item_id=item_id, job_type=job_type, status=status,
+                                        start=start, end=end)
+        sql = f"SELECT workspace_id, item_id, item_name, item_type, duration, data FROM job_instances{where} ORDER BY start_time_utc DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(int(limit))
+
+        rows = self._execute(sql, parameters)
+        job_instances = []
+        for row in rows:
+            job_dict = json.loads(row["data"])
+            job_dict["workspaceId"] = row["workspace_id"]
+            job_dict["itemId"] = row["item_id"]
+            if as_frame:
+                job_dict.update(itemName=row["item_name"], itemType=row["item_type"], duration=row["duration"])
+                job_instances.append(job_dict)
+                continue
+            job_instances.append(JobInstance(id=job_dict["id"], item_id=job_dict["itemId"], workspace_id=job_dict["workspaceId"],
+                                             job_type=job_dict.get("jobType", None), invoke_type=job_dict.get("invokeType", None),
+                                             status=job_dict.get("status", None), root_activity_id=job_dict.get("rootActivityId", None),
+                                             start_time_utc=job_dict.get("startTimeUtc", None), end_time_utc=job_dict.get("endTimeUtc", None),
+                                             failureReason=job_dict.get("failureReason", None), core_client=self.core_client))
+        if as_frame:
+            from msfabricpysdkcore.util.columnar import ColumnarBuilder
+
+            builder = ColumnarBuilder()
+            builder.append(job_instances)
+            return builder.to_frame()
+        return job_instances
+
+    def duration_percentile(self, percentile = 95, group_by = "item", workspace_id = None, job_type = None, status = "Completed",
+                            start = None, end = None):
+        """Compute a percentile of the job durations per group
+
+        Args:
+            percentile (float): The percentile, between 0 and 100
+            group_by (str): "item", "item_type", "job_type" or "workspace"
+            workspace_id (str or list): Only job instances of this workspace or these workspaces
+            job_type (str or list): Only job instances of this job type or these job types
+            status (str or list): Only job instances with this status or one of these statuses, all if None
+            start (datetime or str): Only job instances started at or after this time
+            end (datetime or str): Only job instances started before this time
+        Returns:
+            list: One row per group with the group columns, the number of 'runs' and the percentile of their duration
+                  in seconds, e.g. 'p95', slowest first
+        """
+        columns = self._group_columns(group_by)
+        where, parameters = self._where(workspace_id=workspace_id, job_type=job_type, status=status, start=start, end=end)
+        where += (" AND " if where else " WHERE ") + "duration IS NOT NULL"
+        sql = f"SELECT {', '.join(columns)}, duration FROM job_instances{where} ORDER BY {', '.join(columns)}, duration"
+        rows = self._execute(sql, parameters)
+
+        key = f"p{percentile:g}"
+        results = []
+        for group, group_rows in groupby(rows, key=lambda row: tuple(row[column] for column in columns)):
+            durations = [row["duration"] for row in group_rows]
+            result = dict(zip(columns, group))
+            result["runs"] = len(durations)
+            result[key] = _percentile(durations, percentile)
+            results.append(result)
+        results.sort(key=lambda result: result[key], reverse=True)
+        return results
+
+    def failure_rate(self, group_by = "job_type", workspace_id = None, job_type = None, start = None, end = None):
+        """Compute the share of failed job instances per group, among the completed, failed and cancelled ones
+
+        Args:
+            group_by (str): "item", "item_type", "job_type" or "workspace"
+            workspace_id (str or list): Only job instances of this workspace or these workspaces
+            job_type (str or list): Only job instances of this job type or these job types
+            start (datetime or str): Only job instances started at or after this time
+            end (datetime or str): Only job instances started before this time
+        Returns:
+            list: One row per group with the group columns, the number of 'runs', 'failed' and 'cancelled' job instances
+                  and the 'failure_rate', highest first
+        """
+        columns = self._group_columns(group_by)
+        where, parameters = self._where(workspace_id=workspace_id, job_type=job_type, status=("Completed", "Failed", "Cancelled"),
+                                        start=start, end=end)
+        sql = (f"SELECT {', '.join(columns)}, COUNT(*) AS runs, SUM(status = 'Failed') AS failed, "
+               f"SUM(status = 'Cancelled') AS cancelled FROM job_instances{where} GROUP BY {', '.join(columns)}")
+        rows = self._execute(sql, parameters)
+
+        results = []
+        for row in rows:
+            result = {column: row[column] for column in columns}
+            result.update(runs=row["runs"], failed=row["failed"], cancelled=row["cancelled"],
+                          failure_rate=row["failed"] / row["runs"])
+            results.append(result)
+        results.sort(key=lambda result: result["failure_rate"], reverse=True)
+        return results
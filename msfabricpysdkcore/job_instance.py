@@ -4,6 +4,8 @@ from msfabricpysdkcore.coreapi import FabricClientCore
 class JobInstance:
     """Class to represent a job instance in Microsoft Fabric"""
 
+    __slots__ = ("id", "item_id", "workspace_id", "job_type", "invoke_type", "status", "root_activity_id", "start_time_utc", "end_time_utc", "failureReason", "core_client")
+
     def __init__(self, id, item_id, workspace_id, core_client: FabricClientCore, job_type, invoke_type, status, root_activity_id,
                  start_time_utc, end_time_utc, failureReason):
 
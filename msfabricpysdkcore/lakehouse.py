@@ -3,6 +3,8 @@ from msfabricpysdkcore.item import Item
 class Lakehouse(Item):
     """Class to represent a item in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
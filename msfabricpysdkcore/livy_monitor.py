@@ -0,0 +1,242 @@
+import logging
+import threading
+from time import monotonic, sleep
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import logger, RateLimiter, run_concurrently
+
+
+class LivySessionMonitor:
+    """Class to poll the livy sessions of many workspaces and items and report only what changed
+
+    Every target keeps its own polling interval. It is reset to min_interval while the target has active sessions or
+    changed at the last poll, and grows by the backoff factor up to max_interval while it stays idle.
+    A poll pages through the sessions of a target, most recently submitted first, and stops at the first session that
+    is already known as ended. Known active sessions that were not reached are fetched one by one.
+
+    A target is a workspace ID, for all the sessions of the workspace, a (workspace_id, item_id, item_type) tuple or a
+    Lakehouse, Notebook or SparkJobDefinition object.
+
+    Events are dictionaries with the 'event' ("new", "state_changed" or "ended"), the 'workspace_id', 'item_id' and
+    'item_type' of the target, the 'livy_id', the 'state', the 'previous_state' and the 'session' as returned by the API.
+    """
+
+    _logger: logging.Logger
+
+    ENDED_STATES = ("Succeeded", "Failed", "Cancelled", "Dead", "Killed", "Error")
+
+    def __init__(self, core_client: FabricClientCore, targets, min_interval = 60, max_interval = 900, backoff = 2,
+                 max_workers = 8, calls_per_second = None) -> None:
+        """Initialize the LivySessionMonitor object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            targets (list): The targets to monitor, see the class documentation
+            min_interval (float): The polling interval in seconds of targets with activity
+            max_interval (float): The maximum polling interval in seconds of idle targets
+            backoff (float): The factor by which the polling interval of an idle target grows after each poll
+            max_workers (int): The maximum number of targets polled in parallel
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        """
+        self._logger = logger.getChild(__name__)
+        self.core_client = core_client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(calls_per_second)
+        self._lock = threading.Lock()
+        # Session state table, (target, livy_id) to the last seen session
+        self._sessions = {}
+        # Polling schedule per target
+        self._targets = {}
+        for target in targets:
+            self.add_target(target)
+
+    def _target(self, target):
+        if isinstance(target, str):
+            return (target, None, None)
+        if isinstance(target, tuple):
+            workspace_id, item_id, item_type = target
+            return (workspace_id, item_id, item_type)
+        return (target.workspace_id, target.id, target.type)
+
+    def add_target(self, target):
+        """Add a target to monitor, polled at the next poll
+
+        Args:
+            target (str, tuple or Item): The target, see the class documentation
+        """
+        target = self._target(target)
+        with self._lock:
+            self._targets.setdefault(target, {'interval': self.min_interval, 'next_poll': 0, 'initialized': False,
+                                              'last_poll': None, 'error': None})
+
+    def remove_target(self, target):
+        """Stop monitoring a target and forget its sessions
+
+        Args:
+            target (str, tuple or Item): The target, see the class documentation
+        """
+        target = self._target(target)
+        with self._lock:
+            self._targets.pop(target, None)
+            for key in [key for key in self._sessions if key[0] == target]:
+                del self._sessions[key]
+
+    # State
+
+    def _ended(self, session):
+        return session.get('state', None) in self.ENDED_STATES
+
+    def sessions(self, active_only = False):
+        """Get the sessions of the state table
+
+        Args:
+            active_only (bool): Whether to only return the sessions that have not ended
+        Returns:
+            list: The last seen sessions, each with the 'workspace_id', 'item_id' and 'item_type' of its target
+        """
+        with self._lock:
+            items = list(self._sessions.items())
+        sessions = []
+        for (target, _), session in items:
+            if active_only and self._ended(session):
+                continue
+            sessions.append(dict(session, workspace_id=target[0], item_id=target[1], item_type=target[2]))
+        return sessions
+
+    def schedule(self):
+        """Get the polling schedule of the targets
+
+        Returns:
+            list: One row per target with its 'workspace_id', 'item_id', 'item_type', 'interval' in seconds,
+                  seconds until the 'next_poll' and the 'error' of the last poll
+        """
+        now = monotonic()
+        with self._lock:
+            return [{'workspace_id': target[0], 'item_id': target[1], 'item_type': target[2],
+                     'interval': state['interval'], 'next_poll': max(0.0, state['next_poll'] - now), 'error': state['error']}
+                    for target, state in self._targets.items()]
+
+    # Polling
+
+    def _fetch(self, target):
+        """Fetch the sessions of a target that may have changed since the last poll"""
+        workspace_id, item_id, item_type = target
+        with self._lock:
+            known = {livy_id: session for (known_target, livy_id), session in self._sessions.items() if known_target == target}
+
+        self.rate_limiter.acquire()
+        fetched = {}
+        for session in self.core_client.iter_livy_sessions(workspace_id, item_id=item_id, item_type=item_type):
+            livy_id = session['livyId']
+            fetched[livy_id] = session
+            if livy_id in known and self._ended(known[livy_id]):
+                # Older sessions are known already, do not fetch further pages
+                break
+
+        for livy_id, session in known.items():
+            if livy_id in fetched or self._ended(session):
+                continue
+            self.rate_limiter.acquire()
+            session_item = session.get('item', None) or {}
+            fetched[livy_id] = self.core_client.get_livy_session(workspace_id,
+                                                                 item_id=item_id or session_item.get('itemId', None),
+                                                                 item_type=item_type or session.get('itemType', None),
+                                                                 livy_id=livy_id)
+        return fetched
+
+    def _diff(self, target, fetched, initialized):
+        """Update the state table with the fetched sessions of a target and return the change events"""
+        events = []
+        workspace_id, item_id, item_type = target
+
+        def event(name, livy_id, session, previous_state):
+            events.append({'event': name, 'workspace_id': workspace_id, 'item_id': item_id, 'item_type': item_type,
+                           'livy_id': livy_id, 'state': session.get('state', None), 'previous_state': previous_state,
+                           'session': session})
+
+        with self._lock:
+            for livy_id, session in fetched.items():
+                previous = self._sessions.get((target, livy_id), None)
+                self._sessions[(target, livy_id)] = session
+                if previous is None:
+                    # The first poll of a target only reports the sessions that are still running
+                    if initialized or not self._ended(session):
+                        event("new", livy_id, session, None)
+                    if initialized and self._ended(session):
+                        event("ended", livy_id, session, None)
+                    continue
+                state = session.get('state', None)
+                previous_state = previous.get('state', None)
+                if state == previous_state:
+                    continue
+                event("ended" if self._ended(session) else "state_changed", livy_id, session, previous_state)
+        return events
+
+    def poll(self, force = False):
+        """Poll the targets that are due concurrently
+
+        Args:
+            force (bool): Whether to poll all targets, due or not
+        Returns:
+            list: The change events, see the class documentation
+        """
+        now = monotonic()
+        with self._lock:
+            due = [target for target, state in self._targets.items() if force or state['next_poll'] <= now]
+
+        events = []
+        for target, fetched, exception in run_concurrently(self._fetch, due, max_workers=self.max_workers):
+            with self._lock:
+                state = self._targets.get(target, None)
+            if state is None:
+                # Removed while it was polled
+                continue
+            now = monotonic()
+            state['last_poll'] = now
+            if exception is not None:
+                # Retried at the next interval
+                self._logger.warning(f"Could not list the livy sessions of {target}: {exception}")
+                state['error'] = str(exception)
+                state['next_poll'] = now + state['interval']
+                continue
+
+            target_events = self._diff(target, fetched, state['initialized'])
+            state['initialized'] = True
+            state['error'] = None
+            active = any(not self._ended(session) for session in fetched.values())
+            if active or target_events:
+                state['interval'] = self.min_interval
+            else:
+                state['interval'] = min(state['interval'] * self.backoff, self.max_interval)
+            state['next_poll'] = now + state['interval']
+            events.extend(target_events)
+        return events
+
+    def run(self, on_event, duration = None, stop_event = None):
+        """Poll the targets as they are due and pass every change event to a callback
+
+        Args:
+            on_event (callable): Receives every change event
+            duration (float): The time in seconds after which to stop, run until stop_event is set if None
+            stop_event (threading.Event): An event to stop the monitor
+        """
+        end = monotonic() + duration if duration is not None else None
+        while stop_event is None or not stop_event.is_set():
+            for event in self.poll():
+                on_event(event)
+
+            now = monotonic()
+            with self._lock:
+                next_poll = min((state['next_poll'] for state in self._targets.values()), default=now + self.min_interval)
+            if end is not None:
+                if now >= end:
+                    return
+                next_poll = min(next_poll, end)
+            wait = max(0.0, next_poll - now)
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                sleep(wait)
@@ -30,6 +30,8 @@ class LongRunningOperation:
         while self.state not in ('Succeeded', 'Failed'):
             self.state = self.get_operation_state()["status"]
             duration = int(time() - start_time)
+            self.core_client._emit("lro_poll", method="GET", url=f"https://api.fabric.microsoft.com/v1/operations/{self.operation_id}",
+                                   operation_id=self.operation_id, wait=time() - start_time)
             if duration > 60:
                 
                 if self.state == "Running":
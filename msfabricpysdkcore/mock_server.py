@@ -0,0 +1,524 @@
+import base64
+import json
+import logging
+import random
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep, time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from msfabricpysdkcore.util import logger
+
+# Collections of the type specific item APIs, e.g. /workspaces/{workspaceId}/notebooks, by lower case name
+ITEM_COLLECTIONS = {
+    "anomalydetectors": "AnomalyDetector",
+    "apacheairflowjobs": "ApacheAirflowJob",
+    "copyjobs": "CopyJob",
+    "cosmosdbdatabases": "CosmosDbDatabase",
+    "dataagents": "DataAgent",
+    "dataflows": "Dataflow",
+    "datapipelines": "DataPipeline",
+    "digitaltwinbuilders": "DigitalTwinBuilder",
+    "digitaltwinbuilderflows": "DigitalTwinBuilderFlow",
+    "environments": "Environment",
+    "eventhouses": "Eventhouse",
+    "eventschemasets": "EventSchemaSet",
+    "eventstreams": "Eventstream",
+    "graphmodels": "GraphModel",
+    "graphqlapis": "GraphQLApi",
+    "graphquerysets": "GraphQuerySet",
+    "kqldashboards": "KQLDashboard",
+    "kqldatabases": "KQLDatabase",
+    "kqlquerysets": "KQLQueryset",
+    "lakehouses": "Lakehouse",
+    "maps": "Map",
+    "mirroredazuredatabrickscatalogs": "MirroredAzureDatabricksCatalog",
+    "mirroreddatabases": "MirroredDatabase",
+    "mlexperiments": "MLExperiment",
+    "mlmodels": "MLModel",
+    "mounteddatafactories": "MountedDataFactory",
+    "notebooks": "Notebook",
+    "ontologies": "Ontology",
+    "operationsagents": "OperationsAgent",
+    "reflexes": "Reflex",
+    "reports": "Report",
+    "semanticmodels": "SemanticModel",
+    "snowflakedatabases": "SnowflakeDatabase",
+    "sparkjobdefinitions": "SparkJobDefinition",
+    "sqldatabases": "SQLDatabase",
+    "userdatafunctions": "UserDataFunction",
+    "variablelibraries": "VariableLibrary",
+    "warehouses": "Warehouse",
+    "warehousesnapshots": "WarehouseSnapshot"
+}
+
+_ID = r"(?P<{}>[^/]+)"
+
+
+class MockFabricServer:
+    """Local stand-in for the Fabric REST API to test and benchmark the SDK without a tenant
+
+    The server runs on localhost in a background thread and covers workspaces, items, item definitions
+    (as long running operations), paging with continuationUri, throttling with 429 and Retry-After and
+    the admin workspace and item lists. State is kept in memory.
+
+    Example:
+        with MockFabricServer(latency=0.01, page_size=50) as server:
+            server.populate(workspaces=5, items_per_workspace=200)
+            fc = server.client()
+            items = fc.list_items(workspace_id=fc.list_workspaces()[0].id)
+    """
+
+    _logger: logging.Logger
+
+    def __init__(self, latency = 0.0, page_size = 100, throttle_rate = 0.0, retry_after = 1, lro_duration = 0.0,
+                 token = "mock-token", host = "127.0.0.1", port = 0, seed = None) -> None:
+        """Initialize the MockFabricServer object
+
+        Args:
+            latency (float): The time in seconds each request takes
+            page_size (int): The number of entries per page of list responses
+            throttle_rate (float): The share of requests between 0 and 1 that are answered with 429
+            retry_after (float): The Retry-After of throttled responses in seconds
+            lro_duration (float): The time in seconds until a long running operation succeeds
+            token (str): The bearer token the server accepts
+            host (str): The host to bind to
+            port (int): The port to bind to, a free port if 0
+            seed (int): The seed of the random throttling, for reproducible runs
+        """
+        self._logger = logger.getChild(__name__)
+        self.latency = latency
+        self.page_size = page_size
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.lro_duration = lro_duration
+        self.token = token
+        self.host = host
+        self.port = port
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+        self.workspaces = {}
+        self.items = {}
+        self.operations = {}
+        self.stats = {}
+        self.reset_stats()
+
+        self._routes = [(method, re.compile("^" + pattern.format(ws=_ID.format("workspace_id"), coll=_ID.format("collection"),
+                                                                 item=_ID.format("item_id"), op=_ID.format("operation_id")) + "$"),
+                         getattr(self, handler))
+                        for method, pattern, handler in (
+                            ("GET", "/v1/workspaces", "_list_workspaces"),
+                            ("POST", "/v1/workspaces", "_create_workspace"),
+                            ("GET", "/v1/workspaces/{ws}", "_get_workspace"),
+                            ("PATCH", "/v1/workspaces/{ws}", "_update_workspace"),
+                            ("DELETE", "/v1/workspaces/{ws}", "_delete_workspace"),
+                            ("GET", "/v1/workspaces/{ws}/{coll}", "_list_items"),
+                            ("POST", "/v1/workspaces/{ws}/{coll}", "_create_item"),
+                            ("GET", "/v1/workspaces/{ws}/{coll}/{item}", "_get_item"),
+                            ("PATCH", "/v1/workspaces/{ws}/{coll}/{item}", "_update_item"),
+                            ("DELETE", "/v1/workspaces/{ws}/{coll}/{item}", "_delete_item"),
+                            ("POST", "/v1/workspaces/{ws}/{coll}/{item}/getDefinition", "_get_item_definition"),
+                            ("POST", "/v1/workspaces/{ws}/{coll}/{item}/updateDefinition", "_update_item_definition"),
+                            ("GET", "/v1/operations/{op}", "_get_operation_state"),
+                            ("GET", "/v1/operations/{op}/result", "_get_operation_result"),
+                            ("GET", "/v1/admin/workspaces", "_admin_list_workspaces"),
+                            ("GET", "/v1/admin/workspaces/{ws}", "_admin_get_workspace"),
+                            ("GET", "/v1/admin/items", "_admin_list_items"))]
+
+    # Lifecycle
+
+    @property
+    def base_url(self):
+        """The base URL of the running server, to be passed as base_url to the clients"""
+        if self._httpd is None:
+            raise Exception("The server is not running, call start() first")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start the server in a background thread
+        Returns:
+            MockFabricServer: The server
+        """
+        if self._httpd is not None:
+            return self
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _MockFabricRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="MockFabricServer", daemon=True)
+        self._thread.start()
+        self._logger.info(f"Mock Fabric API listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def client(self, client_class = None):
+        """Create a client pointing at the server and authenticating with its token
+
+        Args:
+            client_class (type): FabricClientCore or FabricClientAdmin, FabricClientCore if None
+        Returns:
+            FabricClient: The client
+        """
+        from msfabricpysdkcore.auth import FabricStaticTokenAuthentication
+        if client_class is None:
+            from msfabricpysdkcore.coreapi import FabricClientCore
+            client_class = FabricClientCore
+
+        client = client_class(base_url=self.base_url)
+        client.auth = FabricStaticTokenAuthentication(self.token, scope=client.scope)
+        return client
+
+    def reset_stats(self):
+        """Reset the request statistics"""
+        with self._lock:
+            self.stats = {"requests": 0, "throttled": 0, "routes": {}}
+
+    # Seeding
+
+    def add_workspace(self, display_name, capacity_id = None, description = ""):
+        """Add a workspace to the server state
+
+        Args:
+            display_name (str): The display name of the workspace
+            capacity_id (str): The ID of the capacity of the workspace
+            description (str): The description of the workspace
+        Returns:
+            dict: The workspace
+        """
+        workspace = {"id": str(uuid.uuid4()), "displayName": display_name, "description": description or "",
+                     "type": "Workspace", "capacityId": capacity_id}
+        with self._lock:
+            self.workspaces[workspace["id"]] = workspace
+        return workspace
+
+    def add_item(self, workspace_id, display_name, type, definition = None, description = ""):
+        """Add an item to the server state
+
+        Args:
+            workspace_id (str): The ID of the workspace
+            display_name (str): The display name of the item
+            type (str): The type of the item
+            definition (dict): The definition of the item
+            description (str): The description of the item
+        Returns:
+            dict: The item
+        """
+        item = {"id": str(uuid.uuid4()), "displayName": display_name, "description": description or "",
+                "type": type, "workspaceId": workspace_id}
+        with self._lock:
+            self.items[item["id"]] = {"item": item, "definition": definition,
+                                      "lastUpdatedDate": datetime.now(timezone.utc).isoformat()}
+        return item
+
+    def populate(self, workspaces = 10, items_per_workspace = 100, item_types = ("Notebook", "Report", "SemanticModel"),
+                 definition_parts = 1, part_size = 1024):
+        """Fill the server state with generated workspaces and items
+
+        Args:
+            workspaces (int): The number of workspaces
+            items_per_workspace (int): The number of items per workspace
+            item_types (tuple): The item types to cycle through
+            definition_parts (int): The number of definition parts per item
+            part_size (int): The size of every definition part before base64 encoding, in bytes
+        Returns:
+            list: The IDs of the created workspaces
+        """
+        payload = base64.b64encode(b"x" * part_size).decode()
+        workspace_ids = []
+        for i in range(workspaces):
+            workspace = self.add_workspace(f"workspace_{i}")
+            workspace_ids.append(workspace["id"])
+            for j in range(items_per_workspace):
+                definition = {"parts": [{"path": f"part_{k}.json", "payload": payload, "payloadType": "InlineBase64"}
+                                        for k in range(definition_parts)]}
+                self.add_item(workspace["id"], f"item_{j}", item_types[j % len(item_types)], definition=definition)
+        return workspace_ids
+
+    # Request handling
+
+    def _handle(self, handler, method):
+        split = urlsplit(handler.path)
+        path = split.path.rstrip("/")
+        query = dict(parse_qsl(split.query))
+
+        # Always consume the body to keep the connection usable
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = None
+        if length:
+            raw = handler.rfile.read(length)
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                body = raw
+
+        if self.latency:
+            sleep(self.latency)
+
+        route = None
+        match = None
+        for route_method, pattern, route_handler in self._routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                route = route_handler
+                break
+
+        with self._lock:
+            self.stats["requests"] += 1
+            key = f"{method} {pattern.pattern if route else path}"
+            self.stats["routes"][key] = self.stats["routes"].get(key, 0) + 1
+            throttled = self.throttle_rate and self._random.random() < self.throttle_rate
+            if throttled:
+                self.stats["throttled"] += 1
+
+        if handler.headers.get("Authorization") != f"Bearer {self.token}":
+            return 401, {"errorCode": "Unauthorized", "message": "Invalid or missing bearer token"}, {}
+        if throttled:
+            return 429, {"errorCode": "RequestBlocked", "message": "Request is blocked by the upstream service until the Retry-After"}, \
+                {"Retry-After": str(self.retry_after)}
+        if route is None:
+            return 404, {"errorCode": "EntityNotFound", "message": f"No mock route for {method} {path}"}, {}
+
+        return route(body=body, query=query, path=path, **match.groupdict())
+
+    def _not_found(self, what):
+        return 404, {"errorCode": "EntityNotFound", "message": f"{what} not found"}, {}
+
+    def _page(self, entries, path, query, key = "value"):
+        offset = int(query.get("continuationToken") or 0)
+        page = {key: entries[offset:offset + self.page_size]}
+        if offset + self.page_size < len(entries):
+            token = str(offset + self.page_size)
+            params = dict(query)
+            params["continuationToken"] = token
+            page["continuationToken"] = token
+            page["continuationUri"] = f"{self.base_url}{path}?{urlencode(params)}"
+        return 200, page, {}
+
+    def _start_operation(self, result):
+        operation_id = str(uuid.uuid4())
+        with self._lock:
+            self.operations[operation_id] = {"created": time(), "result": result}
+        headers = {"Location": f"{self.base_url}/v1/operations/{operation_id}",
+                   "x-ms-operation-id": operation_id,
+                   "Retry-After": str(max(1, int(self.lro_duration)))}
+        return 202, None, headers
+
+    def _collection_type(self, collection):
+        if collection == "items":
+            return None
+        return ITEM_COLLECTIONS[collection.lower()]
+
+    def _find_item(self, workspace_id, collection, item_id):
+        if collection != "items" and collection.lower() not in ITEM_COLLECTIONS:
+            return None
+        entry = self.items.get(item_id)
+        if entry is None or entry["item"]["workspaceId"] != workspace_id:
+            return None
+        type = self._collection_type(collection)
+        if type is not None and entry["item"]["type"] != type:
+            return None
+        return entry
+
+    # Workspaces
+
+    def _list_workspaces(self, path, query, **kwargs):
+        return self._page(list(self.workspaces.values()), path, query)
+
+    def _create_workspace(self, body, **kwargs):
+        if any(ws["displayName"] == body["displayName"] for ws in self.workspaces.values()):
+            return 409, {"errorCode": "WorkspaceNameAlreadyExists", "message": "Workspace name already exists"}, {}
+        return 201, self.add_workspace(body["displayName"], capacity_id=body.get("capacityId"),
+                                       description=body.get("description")), {}
+
+    def _get_workspace(self, workspace_id, **kwargs):
+        if workspace_id not in self.workspaces:
+            return self._not_found("Workspace")
+        return 200, self.workspaces[workspace_id], {}
+
+    def _update_workspace(self, workspace_id, body, **kwargs):
+        if workspace_id not in self.workspaces:
+            return self._not_found("Workspace")
+        with self._lock:
+            for key in ("displayName", "description"):
+                if body and key in body:
+                    self.workspaces[workspace_id][key] = body[key]
+        return 200, self.workspaces[workspace_id], {}
+
+    def _delete_workspace(self, workspace_id, **kwargs):
+        if workspace_id not in self.workspaces:
+            return self._not_found("Workspace")
+        with self._lock:
+            del self.workspaces[workspace_id]
+            for item_id in [item_id for item_id, entry in self.items.items() if entry["item"]["workspaceId"] == workspace_id]:
+                del self.items[item_id]
+        return 200, None, {}
+
+    # Items
+
+    def _list_items(self, workspace_id, collection, path, query, **kwargs):
+        if workspace_id not in self.workspaces or (collection != "items" and collection.lower() not in ITEM_COLLECTIONS):
+            return self._not_found("Workspace or collection")
+        type = self._collection_type(collection) or query.get("type")
+        items = [entry["item"] for entry in list(self.items.values())
+                 if entry["item"]["workspaceId"] == workspace_id and (type is None or entry["item"]["type"] == type)]
+        return self._page(items, path, query)
+
+    def _create_item(self, workspace_id, collection, body, **kwargs):
+        if workspace_id not in self.workspaces or (collection != "items" and collection.lower() not in ITEM_COLLECTIONS):
+            return self._not_found("Workspace or collection")
+        type = self._collection_type(collection) or body.get("type")
+        item = self.add_item(workspace_id, body["displayName"], type, definition=body.get("definition"),
+                             description=body.get("description"))
+        if body.get("definition"):
+            return self._start_operation(item)
+        return 201, item, {}
+
+    def _get_item(self, workspace_id, collection, item_id, **kwargs):
+        entry = self._find_item(workspace_id, collection, item_id)
+        if entry is None:
+            return self._not_found("Item")
+        return 200, entry["item"], {}
+
+    def _update_item(self, workspace_id, collection, item_id, body, **kwargs):
+        entry = self._find_item(workspace_id, collection, item_id)
+        if entry is None:
+            return self._not_found("Item")
+        with self._lock:
+            for key in ("displayName", "description"):
+                if body and key in body:
+                    entry["item"][key] = body[key]
+        return 200, entry["item"], {}
+
+    def _delete_item(self, workspace_id, collection, item_id, **kwargs):
+        if self._find_item(workspace_id, collection, item_id) is None:
+            return self._not_found("Item")
+        with self._lock:
+            del self.items[item_id]
+        return 200, None, {}
+
+    def _get_item_definition(self, workspace_id, collection, item_id, **kwargs):
+        entry = self._find_item(workspace_id, collection, item_id)
+        if entry is None:
+            return self._not_found("Item")
+        return self._start_operation({"definition": entry["definition"] or {"parts": []}})
+
+    def _update_item_definition(self, workspace_id, collection, item_id, body, **kwargs):
+        entry = self._find_item(workspace_id, collection, item_id)
+        if entry is None:
+            return self._not_found("Item")
+        with self._lock:
+            entry["definition"] = body["definition"]
+            entry["lastUpdatedDate"] = datetime.now(timezone.utc).isoformat()
+        return self._start_operation(None)
+
+    # Long running operations
+
+    def _get_operation_state(self, operation_id, **kwargs):
+        operation = self.operations.get(operation_id)
+        if operation is None:
+            return self._not_found("Operation")
+        elapsed = time() - operation["created"]
+        status = "Succeeded" if elapsed >= self.lro_duration else "Running"
+        percent_complete = 100 if status == "Succeeded" else int(100 * elapsed / self.lro_duration)
+        return 200, {"status": status, "percentComplete": percent_complete, "error": None}, {}
+
+    def _get_operation_result(self, operation_id, **kwargs):
+        operation = self.operations.get(operation_id)
+        if operation is None:
+            return self._not_found("Operation")
+        if operation["result"] is None:
+            return 400, {"errorCode": "OperationHasNoResult", "message": "The operation has no result"}, {}
+        return 200, operation["result"], {}
+
+    # Admin
+
+    def _admin_workspace(self, workspace):
+        return {"id": workspace["id"], "name": workspace["displayName"], "type": "Workspace", "state": "Active",
+                "capacityId": workspace["capacityId"]}
+
+    def _admin_list_workspaces(self, path, query, **kwargs):
+        workspaces = [self._admin_workspace(ws) for ws in list(self.workspaces.values())
+                      if "name" not in query or ws["displayName"] == query["name"]]
+        return self._page(workspaces, path, query, key="workspaces")
+
+    def _admin_get_workspace(self, workspace_id, **kwargs):
+        if workspace_id not in self.workspaces:
+            return self._not_found("Workspace")
+        return 200, self._admin_workspace(self.workspaces[workspace_id]), {}
+
+    def _admin_list_items(self, path, query, **kwargs):
+        items = []
+        for entry in list(self.items.values()):
+            item = entry["item"]
+            if "workspaceId" in query and item["workspaceId"] != query["workspaceId"]:
+                continue
+            if "type" in query and item["type"] != query["type"]:
+                continue
+            workspace = self.workspaces.get(item["workspaceId"], {})
+            items.append({"id": item["id"], "type": item["type"], "name": item["displayName"], "state": "Active",
+                          "description": item["description"], "workspaceId": item["workspaceId"],
+                          "capacityId": workspace.get("capacityId"), "lastUpdatedDate": entry["lastUpdatedDate"]})
+        return self._page(items, path, query, key="itemEntities")
+
+
+class _MockFabricRequestHandler(BaseHTTPRequestHandler):
+    """Request handler dispatching to the MockFabricServer of the HTTP server"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, method):
+        try:
+            status, body, headers = self.server.mock._handle(self, method)
+        except Exception as e:
+            status, body, headers = 500, {"errorCode": "InternalServerError", "message": str(e)}, {}
+        content = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if content:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def do_PATCH(self):
+        self._respond("PATCH")
+
+    def do_PUT(self):
+        self._respond("PUT")
+
+    def do_DELETE(self):
+        self._respond("DELETE")
+
+    def log_message(self, format, *args):
+        self.server.mock._logger.debug(format % args)
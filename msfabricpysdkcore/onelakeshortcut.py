@@ -4,6 +4,8 @@ from msfabricpysdkcore.coreapi import FabricClientCore
 class OneLakeShortcut:
     """Class to represent a onelake shortcut in Microsoft Fabric"""
 
+    __slots__ = ("name", "path", "target", "item_id", "workspace_id", "core_client")
+
     def __init__(self, name, path, workspace_id, item_id, target,
                   core_client: FabricClientCore) -> None:
         
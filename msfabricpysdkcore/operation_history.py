@@ -0,0 +1,152 @@
+import json
+import logging
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util.history import HistoryStore, sql_timestamp
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    pipeline_id TEXT NOT NULL,
+    operation_id TEXT NOT NULL,
+    type TEXT,
+    status TEXT,
+    execution_start_time TEXT,
+    execution_end_time TEXT,
+    last_updated_time TEXT,
+    source_stage_id TEXT,
+    target_stage_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (pipeline_id, operation_id)
+);
+CREATE INDEX IF NOT EXISTS operations_status ON operations (status, execution_start_time);
+CREATE INDEX IF NOT EXISTS operations_start ON operations (execution_start_time);
+CREATE INDEX IF NOT EXISTS operations_pipeline_start ON operations (pipeline_id, execution_start_time);
+"""
+
+
+class DeploymentOperationHistory(HistoryStore):
+    """Class to keep a local SQLite copy of the operations of deployment pipelines, synced incrementally
+
+    Operations are stored keyed by pipeline and operation id. A sync pages through the operations of a pipeline,
+    most recent first, and stops at the first page containing an operation that is already stored as completed.
+    Stored operations that were still running are fetched again.
+    """
+
+    _logger: logging.Logger
+
+    SCHEMA = _SCHEMA
+    TABLE = "operations"
+    KEY_COLUMN = "pipeline_id"
+    ID_COLUMN = "operation_id"
+    TERMINAL_STATUSES = ("Succeeded", "Failed")
+
+    def __init__(self, core_client: FabricClientCore, path = ":memory:", max_workers = 8, calls_per_second = None) -> None:
+        """Initialize the DeploymentOperationHistory object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            path (str): The path of the SQLite database, in memory if ":memory:"
+            max_workers (int): The maximum number of pipelines synced in parallel
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        """
+        super().__init__(core_client, path=path, max_workers=max_workers, calls_per_second=calls_per_second)
+
+    # Storing
+
+    def _store(self, pipeline_id, operations):
+        self._insert([(pipeline_id, operation["id"], operation.get("type", None), operation.get("status", None),
+                       operation.get("executionStartTime", None), operation.get("executionEndTime", None),
+                       operation.get("lastUpdatedTime", None), operation.get("sourceStageId", None),
+                       operation.get("targetStageId", None), json.dumps(operation))
+                      for operation in operations])
+
+    # Syncing
+
+    def _sync_pipeline(self, pipeline_id):
+        self.rate_limiter.acquire()
+        operations = self.core_client.iter_deployment_pipeline_operations(deployment_pipeline_id=pipeline_id)
+        fetched, result = self._fetch(pipeline_id, operations,
+                                      lambda operation_id: self.core_client.get_deployment_pipeline_operation(
+                                          deployment_pipeline_id=pipeline_id, operation_id=operation_id))
+        self._store(pipeline_id, fetched)
+        return dict(result, pipeline_id=pipeline_id)
+
+    def sync(self, deployment_pipeline_ids = None):
+        """Fetch the operations of deployment pipelines that are not stored yet, pipelines in parallel
+
+        Args:
+            deployment_pipeline_ids (list): The IDs of the deployment pipelines, all deployment pipelines if None
+        Returns:
+            dict: The 'summary' with the number of new and updated operations and one result per pipeline in 'pipelines'
+                  with its number of 'new' and 'updated' operations, whether paging stopped at a stored operation and the 'error' if any
+        """
+        if deployment_pipeline_ids is None:
+            self.rate_limiter.acquire()
+            deployment_pipeline_ids = [pipeline["id"] for pipeline in self.core_client.list_deployment_pipelines()]
+
+        results, summary = self._sync_all(self._sync_pipeline, deployment_pipeline_ids,
+                                          lambda pipeline_id: {"pipeline_id": pipeline_id})
+        return {"summary": dict(summary, pipelines=len(results)), "pipelines": results}
+
+    # Querying
+
+    def query(self, deployment_pipeline_id = None, status = None, start = None, end = None, limit = None):
+        """Query the stored operations, most recent first
+
+        Args:
+            deployment_pipeline_id (str): Only operations of this deployment pipeline
+            status (str or list): Only operations with this status or one of these statuses
+            start (datetime or str): Only operations started at or after this time
+            end (datetime or str): Only operations started before this time
+            limit (int): The maximum number of operations
+        Returns:
+            list: The operations as returned by the API
+        """
+        conditions = []
+        parameters = []
+        if deployment_pipeline_id is not None:
+            conditions.append("pipeline_id = ?")
+            parameters.append(deployment_pipeline_id)
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            conditions.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            parameters.extend(statuses)
+        if start is not None:
+            conditions.append("execution_start_time >= ?")
+            parameters.append(sql_timestamp(start))
+        if end is not None:
+            conditions.append("execution_start_time < ?")
+            parameters.append(sql_timestamp(end))
+
+        sql = "SELECT pipeline_id, data FROM operations"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY execution_start_time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(int(limit))
+
+        rows = self._execute(sql, parameters)
+        operations = []
+        for row in rows:
+            operation = json.loads(row["data"])
+            operation["deploymentPipelineId"] = row["pipeline_id"]
+            operations.append(operation)
+        return operations
+
+    def count_by_status(self, deployment_pipeline_id = None):
+        """Count the stored operations per status
+
+        Args:
+            deployment_pipeline_id (str): Only operations of this deployment pipeline
+        Returns:
+            dict: The number of operations per status
+        """
+        sql = "SELECT status, COUNT(*) AS count FROM operations"
+        parameters = []
+        if deployment_pipeline_id is not None:
+            sql += " WHERE pipeline_id = ?"
+            parameters.append(deployment_pipeline_id)
+        sql += " GROUP BY status"
+        rows = self._execute(sql, parameters)
+        return {row["status"]: row["count"] for row in rows}
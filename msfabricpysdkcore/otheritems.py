@@ -2,6 +2,8 @@ from msfabricpysdkcore.item import Item
 
 class AnomalyDetector(Item):
     """Class to represent an anomaly detector in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -22,6 +24,8 @@ class AnomalyDetector(Item):
 
 class ApacheAirflowJob(Item):
     """Class to represent a ApacheAirflowJob in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -67,6 +71,8 @@ class ApacheAirflowJob(Item):
 
 class CopyJob(Item):
     """Class to represent a copy job in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -78,6 +84,8 @@ class CopyJob(Item):
 
 class Dataflow(Item):
     """Class to represent a dataflow in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -96,6 +104,8 @@ class Dataflow(Item):
 
 class DataPipeline(Item):
     """Class to represent a spark job definition in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -110,6 +120,8 @@ class DataPipeline(Item):
 
 class DigitalTwinBuilder(Item):
     """Class to represent a DigitalTwinBuilder in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -121,6 +133,8 @@ class DigitalTwinBuilder(Item):
 
 class DigitalTwinBuilderFlow(Item):
     """Class to represent a DigitalTwinBuilderFlow in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -132,6 +146,8 @@ class DigitalTwinBuilderFlow(Item):
 
 class MirroredAzureDatabricksCatalog(Item):
     """Class to represent a mirrored Azure Databricks catalog in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -147,6 +163,8 @@ class MirroredAzureDatabricksCatalog(Item):
 
 class Eventhouse(Item):
     """Class to represent a eventhouse in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, description=""):
         super().__init__(id = id, display_name=display_name, type=type, 
@@ -201,6 +219,8 @@ class Eventhouse(Item):
 
 class SparkJobDefinition(Item):
     """Class to represent a spark job definition in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -216,8 +236,9 @@ class SparkJobDefinition(Item):
     def update_definition(self, definition):
         return self.core_client.update_spark_job_definition_definition(self.workspace_id, self.id, definition)
     
-    def run_on_demand_spark_job_definition(self, job_type = "sparkjob"):
-        return self.core_client.run_on_demand_spark_job_definition(workspace_id=self.workspace_id, spark_job_definition_id=self.id, job_type=job_type)
+    def run_on_demand_spark_job_definition(self, job_type = "sparkjob", execution_data = None):
+        return self.core_client.run_on_demand_spark_job_definition(workspace_id=self.workspace_id, spark_job_definition_id=self.id, job_type=job_type,
+                                                                   execution_data=execution_data)
 
     def list_livy_sessions(self):
         """List all livy sessions in the spark job definition"""
@@ -229,6 +250,8 @@ class SparkJobDefinition(Item):
 
 class UserDataFunction(Item):
     """Class to represent a user data function in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -249,6 +272,8 @@ class UserDataFunction(Item):
 
 class Warehouse(Item):
     """Class to represent a warehouse in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -320,6 +345,8 @@ class Warehouse(Item):
 
 class WarehouseSnapshot(Item):
     """Class to represent a warehouse snapshot in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -332,6 +359,8 @@ class WarehouseSnapshot(Item):
 class KQLDashboard(Item):
     """Class to represent a kql dashboard in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -350,6 +379,8 @@ class KQLDashboard(Item):
 
 class KQLDatabase(Item):
     """Class to represent a kql database in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -388,6 +419,8 @@ class KQLDatabase(Item):
 
 class KQLQueryset(Item):
     """Class to represent a kql database in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -410,6 +443,8 @@ class KQLQueryset(Item):
 class GraphQLApi(Item):
     """Class to represent a graphql api in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
     
@@ -422,6 +457,8 @@ class GraphQLApi(Item):
 
 class MirroredDatabase(Item):
     """Class to represent a mirrored database in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -456,6 +493,8 @@ class MirroredDatabase(Item):
 
 class MLExperiment(Item):
     """Class to represent a ml experiment in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -467,6 +506,8 @@ class MLExperiment(Item):
 
 class MLModel(Item):
     """Class to represent a ml model in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -585,6 +626,8 @@ class MLModel(Item):
 
 class Map(Item):
     """Class to represent a map in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -605,6 +648,8 @@ class Map(Item):
 
 class MountedDataFactory(Item):
     """Class to represent a mounted data factory in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -624,6 +669,8 @@ class MountedDataFactory(Item):
 
 class Notebook(Item):
     """Class to represent a notebook in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -651,6 +698,8 @@ class Notebook(Item):
 
 class Reflex(Item):
     """Class to represent a reflex in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -670,6 +719,8 @@ class Reflex(Item):
     
 class Report(Item):
     """Class to represent a report in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -689,6 +740,8 @@ class Report(Item):
 
 class SemanticModel(Item):
     """Class to represent a semantic model in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -713,6 +766,8 @@ class SemanticModel(Item):
 
 class SQLDatabase(Item):
     """Class to represent a sql database in Microsoft Fabric"""
+
+    __slots__ = ()
      
     def __init__(self, id, display_name, type, workspace_id, core_client, properties = None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
@@ -741,6 +796,8 @@ class SQLDatabase(Item):
 class VariableLibrary(Item):
     """Class to represent a variable library in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -752,6 +809,8 @@ class VariableLibrary(Item):
 class CosmosDbDatabase(Item):
     """Class to represent a Cosmos DB database in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -770,6 +829,8 @@ class CosmosDbDatabase(Item):
 class DataAgent(Item):
     """Class to represent a data agent in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -788,6 +849,8 @@ class DataAgent(Item):
 class EventSchemaSet(Item):
     """Class to represent an event schema set in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -806,6 +869,8 @@ class EventSchemaSet(Item):
 class GraphModel(Item):
     """Class to represent a graph model in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -835,6 +900,8 @@ class GraphModel(Item):
 class GraphQuerySet(Item):
     """Class to represent a graph query set in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -853,6 +920,8 @@ class GraphQuerySet(Item):
 class Ontology(Item):
     """Class to represent an ontology in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -871,6 +940,8 @@ class Ontology(Item):
 class OperationsAgent(Item):
     """Class to represent an operations agent in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -889,6 +960,8 @@ class OperationsAgent(Item):
 class SnowflakeDatabase(Item):
     """Class to represent a Snowflake database in Microsoft Fabric"""
 
+    __slots__ = ()
+
     def __init__(self, id, display_name, type, workspace_id, core_client, properties=None, definition=None, description=""):
         super().__init__(id, display_name, type, workspace_id, core_client, properties, definition, description)
 
@@ -0,0 +1,177 @@
+import logging
+from time import monotonic, sleep
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.deployment_pipeline import DeploymentPipeline
+from msfabricpysdkcore.util import logger, RateLimiter, run_concurrently
+
+
+class ReleaseOrchestrator:
+    """Class to run the deployments of many deployment pipelines concurrently and track their operations
+
+    Deployments are launched without waiting for their long running operations. One tracker polls the operations of
+    all running deployments with get_deployment_pipeline_operation and launches queued deployments as slots free up.
+    A deployment pipeline runs one deployment at a time, deployments of the same pipeline run in the given order
+    and are skipped after a failed deployment of that pipeline.
+
+    A deployment is a dictionary with the 'pipeline' (a DeploymentPipeline or its ID), the 'source_stage' and the
+    'target_stage' (IDs, or display names if the pipeline is a DeploymentPipeline) and optionally 'items', 'note',
+    'options', 'only_changed' and 'compare_definitions' as for DeploymentPipeline.deploy_stage_content.
+    """
+
+    _logger: logging.Logger
+
+    TERMINAL_STATUSES = ("Succeeded", "Failed")
+
+    def __init__(self, core_client: FabricClientCore, max_concurrent = 8, poll_interval = 5, timeout = 3600,
+                 calls_per_second = None) -> None:
+        """Initialize the ReleaseOrchestrator object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            max_concurrent (int): The maximum number of deployments running at the same time
+            poll_interval (float): The time in seconds between two polls of the running operations
+            timeout (float): The time in seconds after which a running deployment is no longer tracked
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        """
+        self._logger = logger.getChild(__name__)
+        self.core_client = core_client
+        self.max_concurrent = max_concurrent
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(calls_per_second)
+
+    def _pipeline(self, pipeline):
+        if isinstance(pipeline, DeploymentPipeline):
+            return pipeline
+        # Stages are only listed if stage names have to be resolved
+        return DeploymentPipeline(id=pipeline, display_name=None, description=None, stages=None, core_client=self.core_client)
+
+    # Launching
+
+    def _launch(self, run):
+        """Start a deployment without waiting for it, returning its operation ID or its final status"""
+        deployment = run['deployment']
+        pipeline = run['pipeline']
+        self.rate_limiter.acquire()
+        result = pipeline.deploy_stage_content(source_stage_id=deployment['source_stage'], target_stage_id=deployment['target_stage'],
+                                               items=deployment.get('items', None), note=deployment.get('note', None),
+                                               options=deployment.get('options', None),
+                                               only_changed=deployment.get('only_changed', False),
+                                               compare_definitions=deployment.get('compare_definitions', True),
+                                               wait_for_completion=False)
+        if result is None:
+            return None, "Skipped"
+        if isinstance(result, dict):
+            # The deployment completed right away
+            return result.get('id', None), result.get('status', "Succeeded")
+        operation_id = self.core_client._operation_id(result.headers)
+        if operation_id is None:
+            raise Exception(f"No operation ID returned for the deployment of pipeline {pipeline.id}")
+        return operation_id, "Running"
+
+    def _poll(self, run):
+        self.rate_limiter.acquire()
+        operation = self.core_client.get_deployment_pipeline_operation(deployment_pipeline_id=run['pipeline'].id,
+                                                                        operation_id=run['operation_id'])
+        self.core_client._emit("lro_poll", method="GET",
+                               url=f"https://api.fabric.microsoft.com/v1/deploymentPipelines/{run['pipeline'].id}/operations/{run['operation_id']}",
+                               operation_id=run['operation_id'], wait=monotonic() - run['started'])
+        return operation
+
+    def _finish(self, run, status, error = None, operation = None):
+        run['status'] = status
+        run['error'] = error
+        run['operation'] = operation
+        run['duration'] = monotonic() - run['started'] if run['started'] is not None else None
+        if status not in ("Succeeded", "Skipped"):
+            self._logger.warning(f"Deployment of pipeline {run['pipeline'].id} from {run['deployment']['source_stage']} "
+                                 f"to {run['deployment']['target_stage']} {status.lower()}: {error}")
+
+    # Running
+
+    def run(self, deployments):
+        """Run deployments concurrently and wait for all of them
+
+        Args:
+            deployments (list): The deployments, see the class documentation
+        Returns:
+            dict: The 'summary' with the number of deployments per status and one result per deployment in 'deployments'
+                  with its pipeline, stages, 'operation_id', 'status', 'error', 'duration' in seconds and last 'operation' state
+        """
+        runs = [{'deployment': deployment, 'pipeline': self._pipeline(deployment['pipeline']), 'operation_id': None,
+                 'status': "Queued", 'error': None, 'operation': None, 'duration': None, 'started': None}
+                for deployment in deployments]
+        queued = list(runs)
+        running = []
+        failed_pipelines = set()
+
+        while queued or running:
+            # Launch queued deployments of pipelines without a running deployment, in order
+            busy = {run['pipeline'].id for run in running}
+            to_launch = []
+            for run in list(queued):
+                if len(running) + len(to_launch) >= self.max_concurrent:
+                    break
+                pipeline_id = run['pipeline'].id
+                if pipeline_id in failed_pipelines:
+                    queued.remove(run)
+                    self._finish(run, "Skipped", error="A previous deployment of the pipeline failed")
+                    continue
+                if pipeline_id in busy:
+                    continue
+                busy.add(pipeline_id)
+                queued.remove(run)
+                to_launch.append(run)
+
+            for run in to_launch:
+                run['started'] = monotonic()
+            for run, result, exception in run_concurrently(self._launch, to_launch, max_workers=self.max_concurrent):
+                if exception is not None:
+                    failed_pipelines.add(run['pipeline'].id)
+                    self._finish(run, "Failed", error=str(exception))
+                    continue
+                run['operation_id'], status = result
+                if status == "Running":
+                    running.append(run)
+                else:
+                    if status == "Failed":
+                        failed_pipelines.add(run['pipeline'].id)
+                    self._finish(run, status)
+
+            if not running:
+                continue
+            sleep(self.poll_interval)
+
+            for run, operation, exception in run_concurrently(self._poll, list(running), max_workers=self.max_concurrent):
+                if exception is not None:
+                    # A failed poll is retried at the next interval
+                    self._logger.info(f"Could not get operation {run['operation_id']}: {exception}")
+                    operation = None
+                status = operation.get('status', None) if operation is not None else None
+                if status in self.TERMINAL_STATUSES:
+                    running.remove(run)
+                    if status == "Failed":
+                        failed_pipelines.add(run['pipeline'].id)
+                    self._finish(run, status, error=operation.get('error', None) if status == "Failed" else None,
+                                 operation=operation)
+                elif monotonic() - run['started'] > self.timeout:
+                    running.remove(run)
+                    failed_pipelines.add(run['pipeline'].id)
+                    self._finish(run, "TimedOut", error=f"Still {status} after {self.timeout} seconds", operation=operation)
+                else:
+                    run['operation'] = operation
+
+        results = []
+        summary = {}
+        for run in runs:
+            summary[run['status']] = summary.get(run['status'], 0) + 1
+            results.append({'pipeline_id': run['pipeline'].id,
+                            'source_stage': run['deployment']['source_stage'],
+                            'target_stage': run['deployment']['target_stage'],
+                            'operation_id': run['operation_id'],
+                            'status': run['status'],
+                            'error': run['error'],
+                            'duration': run['duration'],
+                            'operation': run['operation']})
+        return {'summary': summary, 'deployments': results}
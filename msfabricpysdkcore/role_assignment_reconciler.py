@@ -0,0 +1,273 @@
+import json
+import logging
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import logger, RateLimiter, run_concurrently
+
+
+class RoleAssignmentPlan:
+    """Class to represent the operations needed to reach a desired role assignment state"""
+
+    def __init__(self, operations, unchanged = 0, failed_fetches = None) -> None:
+        """Initialize the RoleAssignmentPlan object
+
+        Args:
+            operations (list): The list of add, update and delete operations
+            unchanged (int): The number of role assignments that are already in the desired state
+            failed_fetches (dict): Resources whose current role assignments could not be fetched, keyed by (scope, resource_id)
+        """
+        self.operations = operations
+        self.unchanged = unchanged
+        self.failed_fetches = failed_fetches if failed_fetches else {}
+
+    def __str__(self) -> str:
+        """Return a string representation of the plan"""
+        dict_ = {
+            'summary': self.summary(),
+            'operations': self.operations,
+            'failed_fetches': [{'scope': scope, 'resource_id': resource_id, 'error': error}
+                               for (scope, resource_id), error in self.failed_fetches.items()]
+        }
+        return json.dumps(dict_, indent=2)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def summary(self):
+        """Count the planned operations by action
+
+        Returns:
+            dict: The number of add, update, delete and unchanged role assignments
+        """
+        summary = {'add': 0, 'update': 0, 'delete': 0, 'unchanged': self.unchanged}
+        for operation in self.operations:
+            summary[operation['action']] += 1
+        return summary
+
+
+class RoleAssignmentReconciler:
+    """Class to reconcile role assignments of workspaces, connections, gateways and deployment pipelines with a desired state
+
+    The desired state is a dictionary (e.g. loaded from YAML) keyed by scope, then by resource id,
+    with a list of role assignments per resource:
+
+        workspaces:
+          <workspace_id>:
+            - principal: {id: <principal_id>, type: User}
+              role: Admin
+        connections: {...}
+        gateways: {...}
+        deployment_pipelines: {...}
+    """
+
+    _logger: logging.Logger
+
+    SCOPES = ("workspaces", "connections", "gateways", "deployment_pipelines")
+
+    def __init__(self, core_client: FabricClientCore, max_workers = 8, calls_per_second = None, prune = True) -> None:
+        """Initialize the RoleAssignmentReconciler object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            max_workers (int): The maximum number of parallel requests
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+            prune (bool): Whether to delete role assignments that are not in the desired state
+        """
+        self._logger = logger.getChild(__name__)
+        self.core_client = core_client
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(calls_per_second)
+        self.prune = prune
+
+    def load_desired_state(path):
+        """Load a desired state from a YAML or JSON file
+
+        Args:
+            path (str): The path of the file
+        Returns:
+            dict: The desired state
+        """
+        with open(path, "r") as f:
+            if path.endswith(".json"):
+                return json.load(f)
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required to load YAML files, install it with 'pip install pyyaml'")
+            return yaml.safe_load(f)
+
+    # Fetching
+
+    def _list(self, scope, resource_id):
+        self.rate_limiter.acquire()
+        if scope == "workspaces":
+            return self.core_client.list_workspace_role_assignments(workspace_id=resource_id)
+        if scope == "connections":
+            return self.core_client.list_connection_role_assignments(connection_id=resource_id)
+        if scope == "gateways":
+            return self.core_client.list_gateway_role_assignments(gateway_id=resource_id)
+        if scope == "deployment_pipelines":
+            return self.core_client.list_deployment_pipeline_role_assignments(deployment_pipeline_id=resource_id)
+        raise ValueError(f"Unknown scope {scope}")
+
+    def fetch_current(self, desired_state):
+        """Fetch the current role assignments of all resources in the desired state concurrently
+
+        Args:
+            desired_state (dict): The desired state
+        Returns:
+            tuple: The current role assignments keyed by (scope, resource_id) and the errors keyed the same way
+        """
+        self._validate(desired_state)
+        keys = [(scope, resource_id) for scope in self.SCOPES for resource_id in desired_state.get(scope, {}) or {}]
+
+        current = {}
+        errors = {}
+        for key, role_assignments, exception in run_concurrently(lambda key: self._list(*key), keys, self.max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not list role assignments of {key[0]} {key[1]}: {exception}")
+                errors[key] = str(exception)
+                continue
+            current[key] = role_assignments
+        return current, errors
+
+    def _validate(self, desired_state):
+        unknown = set(desired_state) - set(self.SCOPES)
+        if unknown:
+            raise ValueError(f"Unknown scopes in desired state: {sorted(unknown)}, expected one of {self.SCOPES}")
+
+    # Planning
+
+    def plan(self, desired_state, current = None):
+        """Compute the minimal set of operations to reach the desired state
+
+        Args:
+            desired_state (dict): The desired state
+            current (dict): The current role assignments as returned by fetch_current, fetched if None
+        Returns:
+            RoleAssignmentPlan: The plan
+        """
+        errors = {}
+        if current is None:
+            current, errors = self.fetch_current(desired_state)
+
+        operations = []
+        unchanged = 0
+        for scope in self.SCOPES:
+            for resource_id, desired_assignments in (desired_state.get(scope, {}) or {}).items():
+                if (scope, resource_id) not in current:
+                    continue
+                existing = {ra["principal"]["id"]: ra for ra in current[(scope, resource_id)]}
+                desired = {ra["principal"]["id"]: ra for ra in desired_assignments or []}
+
+                for principal_id, desired_ra in desired.items():
+                    existing_ra = existing.get(principal_id)
+                    if existing_ra is None:
+                        operations.append(self._operation("add", scope, resource_id, desired_ra["principal"], desired_ra["role"]))
+                    elif existing_ra["role"] != desired_ra["role"]:
+                        operations.append(self._operation("update", scope, resource_id, existing_ra["principal"], desired_ra["role"],
+                                                          role_assignment_id=existing_ra.get("id", principal_id),
+                                                          current_role=existing_ra["role"]))
+                    else:
+                        unchanged += 1
+
+                if self.prune:
+                    for principal_id, existing_ra in existing.items():
+                        if principal_id not in desired:
+                            operations.append(self._operation("delete", scope, resource_id, existing_ra["principal"], None,
+                                                              role_assignment_id=existing_ra.get("id", principal_id),
+                                                              current_role=existing_ra["role"]))
+
+        return RoleAssignmentPlan(operations, unchanged=unchanged, failed_fetches=errors)
+
+    def _operation(self, action, scope, resource_id, principal, role, role_assignment_id = None, current_role = None):
+        operation = {
+            'action': action,
+            'scope': scope,
+            'resource_id': resource_id,
+            'principal': principal,
+            'role': role
+        }
+        if role_assignment_id is not None:
+            operation['role_assignment_id'] = role_assignment_id
+        if current_role is not None:
+            operation['current_role'] = current_role
+        return operation
+
+    # Applying
+
+    def _apply_operation(self, operation):
+        cc = self.core_client
+        action = operation['action']
+        scope = operation['scope']
+        resource_id = operation['resource_id']
+        principal = operation['principal']
+        role = operation['role']
+        ra_id = operation.get('role_assignment_id')
+
+        self.rate_limiter.acquire()
+        if scope == "workspaces":
+            if action == "add":
+                return cc.add_workspace_role_assignment(workspace_id=resource_id, role=role, principal=principal)
+            if action == "update":
+                return cc.update_workspace_role_assignment(workspace_id=resource_id, role=role, workspace_role_assignment_id=ra_id)
+            return cc.delete_workspace_role_assignment(workspace_id=resource_id, workspace_role_assignment_id=ra_id)
+        if scope == "connections":
+            if action == "add":
+                return cc.add_connection_role_assignment(connection_id=resource_id, principal=principal, role=role)
+            if action == "update":
+                return cc.update_connection_role_assignment(connection_id=resource_id, connection_role_assignment_id=ra_id, role=role)
+            return cc.delete_connection_role_assignment(connection_id=resource_id, connection_role_assignment_id=ra_id)
+        if scope == "gateways":
+            if action == "add":
+                return cc.add_gateway_role_assignment(gateway_id=resource_id, principal=principal, role=role)
+            if action == "update":
+                return cc.update_gateway_role_assignment(gateway_id=resource_id, gateway_role_assignment_id=ra_id, role=role)
+            return cc.delete_gateway_role_assignment(gateway_id=resource_id, gateway_role_assignment_id=ra_id)
+        if scope == "deployment_pipelines":
+            # Deployment pipelines have no update API, an update is a delete followed by an add
+            if action in ("update", "delete"):
+                response = cc.delete_deployment_pipeline_role_assignment(deployment_pipeline_id=resource_id, principal_id=principal["id"])
+                if action == "delete":
+                    return response
+                self.rate_limiter.acquire()
+            return cc.add_deployment_pipeline_role_assignment(deployment_pipeline_id=resource_id, principal=principal, role=role)
+        raise ValueError(f"Unknown scope {scope}")
+
+    def apply(self, plan):
+        """Apply the operations of a plan concurrently
+
+        Args:
+            plan (RoleAssignmentPlan): The plan to apply
+        Returns:
+            list: The operations with their 'status' and, on failure, their 'error'
+        """
+        results = []
+        for operation, _, exception in run_concurrently(self._apply_operation, plan.operations, self.max_workers):
+            result = dict(operation)
+            if exception is not None:
+                self._logger.warning(f"Role assignment operation {operation['action']} on {operation['scope']} "
+                                     f"{operation['resource_id']} failed: {exception}")
+                result['status'] = "Failed"
+                result['error'] = str(exception)
+            else:
+                result['status'] = "Succeeded"
+            results.append(result)
+        return results
+
+    def reconcile(self, desired_state, dry_run = False):
+        """Fetch the current state, compute the plan and apply it unless dry_run is set
+
+        Args:
+            desired_state (dict): The desired state
+            dry_run (bool): Whether to only compute the plan
+        Returns:
+            RoleAssignmentPlan or list: The plan if dry_run is set, otherwise the applied operations
+        """
+        plan = self.plan(desired_state)
+        if dry_run:
+            return plan
+        return self.apply(plan)
@@ -0,0 +1,310 @@
+import logging
+from time import monotonic, sleep
+
+import requests
+
+from msfabricpysdkcore.coreapi import FabricClientCore
+from msfabricpysdkcore.util import logger, RateLimiter, run_concurrently
+
+# Status codes worth a new attempt: timeouts, Spark capacity throttling (430) and server errors
+_TRANSIENT_STATUS_CODES = (408, 430, 500, 502, 503, 504)
+_CAPACITY_THROTTLED = 430
+
+
+def is_transient(status_code = None, exception = None):
+    """Whether a failed request is worth a new attempt
+
+    Args:
+        status_code (int): The HTTP status code of the response
+        exception (Exception): The error raised by the request if no response was received
+    Returns:
+        bool: True for connection errors, timeouts, capacity throttling and server errors
+    """
+    if exception is not None:
+        return isinstance(exception, (requests.ConnectionError, requests.Timeout))
+    return status_code in _TRANSIENT_STATUS_CODES
+
+
+class SparkJobBatchRunner:
+    """Class to run many spark job definitions with admission control on the active job instances
+
+    Jobs are launched in the given order as long as the number of active job instances stays below the limits overall,
+    per workspace and per capacity. Active job instances of the spark job definitions of the batch that were started
+    outside of it count against the limits too. One tracker polls all active job instances with get_item_job_instance
+    and launches queued jobs as they complete. Launches failing with a transient error are retried with exponential
+    backoff, a launch throttled by the capacity (430) also holds back the other launches on that capacity.
+
+    A job is a tuple of a SparkJobDefinition and its execution data, or a dictionary with the 'workspace_id' and
+    'spark_job_definition_id' and optionally 'execution_data' and 'job_type'.
+    """
+
+    _logger: logging.Logger
+
+    ACTIVE_STATUSES = ("NotStarted", "InProgress")
+    TERMINAL_STATUSES = ("Completed", "Failed", "Cancelled", "Deduped")
+
+    def __init__(self, core_client: FabricClientCore, max_active = 16, max_active_per_workspace = None,
+                 max_active_per_capacity = None, poll_interval = 15, timeout = None, max_retries = 2, retry_delay = 30,
+                 retry_failed_job = None, count_existing_jobs = True, calls_per_second = None) -> None:
+        """Initialize the SparkJobBatchRunner object
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            max_active (int): The maximum number of active job instances of the batch
+            max_active_per_workspace (int): The maximum number of active job instances per workspace, unlimited if None
+            max_active_per_capacity (int): The maximum number of active job instances per capacity, unlimited if None
+            poll_interval (float): The time in seconds between two polls of the active job instances
+            timeout (float): The time in seconds after which an active job instance is cancelled, unlimited if None
+            max_retries (int): The maximum number of new attempts of a job
+            retry_delay (float): The time in seconds before the first new attempt, doubled for every further attempt
+            retry_failed_job (callable): Receives the JobInstance of a failed or cancelled job,
+                                         the job is attempted again if it returns True
+            count_existing_jobs (bool): Whether active job instances started outside of the batch count against the limits
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        """
+        self._logger = logger.getChild(__name__)
+        self.core_client = core_client
+        self.max_active = max_active
+        self.max_active_per_workspace = max_active_per_workspace
+        self.max_active_per_capacity = max_active_per_capacity
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retry_failed_job = retry_failed_job
+        self.count_existing_jobs = count_existing_jobs
+        self.rate_limiter = RateLimiter(calls_per_second)
+
+    def _job(self, job):
+        if isinstance(job, dict):
+            return {'workspace_id': job['workspace_id'], 'item_id': job['spark_job_definition_id'],
+                    'execution_data': job.get('execution_data', None), 'job_type': job.get('job_type', "sparkjob")}
+        spark_job_definition, execution_data = job
+        return {'workspace_id': spark_job_definition.workspace_id, 'item_id': spark_job_definition.id,
+                'execution_data': execution_data, 'job_type': "sparkjob"}
+
+    # Admission
+
+    def _capacities(self, workspace_ids):
+        """Get the capacity of every workspace, workspaces are their own capacity if capacities are not limited"""
+        if self.max_active_per_capacity is None:
+            return {workspace_id: workspace_id for workspace_id in workspace_ids}
+
+        def get_capacity(workspace_id):
+            self.rate_limiter.acquire()
+            return self.core_client.get_workspace_by_id(workspace_id, return_item=False).get('capacityId', workspace_id)
+
+        capacities = {}
+        for workspace_id, capacity_id, exception in run_concurrently(get_capacity, workspace_ids, max_workers=8):
+            if exception is not None:
+                self._logger.warning(f"Could not get the capacity of workspace {workspace_id}: {exception}")
+                capacity_id = workspace_id
+            capacities[workspace_id] = capacity_id
+        return capacities
+
+    def _existing_jobs(self, items):
+        """Get the active job instances of the spark job definitions of the batch"""
+        def list_active(item):
+            self.rate_limiter.acquire()
+            job_instances = self.core_client.list_item_job_instances(workspace_id=item[0], item_id=item[1])
+            return [job_instance['id'] for job_instance in job_instances if job_instance.get('status', None) in self.ACTIVE_STATUSES]
+
+        existing = []
+        for (workspace_id, item_id), job_instance_ids, exception in run_concurrently(list_active, items, max_workers=8):
+            if exception is not None:
+                self._logger.warning(f"Could not list the job instances of spark job definition {item_id}: {exception}")
+                continue
+            existing.extend({'workspace_id': workspace_id, 'item_id': item_id, 'job_instance_id': job_instance_id}
+                            for job_instance_id in job_instance_ids)
+        return existing
+
+    def _admit(self, queued, active, capacities, blocked, now):
+        """Pick the queued runs that fit the limits, in order"""
+        per_workspace = {}
+        per_capacity = {}
+        for job in active:
+            per_workspace[job['workspace_id']] = per_workspace.get(job['workspace_id'], 0) + 1
+            capacity_id = capacities[job['workspace_id']]
+            per_capacity[capacity_id] = per_capacity.get(capacity_id, 0) + 1
+
+        admitted = []
+        running = sum(1 for job in active if 'run' in job)
+        for run in queued:
+            if running + len(admitted) >= self.max_active:
+                break
+            workspace_id = run['job']['workspace_id']
+            capacity_id = capacities[workspace_id]
+            if run['not_before'] > now or blocked.get(capacity_id, 0) > now:
+                continue
+            if self.max_active_per_workspace is not None and per_workspace.get(workspace_id, 0) >= self.max_active_per_workspace:
+                continue
+            if self.max_active_per_capacity is not None and per_capacity.get(capacity_id, 0) >= self.max_active_per_capacity:
+                continue
+            per_workspace[workspace_id] = per_workspace.get(workspace_id, 0) + 1
+            per_capacity[capacity_id] = per_capacity.get(capacity_id, 0) + 1
+            admitted.append(run)
+        return admitted
+
+    # Launching and polling
+
+    def _launch(self, run):
+        """Submit a job, returning the status code of the response, the ID of the job instance and the error if it was not accepted
+
+        The job instance is only read by the next poll, so a failure to read it never submits the job again.
+        """
+        job = run['job']
+        url = (f"https://api.fabric.microsoft.com/v1/workspaces/{job['workspace_id']}/sparkJobDefinitions/{job['item_id']}"
+               f"/jobs/instances?jobType={job['job_type']}")
+        body = {'executionData': job['execution_data']} if job['execution_data'] is not None else None
+        self.rate_limiter.acquire()
+        response = self.core_client.calling_routine(url, operation="POST", body=body, response_codes=[202, 429],
+                                                    wait_for_completion=False, continue_on_error_code=True,
+                                                    error_message="Error running on demand spark job definition",
+                                                    return_format="response")
+        if response.status_code != 202:
+            return response.status_code, None, f"Error running on demand spark job definition: {response.status_code} {response.text}"
+        return response.status_code, response.headers['Location'].split('/')[-1], None
+
+    def _poll(self, job):
+        self.rate_limiter.acquire()
+        job_instance = self.core_client.get_item_job_instance(workspace_id=job['workspace_id'], item_id=job['item_id'],
+                                                              job_instance_id=job['job_instance_id'])
+        self.core_client._emit("lro_poll", method="GET",
+                               url=f"https://api.fabric.microsoft.com/v1/workspaces/{job['workspace_id']}/items/{job['item_id']}/jobs/instances/{job['job_instance_id']}",
+                               operation_id=job['job_instance_id'],
+                               wait=monotonic() - job['run']['started'] if 'run' in job else None)
+        return job_instance
+
+    def _retry(self, run, queued, now, error):
+        """Queue a run again if it has attempts left"""
+        if run['attempts'] > self.max_retries:
+            return False
+        self._logger.info(f"Attempt {run['attempts']} of spark job definition {run['job']['item_id']} failed, retrying: {error}")
+        run['error'] = error
+        run['not_before'] = now + self.retry_delay * 2 ** (run['attempts'] - 1)
+        queued.append(run)
+        queued.sort(key=lambda queued_run: queued_run['index'])
+        return True
+
+    def _finish(self, run, status, error = None, job_instance = None):
+        run['status'] = status
+        run['error'] = error
+        if job_instance is not None:
+            run['failure_reason'] = job_instance.failureReason
+            run['start_time_utc'] = job_instance.start_time_utc
+            run['end_time_utc'] = job_instance.end_time_utc
+        run['duration'] = monotonic() - run['started'] if run['started'] is not None else None
+        if status != "Completed":
+            self._logger.warning(f"Job of spark job definition {run['job']['item_id']} {status.lower()}: {error or run['failure_reason']}")
+
+    # Running
+
+    def run(self, jobs):
+        """Run the jobs and wait for all of them
+
+        Args:
+            jobs (list): The jobs, see the class documentation
+        Returns:
+            dict: The 'summary' with the number of jobs per status and one result per job in 'runs' with its workspace_id,
+                  spark_job_definition_id, job_instance_id, 'status', 'attempts', 'error', 'failure_reason',
+                  start and end time and 'duration' in seconds from the first launch
+        """
+        runs = [{'index': index, 'job': self._job(job), 'job_instance_id': None, 'status': "Queued", 'attempts': 0,
+                 'error': None, 'failure_reason': None, 'start_time_utc': None, 'end_time_utc': None, 'duration': None,
+                 'started': None, 'not_before': 0}
+                for index, job in enumerate(jobs)]
+
+        workspace_ids = sorted({run['job']['workspace_id'] for run in runs})
+        capacities = self._capacities(workspace_ids)
+        # Active job instances, the ones of the batch reference their run
+        active = []
+        if self.count_existing_jobs:
+            items = sorted({(run['job']['workspace_id'], run['job']['item_id']) for run in runs})
+            active = self._existing_jobs(items)
+            if active:
+                self._logger.info(f"{len(active)} job instances were already active")
+        queued = list(runs)
+        # Capacities, or workspaces if capacities are unknown, throttled until a time
+        blocked = {}
+
+        while queued or any('run' in job for job in active):
+            now = monotonic()
+            admitted = self._admit(queued, active, capacities, blocked, now)
+            for run in admitted:
+                queued.remove(run)
+                run['attempts'] += 1
+                if run['started'] is None:
+                    run['started'] = now
+
+            for run, launched, exception in run_concurrently(self._launch, admitted, max_workers=max(1, len(admitted))):
+                now = monotonic()
+                if exception is not None:
+                    status_code, job_instance_id, error = None, None, str(exception)
+                else:
+                    status_code, job_instance_id, error = launched
+                if error is not None:
+                    if is_transient(status_code=status_code, exception=exception):
+                        if status_code == _CAPACITY_THROTTLED:
+                            blocked[capacities[run['job']['workspace_id']]] = now + self.retry_delay
+                        if self._retry(run, queued, now, error):
+                            continue
+                    self._finish(run, "Failed", error=error)
+                    continue
+                run['job_instance_id'] = job_instance_id
+                run['status'] = "NotStarted"
+                active.append({'workspace_id': run['job']['workspace_id'], 'item_id': run['job']['item_id'],
+                               'job_instance_id': job_instance_id, 'run': run})
+
+            if not active:
+                # Only runs waiting for a retry are queued
+                waits = [run['not_before'] for run in queued] + [until for until in blocked.values() if until > now]
+                sleep(max(0.0, min(waits) - monotonic()) if waits else self.poll_interval)
+                continue
+            sleep(self.poll_interval)
+
+            for job, job_instance, exception in run_concurrently(self._poll, list(active), max_workers=8):
+                now = monotonic()
+                if exception is not None:
+                    # A failed poll is retried at the next interval
+                    self._logger.info(f"Could not get job instance {job['job_instance_id']}: {exception}")
+                    continue
+                run = job.get('run', None)
+                if job_instance.status not in self.TERMINAL_STATUSES:
+                    if run is None:
+                        continue
+                    run['status'] = job_instance.status
+                    if self.timeout is not None and now - run['started'] > self.timeout:
+                        active.remove(job)
+                        try:
+                            self.core_client.cancel_item_job_instance(workspace_id=job['workspace_id'], item_id=job['item_id'],
+                                                                      job_instance_id=job['job_instance_id'])
+                        except Exception as e:
+                            self._logger.warning(f"Could not cancel job instance {job['job_instance_id']}: {e}")
+                        self._finish(run, "TimedOut", error=f"Still {job_instance.status} after {self.timeout} seconds",
+                                     job_instance=job_instance)
+                    continue
+
+                active.remove(job)
+                if run is None:
+                    continue
+                if (job_instance.status in ("Failed", "Cancelled") and self.retry_failed_job is not None
+                        and self.retry_failed_job(job_instance)
+                        and self._retry(run, queued, now, f"Job instance {job_instance.id} {job_instance.status.lower()}")):
+                    continue
+                self._finish(run, job_instance.status, job_instance=job_instance)
+
+        results = []
+        summary = {}
+        for run in runs:
+            summary[run['status']] = summary.get(run['status'], 0) + 1
+            results.append({'workspace_id': run['job']['workspace_id'],
+                            'spark_job_definition_id': run['job']['item_id'],
+                            'job_instance_id': run['job_instance_id'],
+                            'status': run['status'],
+                            'attempts': run['attempts'],
+                            'error': run['error'],
+                            'failure_reason': run['failure_reason'],
+                            'start_time_utc': run['start_time_utc'],
+                            'end_time_utc': run['end_time_utc'],
+                            'duration': run['duration']})
+        return {'summary': summary, 'runs': results}
@@ -0,0 +1,145 @@
+import functools
+import inspect
+import threading
+from time import time_ns
+
+from msfabricpysdkcore.client import FabricClient
+
+_TRACER_NAME = "msfabricpysdkcore"
+
+
+def _import_opentelemetry():
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        raise ImportError("OpenTelemetry is required for tracing, install it with 'pip install opentelemetry-api'")
+    return trace
+
+
+def _id_attributes(signature, args, kwargs):
+    """Get the span attributes for the id arguments of a call, e.g. fabric.workspace_id"""
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+    except TypeError:
+        return {}
+    attributes = {}
+    for name, value in bound.arguments.items():
+        if (name.endswith("_id") or name == "id") and isinstance(value, str):
+            attributes[f"fabric.{name}"] = value
+    return attributes
+
+
+class _TracingHook:
+    """Hook creating a span per HTTP attempt, throttle wait and long running operation poll"""
+
+    def __init__(self, trace, tracer) -> None:
+        self._trace = trace
+        self._tracer = tracer
+        self._local = threading.local()
+
+    def __call__(self, event):
+        trace = self._trace
+        if event.type == "request_start":
+            span = self._tracer.start_span(f"{event.method} {event.endpoint}", kind=trace.SpanKind.CLIENT,
+                                           attributes={"http.request.method": event.method,
+                                                       "url.full": event.url,
+                                                       "url.template": event.endpoint,
+                                                       "http.request.resend_count": event.retry_count})
+            # Attempts of one call run in one thread, one after the other
+            self._local.span = span
+        elif event.type == "request_end":
+            span = getattr(self._local, "span", None)
+            if span is None:
+                return
+            self._local.span = None
+            if event.error is not None:
+                # No response, the request failed with a connection error or a timeout
+                span.record_exception(event.error)
+                span.set_status(trace.Status(trace.StatusCode.ERROR, type(event.error).__name__))
+                span.end()
+                return
+            span.set_attribute("http.response.status_code", event.status_code)
+            span.set_attribute("http.response.body.size", event.bytes_in)
+            span.set_attribute("http.request.body.size", event.bytes_out)
+            if event.status_code >= 400:
+                span.set_status(trace.Status(trace.StatusCode.ERROR, str(event.status_code)))
+            span.end()
+        elif event.type == "throttle":
+            # The wait happens right after the event, so the span covers the time until the retry
+            start = time_ns()
+            span = self._tracer.start_span("fabric.throttle_wait", start_time=start,
+                                           attributes={"url.template": event.endpoint,
+                                                       "fabric.throttle.wait_seconds": event.wait,
+                                                       "http.request.resend_count": event.retry_count})
+            span.end(end_time=start + int(event.wait * 1e9))
+            trace.get_current_span().add_event("fabric.throttle", {"url.template": event.endpoint,
+                                                                   "fabric.throttle.wait_seconds": event.wait})
+        elif event.type == "lro_poll":
+            trace.get_current_span().add_event("fabric.lro_poll", {"fabric.operation_id": event.operation_id,
+                                                                   "fabric.lro.elapsed_seconds": event.wait})
+
+
+def instrument_client(client: FabricClient, tracer_provider = None):
+    """Trace the calls of a FabricClientCore or FabricClientAdmin with OpenTelemetry
+
+    Every public method of the client gets a span with the id arguments (workspace_id, item_id, ...) as attributes.
+    Every HTTP attempt gets a child span with the status code, throttle waits get their own spans and
+    long running operation polls show up as HTTP spans below the span of the method waiting for the operation.
+
+    Args:
+        client (FabricClient): The client to instrument
+        tracer_provider (TracerProvider): The OpenTelemetry tracer provider, the global one if None
+    Returns:
+        FabricClient: The instrumented client
+    """
+    trace = _import_opentelemetry()
+    if getattr(client, "_tracing_hook", None) is not None:
+        return client
+
+    tracer = trace.get_tracer(_TRACER_NAME, tracer_provider=tracer_provider)
+    class_name = type(client).__name__
+
+    wrapped = []
+    for cls in type(client).__mro__:
+        if cls is FabricClient or cls is object:
+            break
+        for name, function in vars(cls).items():
+            if name.startswith("_") or not inspect.isfunction(function) or name in wrapped:
+                continue
+            method = getattr(client, name)
+            setattr(client, name, _traced(tracer, trace, f"{class_name}.{name}", method, inspect.signature(function)))
+            wrapped.append(name)
+
+    hook = _TracingHook(trace, tracer)
+    client.add_hook(hook)
+    client._tracing_hook = hook
+    client._traced_methods = wrapped
+    return client
+
+
+def uninstrument_client(client: FabricClient):
+    """Remove the OpenTelemetry instrumentation of a client
+
+    Args:
+        client (FabricClient): The instrumented client
+    """
+    hook = getattr(client, "_tracing_hook", None)
+    if hook is None:
+        return
+    client.remove_hook(hook)
+    for name in client._traced_methods:
+        delattr(client, name)
+    client._tracing_hook = None
+    client._traced_methods = []
+
+
+def _traced(tracer, trace, span_name, method, signature):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        # The signature includes self, the bound method does not
+        attributes = _id_attributes(signature, (None,) + args, kwargs)
+        attributes["code.function"] = span_name
+        with tracer.start_as_current_span(span_name, attributes=attributes, record_exception=True,
+                                          set_status_on_exception=True):
+            return method(*args, **kwargs)
+    return wrapper
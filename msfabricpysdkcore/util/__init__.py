@@ -1,3 +1,4 @@
 from .logger import logger
+from .concurrency import RateLimiter, chunked, iter_concurrently, run_concurrently
 
-__all__ = ["logger"]
\ No newline at end of file
+__all__ = ["logger", "RateLimiter", "chunked", "iter_concurrently", "run_concurrently"]
\ No newline at end of file
@@ -0,0 +1,80 @@
+def _import_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("pandas is required for as_frame=True, install it with 'pip install pandas'")
+    return pandas
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required for as_arrow=True, install it with 'pip install pyarrow'")
+    return pyarrow
+
+
+def require_columnar(as_frame = False, as_arrow = False):
+    """Import the library of the requested columnar output, so that a missing one fails before any request
+
+    Args:
+        as_frame (bool): Whether a pandas DataFrame is requested
+        as_arrow (bool): Whether a pyarrow Table is requested
+    """
+    if as_arrow:
+        _import_pyarrow()
+    elif as_frame:
+        _import_pandas()
+
+
+class ColumnarBuilder:
+    """Class to collect the entries of paged API responses into columns, one page at a time
+
+    Columns are named like the fields of the API responses, e.g. id, displayName, workspaceId.
+    Fields missing in an entry are None, nested objects are kept as dictionaries.
+    """
+
+    def __init__(self, columns = None) -> None:
+        """Initialize the ColumnarBuilder object
+
+        Args:
+            columns (list): The fields to keep, all fields if None
+        """
+        self.columns = {column: [] for column in columns} if columns else {}
+        self._fixed_columns = columns is not None
+        self.rows = 0
+
+    def append(self, entries):
+        """Append the entries of a page
+
+        Args:
+            entries (list): The entries as decoded from the response
+        """
+        columns = self.columns
+        for entry in entries:
+            for key, value in entry.items():
+                column = columns.get(key)
+                if column is None:
+                    if self._fixed_columns:
+                        continue
+                    # A field seen for the first time, missing in all rows so far
+                    column = columns[key] = [None] * self.rows
+                column.append(value)
+            self.rows += 1
+            for column in columns.values():
+                if len(column) < self.rows:
+                    column.append(None)
+
+    def to_dict(self):
+        """Return the columns as a dictionary of lists"""
+        return self.columns
+
+    def to_frame(self):
+        """Return the columns as a pandas DataFrame"""
+        pandas = _import_pandas()
+        return pandas.DataFrame(self.columns)
+
+    def to_arrow(self):
+        """Return the columns as a pyarrow Table"""
+        pyarrow = _import_pyarrow()
+        return pyarrow.table(self.columns)
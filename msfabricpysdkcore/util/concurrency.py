@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import monotonic, sleep
+
+
+class RateLimiter:
+    """Thread-safe limiter for the number of calls per second across worker threads"""
+
+    def __init__(self, calls_per_second = None) -> None:
+        """Initialize the RateLimiter object
+
+        Args:
+            calls_per_second (float): The maximum number of calls per second, unlimited if None
+        """
+        self.calls_per_second = calls_per_second
+        self._lock = threading.Lock()
+        self._next_slot = monotonic()
+
+    def acquire(self):
+        """Block until the next call is allowed"""
+        if not self.calls_per_second:
+            return
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.calls_per_second
+        if slot > now:
+            sleep(slot - now)
+
+
+def iter_concurrently(func, args_list, max_workers = 8):
+    """Run a function over a list of arguments in a thread pool
+
+    Results are yielded as soon as they complete. At most a few multiples of
+    max_workers calls are in flight at any time so that very long argument
+    lists do not materialize all futures at once.
+
+    Args:
+        func (callable): The function to call, receives one argument
+        args_list (iterable): The arguments to call the function with
+        max_workers (int): The maximum number of parallel calls
+    Yields:
+        tuple: (argument, result, exception) where exception is None on success
+    """
+    max_workers = max(1, int(max_workers))
+    max_in_flight = max_workers * 4
+    args_iter = iter(args_list)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    arg = next(args_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(func, arg)] = arg
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                arg = in_flight.pop(future)
+                exception = future.exception()
+                if exception is not None:
+                    yield arg, None, exception
+                else:
+                    yield arg, future.result(), None
+
+
+def run_concurrently(func, args_list, max_workers = 8):
+    """Run a function over a list of arguments in a thread pool
+
+    Args:
+        func (callable): The function to call, receives one argument
+        args_list (list): The arguments to call the function with
+        max_workers (int): The maximum number of parallel calls
+    Returns:
+        list: (argument, result, exception) tuples in the order of args_list
+    """
+    args_list = list(args_list)
+    indexed = list(enumerate(args_list))
+    results = [None] * len(args_list)
+    for (index, arg), result, exception in iter_concurrently(lambda pair: func(pair[1]), indexed, max_workers):
+        results[index] = (arg, result, exception)
+    return results
+
+
+def chunked(items, chunk_size):
+    """Split a list into consecutive chunks
+
+    Args:
+        items (list): The list to split
+        chunk_size (int): The maximum size of a chunk
+    Returns:
+        list: The list of chunks
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    items = list(items)
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
@@ -0,0 +1,145 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from .concurrency import RateLimiter, run_concurrently
+from .logger import logger
+
+
+def sql_timestamp(value):
+    """Format a datetime like the timestamps of the API so that they compare as text"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%S")
+    return value
+
+
+class HistoryStore:
+    """Base class of the local SQLite copies of API histories that are synced incrementally
+
+    Entries, e.g. deployment operations or job instances, are stored in TABLE keyed by their parent in KEY_COLUMN
+    and their id in ID_COLUMN, with a status column and the entry as returned by the API in a data column. Syncing a parent pages through its entries, most recent first,
+    and stops at the first entry that is already stored with one of the TERMINAL_STATUSES.
+    Stored entries that were not final yet are fetched again.
+    """
+
+    SCHEMA = None
+    TABLE = None
+    KEY_COLUMN = None
+    ID_COLUMN = "id"
+    TERMINAL_STATUSES = ()
+
+    def __init__(self, core_client, path = ":memory:", max_workers = 8, calls_per_second = None) -> None:
+        """Initialize the store and create its tables
+
+        Args:
+            core_client (FabricClientCore): The FabricClientCore object
+            path (str): The path of the SQLite database, in memory if ":memory:"
+            max_workers (int): The maximum number of parents synced in parallel
+            calls_per_second (float): The maximum number of requests per second, unlimited if None
+        """
+        self._logger = logger.getChild(type(self).__module__)
+        self.core_client = core_client
+        self.path = path
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(calls_per_second)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.executescript(self.SCHEMA)
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Storing
+
+    def _execute(self, sql, parameters = ()):
+        """Run a query and fetch all its rows"""
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _known(self, key):
+        """Get the stored entries of a parent with their status, by id"""
+        rows = self._execute(f"SELECT {self.ID_COLUMN} AS id, status, data FROM {self.TABLE} WHERE {self.KEY_COLUMN} = ?", (key,))
+        return {row["id"]: row for row in rows}
+
+    def _insert(self, rows):
+        """Insert or replace rows with one value per column of the table"""
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in rows[0])
+        with self._lock, self._connection:
+            self._connection.executemany(f"INSERT OR REPLACE INTO {self.TABLE} VALUES ({placeholders})", rows)
+
+    # Syncing
+
+    def _fetch(self, key, entries, get_entry):
+        """Fetch the entries of a parent that are new or were not final when stored
+
+        Args:
+            key (str): The ID of the parent
+            entries (iterable): The entries of the parent as returned by the API, most recent first, fetched lazily
+            get_entry (callable): Receives the ID of a stored entry and returns its current state as a dictionary
+        Returns:
+            tuple: The new and changed entries to store and the number of 'new' and 'updated' entries and whether
+                   paging stopped at a stored entry in 'reached_known'
+        """
+        known = self._known(key)
+        fetched = []
+        reached_known = False
+        for entry in entries:
+            fetched.append(entry)
+            stored = known.get(entry["id"])
+            if stored is not None and stored["status"] in self.TERMINAL_STATUSES:
+                # Older entries are stored already, do not fetch further pages
+                reached_known = True
+                break
+
+        seen = {entry["id"] for entry in fetched}
+        running = [entry_id for entry_id, stored in known.items()
+                   if stored["status"] not in self.TERMINAL_STATUSES and entry_id not in seen]
+        for entry_id in running:
+            self.rate_limiter.acquire()
+            fetched.append(get_entry(entry_id))
+
+        new = [entry for entry in fetched if entry["id"] not in known]
+        # Entries fetched again whose status and data are unchanged are neither counted nor stored again
+        updated = [entry for entry in fetched if entry["id"] in known
+                   and (entry.get("status", None) != known[entry["id"]]["status"] or entry != json.loads(known[entry["id"]]["data"]))]
+        return new + updated, {"new": len(new), "updated": len(updated), "reached_known": reached_known}
+
+    def _sync_all(self, sync_one, parents, describe):
+        """Sync parents in parallel
+
+        Args:
+            sync_one (callable): Syncs one parent and returns its result with the 'new' and 'updated' counts
+            parents (list): The parents to sync
+            describe (callable): Receives a parent and returns the identifying fields of its result
+        Returns:
+            tuple: One result per parent, with the 'error' if any, and the summary with the total number of
+                   'new' and 'updated' entries and of 'failed' parents
+        """
+        results = []
+        for parent, result, exception in run_concurrently(sync_one, parents, self.max_workers):
+            if exception is not None:
+                self._logger.warning(f"Could not sync the history of {describe(parent)}: {exception}")
+                result = dict(describe(parent), new=0, updated=0, reached_known=False, error=str(exception))
+            else:
+                result["error"] = None
+            results.append(result)
+
+        summary = {"new": sum(result["new"] for result in results),
+                   "updated": sum(result["updated"] for result in results),
+                   "failed": sum(1 for result in results if result["error"] is not None)}
+        return results, summary
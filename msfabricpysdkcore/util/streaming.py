@@ -0,0 +1,257 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = b" \t\r\n"
+_ESCAPES = {ord('"'): b'"', ord("\\"): b"\\", ord("/"): b"/", ord("b"): b"\b", ord("f"): b"\f",
+            ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t"}
+
+
+def write_stream(chunks, sink):
+    """Write chunks of bytes to a file path or a writable file-like object
+
+    Args:
+        chunks (iterable): The chunks of bytes
+        sink (str or file-like): The path of the file to write, or an object with a write method
+    Returns:
+        int: The number of bytes written
+    """
+    if isinstance(sink, (str, os.PathLike)):
+        with open(sink, "wb") as f:
+            return write_stream(chunks, f)
+    written = 0
+    for chunk in chunks:
+        if chunk:
+            sink.write(chunk)
+            written += len(chunk)
+    return written
+
+
+class _JsonReader:
+    """Pull parser over chunks of a JSON document that never holds more than a chunk of it in memory"""
+
+    def __init__(self, chunks) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = b""
+        self._pos = 0
+
+    def _fill(self, size = 1):
+        """Make sure at least size bytes are buffered after the position, False at the end of the document"""
+        while len(self._buffer) - self._pos < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            self._buffer = self._buffer[self._pos:] + chunk
+            self._pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+            char = self._buffer[self._pos]
+            if char not in _WHITESPACE:
+                return chr(char)
+            self._pos += 1
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON document, got '{self.peek()}'")
+        self._pos += 1
+
+    def next_member(self, first, closing):
+        """Consume the separator before the next member of an object or array, False at its end"""
+        if self.peek() == closing:
+            self._pos += 1
+            return False
+        if not first:
+            self.expect(",")
+        return True
+
+    def iter_string(self):
+        """Iterate over the unescaped UTF-8 bytes of the next string, chunk by chunk"""
+        self.expect('"')
+        while True:
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON document")
+            buffer = self._buffer
+            end = len(buffer)
+            quote = buffer.find(b'"', self._pos)
+            backslash = buffer.find(b"\\", self._pos)
+            stop = min(index for index in (quote, backslash, end) if index != -1)
+            if stop > self._pos:
+                yield buffer[self._pos:stop]
+                self._pos = stop
+            if stop == end:
+                continue
+            if stop == quote:
+                self._pos += 1
+                return
+            # Escape sequence, make sure it is fully buffered
+            self._fill(2)
+            escape = self._buffer[self._pos + 1]
+            if escape != ord("u"):
+                if escape not in _ESCAPES:
+                    raise ValueError(f"Invalid escape sequence in JSON document: \\{chr(escape)}")
+                yield _ESCAPES[escape]
+                self._pos += 2
+                continue
+            self._fill(6)
+            code = int(self._buffer[self._pos + 2:self._pos + 6], 16)
+            self._pos += 6
+            if 0xD800 <= code < 0xDC00 and self._fill(6) and self._buffer[self._pos:self._pos + 2] == b"\\u":
+                low = int(self._buffer[self._pos + 2:self._pos + 6], 16)
+                self._pos += 6
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+            yield chr(code).encode("utf-8", "surrogatepass")
+
+    def read_string(self):
+        return b"".join(self.iter_string()).decode("utf-8")
+
+    def read_value(self):
+        """Read the next value into Python objects, for values known to be small"""
+        char = self.peek()
+        if char == '"':
+            return self.read_string()
+        if char == "{":
+            self._pos += 1
+            value = {}
+            first = True
+            while self.next_member(first, "}"):
+                first = False
+                key = self.read_string()
+                self.expect(":")
+                value[key] = self.read_value()
+            return value
+        if char == "[":
+            self._pos += 1
+            value = []
+            first = True
+            while self.next_member(first, "]"):
+                first = False
+                value.append(self.read_value())
+            return value
+        # Literal or number, read until the next delimiter
+        literal = b""
+        while self._fill():
+            char = self._buffer[self._pos]
+            if char in _WHITESPACE or char in b",]}":
+                break
+            literal += bytes([char])
+            self._pos += 1
+        return json.loads(literal)
+
+
+def _decode_base64(chunks):
+    """Decode base64 text arriving in chunks of arbitrary size"""
+    rest = b""
+    for chunk in chunks:
+        data = rest + chunk
+        cut = len(data) - len(data) % 4
+        rest = data[cut:]
+        if cut:
+            yield base64.b64decode(data[:cut])
+    if rest:
+        yield base64.b64decode(rest + b"=" * (-len(rest) % 4))
+
+
+def _part_file_path(directory, path):
+    """Path of a definition part below a directory, refusing paths escaping it"""
+    directory = os.path.abspath(directory)
+    file_path = os.path.abspath(os.path.join(directory, *path.replace("\\", "/").split("/")))
+    if os.path.commonpath([directory, file_path]) != directory:
+        raise ValueError(f"Definition part path {path} is outside of the target directory")
+    return file_path
+
+
+def _open_part(target, path):
+    if callable(target):
+        return target(path)
+    file_path = _part_file_path(target, path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    return open(file_path, "wb")
+
+
+def _read_part(reader, target):
+    """Read one definition part and write its decoded payload to the target"""
+    part = {}
+    spool = None
+    size = 0
+    first = True
+    reader.expect("{")
+    while reader.next_member(first, "}"):
+        first = False
+        key = reader.read_string()
+        reader.expect(":")
+        if key != "payload":
+            part[key] = reader.read_value()
+            continue
+        # The path usually comes before the payload, otherwise spool the payload until it is known
+        if "path" in part:
+            f = _open_part(target, part["path"])
+        else:
+            f = spool = tempfile.SpooledTemporaryFile(max_size=DEFAULT_CHUNK_SIZE)
+        try:
+            size = write_stream(_decode_base64(reader.iter_string()), f)
+        finally:
+            if spool is None:
+                f.close()
+
+    payload_type = part.get("payloadType", "InlineBase64")
+    if payload_type != "InlineBase64":
+        raise ValueError(f"Unsupported payload type {payload_type} of definition part {part.get('path')}")
+    if spool is not None:
+        if "path" not in part:
+            raise ValueError("Definition part without a path")
+        spool.seek(0)
+        with _open_part(target, part["path"]) as f:
+            shutil.copyfileobj(spool, f)
+        spool.close()
+    return {"path": part.get("path"), "payloadType": payload_type, "size": size}
+
+
+def write_definition_parts(chunks, target):
+    """Decode the parts of an item definition response part by part, without loading the response into memory
+
+    Args:
+        chunks (iterable): The chunks of bytes of the response body, {"definition": {"format": ..., "parts": [...]}}
+        target (str or callable): The directory to write the parts to, one file per part path,
+                                  or a function receiving the part path and returning a writable binary file, which is closed after the part
+    Returns:
+        dict: The 'format' of the definition and the 'parts' with their path, payload type and decoded size
+    """
+    reader = _JsonReader(chunks)
+    definition = {"format": None, "parts": []}
+
+    def read_definition():
+        first = True
+        reader.expect("{")
+        while reader.next_member(first, "}"):
+            first = False
+            key = reader.read_string()
+            reader.expect(":")
+            if key == "parts":
+                first_part = True
+                reader.expect("[")
+                while reader.next_member(first_part, "]"):
+                    first_part = False
+                    definition["parts"].append(_read_part(reader, target))
+            else:
+                definition[key] = reader.read_value()
+
+    first = True
+    reader.expect("{")
+    while reader.next_member(first, "}"):
+        first = False
+        key = reader.read_string()
+        reader.expect(":")
+        if key == "definition":
+            read_definition()
+        else:
+            reader.read_value()
+    return definition
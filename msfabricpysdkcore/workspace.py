@@ -6,6 +6,8 @@ from msfabricpysdkcore.coreapi import FabricClientCore
 class Workspace:
     """Class to represent a workspace in Microsoft Fabric"""
 
+    __slots__ = ("id", "display_name", "description", "type", "capacity_id", "capacity_region", "one_lake_endpoints", "capacity_assignment_progress", "workspace_identity", "core_client")
+
     def __init__(self, id, display_name, description, type, core_client: FabricClientCore, capacity_id = None,
                  capacity_region = None, one_lake_endpoints = None, capacity_assignment_progress = None,
                  workspace_identity = None) -> None:
@@ -317,6 +319,27 @@ class Workspace:
         """
         return self.core_client.update_folder(workspace_id=self.id, folder_id=folder_id, display_name=display_name)
 
+    def get_folder_index(self):
+        """Get a path index of all folders in the workspace
+        Returns:
+            FolderIndex: The folder index
+        """
+        return self.core_client.get_folder_index(workspace_id=self.id)
+
+    def ensure_folder_tree(self, paths, items = None, folder_index = None, max_workers = 8, chunk_size = 100):
+        """Create the missing folders of a folder tree and optionally move items into it
+        Args:
+            paths (list): The folder paths, e.g. ["/finance/reports/monthly"]
+            items (dict): Items to move, keyed by folder path, each a list of dicts with 'id' (and optionally 'type')
+            folder_index (FolderIndex): An existing folder index of the workspace, fetched if None
+            max_workers (int): The maximum number of parallel requests
+            chunk_size (int): The maximum number of items per bulk move request
+        Returns:
+            dict: The 'index', the 'created' paths, the 'failed' paths and the number of items 'moved' per path
+        """
+        return self.core_client.ensure_folder_tree(workspace_id=self.id, paths=paths, items=items, folder_index=folder_index,
+                                                   max_workers=max_workers, chunk_size=chunk_size)
+
     # Item specific operations
 
     def create_item(self, display_name, type, definition = None, description = None, **kwargs):
@@ -359,6 +382,11 @@ class Workspace:
         """Get the definition of an item from a workspace"""
         return self.core_client.get_item_definition(workspace_id=self.id, item_id=item_id, type=type, format=format)
 
+    def download_item_definition(self, item_id, target, type = None, format = None, chunk_size = None, timeout = 3600):
+        """Download the definition of an item from a workspace part by part"""
+        return self.core_client.download_item_definition(workspace_id=self.id, item_id=item_id, target=target, type=type,
+                                                         format=format, chunk_size=chunk_size, timeout=timeout)
+
     def update_item(self, item_id, display_name = None, description = None, return_item=False):
         """Update an item in a workspace"""
         return self.core_client.update_item(workspace_id=self.id,
@@ -374,8 +402,9 @@ class Workspace:
         return self.core_client.create_shortcut(workspace_id=self.id, item_id=item_id, 
                                                 path=path, name=name, target=target)
     
-    def create_shortcuts_bulk(self, item_id, create_shortcut_requests):
-        return self.core_client.create_shortcuts_bulk(workspace_id=self.id, item_id=item_id, create_shortcut_requests=create_shortcut_requests)
+    def create_shortcuts_bulk(self, item_id, create_shortcut_requests, chunk_size = 50, max_workers = 4, max_retries = 2):
+        return self.core_client.create_shortcuts_bulk(workspace_id=self.id, item_id=item_id, create_shortcut_requests=create_shortcut_requests,
+                                                      chunk_size=chunk_size, max_workers=max_workers, max_retries=max_retries)
         
     def delete_shortcut(self, item_id, path, name):
         return self.core_client.delete_shortcut(self.id, item_id, path=path, name=name)
@@ -419,9 +448,10 @@ class Workspace:
                                                     schedule_id=schedule_id, configuration=configuration, enabled=enabled)
 
 
-    def commit_to_git(self, mode, comment=None, items=None, workspace_head=None):
+    def commit_to_git(self, mode, comment=None, items=None, workspace_head=None, wait_for_completion = True):
         return self.core_client.commit_to_git(workspace_id=self.id, mode=mode, comment=comment,
-                                              items=items, workspace_head=workspace_head)
+                                              items=items, workspace_head=workspace_head,
+                                              wait_for_completion=wait_for_completion)
 
     def git_connect(self, git_provider_details, my_git_credentials):
         return self.core_client.git_connect(workspace_id=self.id, git_provider_details=git_provider_details,
@@ -442,10 +472,12 @@ class Workspace:
     def git_get_status(self):
         return self.core_client.git_get_status(workspace_id=self.id)
 
-    def update_from_git(self, remote_commit_hash, conflict_resolution = None, options = None, workspace_head = None):
+    def update_from_git(self, remote_commit_hash, conflict_resolution = None, options = None, workspace_head = None,
+                        wait_for_completion = True):
         return self.core_client.update_from_git(workspace_id=self.id, remote_commit_hash=remote_commit_hash,
                                                conflict_resolution=conflict_resolution,
-                                               options=options, workspace_head=workspace_head)
+                                               options=options, workspace_head=workspace_head,
+                                               wait_for_completion=wait_for_completion)
     
     def update_my_git_credentials(self, source, connection_id = None):
         return self.core_client.update_my_git_credentials(workspace_id=self.id, source=source, connection_id=connection_id)
@@ -891,8 +923,9 @@ class Workspace:
                                                              definition=definition, update_metadata=update_metadata)
 
     # published
-    def export_published_external_libraries(self, environment_id):
-        return self.core_client.export_published_external_libraries(workspace_id=self.id, environment_id=environment_id)
+    def export_published_external_libraries(self, environment_id, sink = None, chunk_size = None, timeout = 3600):
+        return self.core_client.export_published_external_libraries(workspace_id=self.id, environment_id=environment_id,
+                                                                    sink=sink, chunk_size=chunk_size, timeout=timeout)
    
     def get_published_spark_compute(self, environment_id):
         return self.core_client.get_published_spark_compute(workspace_id=self.id, environment_id=environment_id)
@@ -914,8 +947,9 @@ class Workspace:
         return self.core_client.delete_staging_library(workspace_id=self.id, environment_id=environment_id, library_to_delete=library_to_delete)
         
 
-    def export_staging_external_libraries(self, environment_id):
-        return self.core_client.export_staging_external_libraries(workspace_id=self.id, environment_id=environment_id)
+    def export_staging_external_libraries(self, environment_id, sink = None, chunk_size = None, timeout = 3600):
+        return self.core_client.export_staging_external_libraries(workspace_id=self.id, environment_id=environment_id,
+                                                                  sink=sink, chunk_size=chunk_size, timeout=timeout)
 
     def get_staging_spark_compute(self, workspace_id, environment_id, preview="false"):
         return self.core_client.get_staging_spark_compute(workspace_id=workspace_id, environment_id=environment_id, preview=preview)